@@ -90,8 +90,11 @@ class AppController:
         logger.info("Stopping AppController...")
         self._running = False
 
+        self.deps.network_scanner.stop_hostname_resolution()
+
         # Flush data
         self.deps.store.flush()
+        self.deps.geolocation_service.flush()
 
         # Publish stopping event
         self.event_bus.publish(EventType.APP_STOPPING)
@@ -62,13 +62,17 @@ class SingletonLock:
         if not pid_file.exists():
             return None
         try:
-            with open(pid_file) as f:
-                pid_str = f.read().strip()
-                if pid_str:
-                    pid = int(pid_str)
-                    # Check if process is actually running
-                    os.kill(pid, 0)  # Signal 0 = check if process exists
-                    return pid
+            # Raw fd read: the pid file holds a handful of ASCII digits
+            fd = os.open(str(pid_file), os.O_RDONLY)
+            try:
+                pid_str = os.read(fd, 32).decode("ascii").strip()
+            finally:
+                os.close(fd)
+            if pid_str:
+                pid = int(pid_str)
+                # Check if process is actually running
+                os.kill(pid, 0)  # Signal 0 = check if process exists
+                return pid
         except (ValueError, ProcessLookupError, PermissionError, OSError):
             pass
         return None
@@ -77,8 +81,12 @@ class SingletonLock:
         """Write our PID to the pid file."""
         pid_file = self._lock_file.with_suffix(".pid")
         try:
-            with open(pid_file, "w") as f:
-                f.write(str(os.getpid()))
+            # Single write(2) instead of building a buffered text file object
+            fd = os.open(str(pid_file), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                os.write(fd, str(os.getpid()).encode("ascii"))
+            finally:
+                os.close(fd)
         except Exception:
             pass  # Non-critical
 
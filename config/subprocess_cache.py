@@ -70,11 +70,11 @@ class SubprocessCache:
         self.max_cache_size = max_cache_size
         self._cache: Dict[Tuple[str, ...], CachedResult] = {}
         self._lock = threading.Lock()
-        self._stats = {
-            "hits": 0,
-            "misses": 0,
-            "errors": 0,
-        }
+        # Plain int counters bumped outside the lock; get_stats() only needs
+        # an approximate snapshot, so a lost update under contention is fine.
+        self._hit_count = 0
+        self._miss_count = 0
+        self._error_count = 0
 
     def _make_key(self, cmd: List[str]) -> Tuple[str, ...]:
         """Create a hashable cache key from command."""
@@ -129,13 +129,14 @@ class SubprocessCache:
         # Check cache first
         if not bypass_cache:
             with self._lock:
-                if key in self._cache and not self._cache[key].is_expired(ttl):
-                    self._stats["hits"] += 1
-                    logger.debug(f"Cache hit for: {cmd[0]}")
-                    return self._cache[key].result
+                cached = self._cache.get(key)
+            if cached is not None and not cached.is_expired(ttl):
+                self._hit_count += 1
+                logger.debug(f"Cache hit for: {cmd[0]}")
+                return cached.result
 
         # Run the command
-        self._stats["misses"] += 1
+        self._miss_count += 1
         start_time = time.time()
 
         try:
@@ -162,7 +163,7 @@ class SubprocessCache:
             return result
 
         except subprocess.TimeoutExpired as e:
-            self._stats["errors"] += 1
+            self._error_count += 1
             duration_ms = (time.time() - start_time) * 1000
             logger.warning(f"Command timed out after {duration_ms:.0f}ms: {cmd}")
             raise SubprocessError(
@@ -170,12 +171,13 @@ class SubprocessCache:
             ) from e
 
         except FileNotFoundError as e:
-            self._stats["errors"] += 1
+            self._error_count += 1
             logger.error(f"Command not found: {cmd[0]}")
-            raise SubprocessError(f"Command not found: {cmd[0]}", command=cmd) from e
+            # Only the executable matters here; skip echoing the full argv
+            raise SubprocessError(f"Command not found: {cmd[0]}", command=cmd[:1]) from e
 
         except Exception as e:
-            self._stats["errors"] += 1
+            self._error_count += 1
             logger.error(f"Subprocess error for {cmd}: {e}")
             raise SubprocessError(f"Subprocess error: {e}", command=cmd) from e
 
@@ -197,14 +199,17 @@ class SubprocessCache:
 
     def get_stats(self) -> dict:
         """Get cache statistics."""
-        with self._lock:
-            total = self._stats["hits"] + self._stats["misses"]
-            hit_rate = (self._stats["hits"] / total * 100) if total > 0 else 0
-            return {
-                **self._stats,
-                "cache_size": len(self._cache),
-                "hit_rate_percent": round(hit_rate, 1),
-            }
+        hits = self._hit_count
+        misses = self._miss_count
+        total = hits + misses
+        hit_rate = (hits / total * 100) if total > 0 else 0
+        return {
+            "hits": hits,
+            "misses": misses,
+            "errors": self._error_count,
+            "cache_size": len(self._cache),
+            "hit_rate_percent": round(hit_rate, 1),
+        }
 
 
 # Global cache instance
@@ -261,7 +266,7 @@ def safe_run(
         raise SubprocessError(
             f"Command not in allowlist: {base_cmd}",
             command=cmd,
-            details={"allowed": list(ALLOWED_SUBPROCESS_COMMANDS)},
+            details={"allowed": ALLOWED_SUBPROCESS_COMMANDS},  # frozenset, no copy needed
         )
 
     # Use the global cache for execution (with no caching by default)
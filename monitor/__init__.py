@@ -18,14 +18,39 @@ Example:
     >>> detector = ConnectionDetector()
     >>> conn = detector.get_current_connection()
     >>> print(f"Connected to: {conn.name}")
+
+Submodules are imported lazily on first attribute access (PEP 562), so
+importing ``monitor`` does not pull in psutil and every collector up front.
 """
 
-from .connection import ConnectionDetector, ConnectionInfo
-from .issues import IssueDetector, IssueType, NetworkIssue
-from .network import NetworkStats, SpeedStats
-from .scanner import NetworkDevice, NetworkScanner
-from .traffic import ProcessTraffic, TrafficMonitor, format_traffic_bytes
-from .utils import format_bytes, format_duration
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .connection import ConnectionDetector, ConnectionInfo
+    from .issues import IssueDetector, IssueType, NetworkIssue
+    from .network import NetworkStats, SpeedStats
+    from .scanner import NetworkDevice, NetworkScanner
+    from .traffic import ProcessTraffic, TrafficMonitor, format_traffic_bytes
+    from .utils import format_bytes, format_duration
+
+# Public name -> submodule that defines it
+_LAZY_ATTRS = {
+    "ConnectionDetector": "connection",
+    "ConnectionInfo": "connection",
+    "IssueDetector": "issues",
+    "IssueType": "issues",
+    "NetworkIssue": "issues",
+    "NetworkStats": "network",
+    "SpeedStats": "network",
+    "NetworkDevice": "scanner",
+    "NetworkScanner": "scanner",
+    "ProcessTraffic": "traffic",
+    "TrafficMonitor": "traffic",
+    "format_traffic_bytes": "traffic",
+    "format_bytes": "utils",
+    "format_duration": "utils",
+}
 
 __all__ = [
     # Network stats
@@ -49,3 +74,17 @@ __all__ = [
     "format_traffic_bytes",
     "format_duration",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    """Import the submodule providing ``name`` on first access."""
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value  # Cache so later lookups skip __getattr__
+    return value
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(__all__))
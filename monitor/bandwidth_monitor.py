@@ -6,7 +6,7 @@ Monitors per-app bandwidth usage and alerts when thresholds are exceeded.
 import time
 from collections import deque
 from dataclasses import dataclass
-from typing import Dict, List, Tuple
+from typing import Deque, Dict, List, NamedTuple, Optional
 
 from config import get_logger
 
@@ -24,15 +24,40 @@ class BandwidthAlert:
     timestamp: float
 
 
-@dataclass
-class BandwidthSample:
-    """A single bandwidth sample for an app."""
+class BandwidthSample(NamedTuple):
+    """A single bandwidth sample for an app.
+
+    A NamedTuple rather than a dataclass: samples are immutable once stored
+    and there are ``window_seconds`` of them per app, so skipping the
+    per-instance ``__dict__`` keeps the windows compact.
+    """
 
     timestamp: float
     bytes_in: int
     bytes_out: int
 
 
+class _AppState:
+    """Per-app bandwidth tracking state.
+
+    Everything the monitor needs about one app lives in a single slotted
+    record, so each app costs one dict lookup per poll instead of one per field.
+    """
+
+    __slots__ = ("last_alert", "prev_in", "prev_out", "samples", "window_total")
+
+    def __init__(self, window_seconds: int):
+        # Per-check deltas, oldest first
+        self.samples: Deque[BandwidthSample] = deque(maxlen=window_seconds)
+        # Previous cumulative byte counters; None until a baseline is set
+        self.prev_in: Optional[int] = None
+        self.prev_out: int = 0
+        # Running byte total of samples, kept in step with the deque
+        self.window_total: int = 0
+        # Monotonic time of the last alert, for the cooldown
+        self.last_alert: Optional[float] = None
+
+
 class BandwidthMonitor:
     """Monitors bandwidth usage per app and detects threshold violations.
 
@@ -40,14 +65,15 @@ class BandwidthMonitor:
     per-app thresholds.
     """
 
-    def __init__(self):
-        """Initialize the bandwidth monitor."""
-        # Track bandwidth samples per app: app_name -> deque of BandwidthSample
-        self._app_samples: Dict[str, deque] = {}
-        # Track previous total bytes for delta calculation: app_name -> (bytes_in, bytes_out)
-        self._previous_bytes: Dict[str, Tuple[int, int]] = {}
-        # Track which apps have already triggered alerts (to avoid spam)
-        self._alerted_apps: Dict[str, float] = {}  # app_name -> last_alert_time
+    def __init__(self, window_seconds: int = 30):
+        """Initialize the bandwidth monitor.
+
+        Args:
+            window_seconds: Initial sample window size (one sample per check)
+        """
+        self._window_seconds = window_seconds
+        # Tracking state per app: app_name -> _AppState
+        self._states: Dict[str, _AppState] = {}
         self._alert_cooldown: float = 300.0  # 5 minutes between alerts for same app
         logger.debug("BandwidthMonitor initialized")
 
@@ -67,36 +93,56 @@ class BandwidthMonitor:
         if not thresholds:
             return []
 
-        current_time = time.time()
+        if window_seconds != self._window_seconds:
+            # Existing deques were sized for the old window; start them afresh
+            self._window_seconds = window_seconds
+            for app_state in self._states.values():
+                app_state.samples = deque(maxlen=window_seconds)
+                app_state.window_total = 0
+
+        # Monotonic clock for windowing and cooldowns so NTP adjustments can't
+        # produce negative spans; alerts still carry a wall-clock timestamp.
+        current_time = time.monotonic()
         alerts = []
 
         # Process each app's traffic
         for display_name, bytes_in, bytes_out, _ in process_traffic:
-            if display_name not in thresholds:
-                continue
-
-            threshold_mbps = thresholds[display_name]
+            threshold_mbps = thresholds.get(display_name, 0.0)
             if threshold_mbps <= 0:
-                continue  # Threshold disabled
-
-            # Initialize deque for this app if needed
-            if display_name not in self._app_samples:
-                self._app_samples[display_name] = deque(maxlen=window_seconds)
-                self._previous_bytes[display_name] = (bytes_in, bytes_out)
+                continue  # Unmonitored app or threshold disabled
+
+            state: Optional[_AppState] = self._states.get(display_name)
+            if state is None:
+                state = self._states[display_name] = _AppState(self._window_seconds)
+
+            # First sample since start/reset only establishes the baseline
+            prev_bytes_in = state.prev_in
+            prev_bytes_out = state.prev_out
+            state.prev_in = bytes_in
+            state.prev_out = bytes_out
+            if prev_bytes_in is None:
                 continue
 
-            # Calculate delta from previous sample
-            prev_bytes_in, prev_bytes_out = self._previous_bytes.get(display_name, (0, 0))
-            delta_in = max(0, bytes_in - prev_bytes_in)
-            delta_out = max(0, bytes_out - prev_bytes_out)
-
-            # Store sample
+            # Calculate delta from previous sample, clamping counter resets to 0
+            # (a conditional expression avoids the max() builtin call)
+            delta_in = bytes_in - prev_bytes_in
+            delta_in = delta_in if delta_in > 0 else 0
+            delta_out = bytes_out - prev_bytes_out
+            delta_out = delta_out if delta_out > 0 else 0
+
+            # Store sample, updating the running window total. A full deque
+            # evicts its leftmost sample on append, so subtract that first.
+            samples = state.samples
+            window_total = state.window_total
+            if len(samples) == samples.maxlen:
+                evicted = samples[0]
+                window_total -= evicted.bytes_in + evicted.bytes_out
             sample = BandwidthSample(timestamp=current_time, bytes_in=delta_in, bytes_out=delta_out)
-            self._app_samples[display_name].append(sample)
-            self._previous_bytes[display_name] = (bytes_in, bytes_out)
+            samples.append(sample)
+            window_total += delta_in + delta_out
+            state.window_total = window_total
 
             # Calculate average bandwidth over window
-            samples = self._app_samples[display_name]
             if len(samples) < 2:
                 continue
 
@@ -108,16 +154,14 @@ class BandwidthMonitor:
             if time_delta < 1.0:  # Need at least 1 second of data
                 continue
 
-            # Sum all bytes in the window
-            total_bytes = sum(s.bytes_in + s.bytes_out for s in samples)
-            avg_bytes_per_second = total_bytes / time_delta
+            avg_bytes_per_second = window_total / time_delta
             avg_mbps = (avg_bytes_per_second * 8) / 1_000_000  # Convert to Mbps
 
             # Check if threshold exceeded
             if avg_mbps > threshold_mbps:
                 # Check cooldown to avoid alert spam
-                last_alert = self._alerted_apps.get(display_name, 0)
-                if current_time - last_alert < self._alert_cooldown:
+                last_alert = state.last_alert
+                if last_alert is not None and current_time - last_alert < self._alert_cooldown:
                     continue
 
                 alert = BandwidthAlert(
@@ -125,10 +169,10 @@ class BandwidthMonitor:
                     current_mbps=avg_mbps,
                     threshold_mbps=threshold_mbps,
                     window_seconds=window_seconds,
-                    timestamp=current_time,
+                    timestamp=time.time(),
                 )
                 alerts.append(alert)
-                self._alerted_apps[display_name] = current_time
+                state.last_alert = current_time
                 logger.warning(
                     f"Bandwidth threshold exceeded: {display_name} "
                     f"({avg_mbps:.2f} Mbps > {threshold_mbps:.2f} Mbps)"
@@ -138,11 +182,19 @@ class BandwidthMonitor:
 
     def reset_alert_cooldown(self, app_name: str) -> None:
         """Reset the alert cooldown for an app (e.g., after user acknowledges)."""
-        if app_name in self._alerted_apps:
-            del self._alerted_apps[app_name]
+        state = self._states.get(app_name)
+        if state is not None:
+            state.last_alert = None
 
     def clear_samples(self) -> None:
-        """Clear all bandwidth samples (e.g., on session reset)."""
-        self._app_samples.clear()
-        self._previous_bytes.clear()
-        self._alerted_apps.clear()
+        """Clear all bandwidth samples (e.g., on session reset).
+
+        Per-app state is reset in place rather than dropped so the deques can
+        be reused instead of reallocated on the next check.
+        """
+        for state in self._states.values():
+            state.samples.clear()
+            state.prev_in = None
+            state.prev_out = 0
+            state.window_total = 0
+            state.last_alert = None
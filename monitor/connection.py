@@ -1,9 +1,11 @@
 """Connection detection for WiFi and Ethernet on macOS."""
 
 import re
+import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional
+from socket import AF_INET
+from typing import Dict, List, Optional, Tuple
 
 import psutil
 
@@ -12,6 +14,12 @@ from config.subprocess_cache import get_subprocess_cache
 
 logger = get_logger(__name__)
 
+# Output parsers for networksetup / airport, compiled once rather than per poll
+_CURRENT_WIFI_RE = re.compile(r"Current Wi-Fi Network:\s*(.+)")
+_SSID_RE = re.compile(r"\s+SSID:\s*(.+)")
+_RSSI_RE = re.compile(r"agrCtlRSSI:\s*(-?\d+)")
+_SERVICE_RE = re.compile(r"\(\d+\)\s+(.+)")
+
 
 @dataclass
 class ConnectionInfo:
@@ -38,32 +46,61 @@ class ConnectionDetector:
     def __init__(self, event_bus=None):
         self._last_connection: Optional[ConnectionInfo] = None
         self._subprocess_cache = get_subprocess_cache()
+        # Parsed `networksetup -listallhardwareports`: (raw output, device -> port)
+        self._hwports_cache: Tuple[Optional[str], Dict[str, str]] = (None, {})
         self._wifi_interface = self._find_wifi_interface()
         # Check once at startup if airport command exists
         self._has_airport = Path(self.AIRPORT_PATH).exists()
         self._event_bus = event_bus  # Optional event bus for publishing events
         self._last_vpn_status: bool = False  # Track previous VPN status
+        # VPN process scan result: (monotonic time checked, process name or None)
+        self._vpn_proc_cache: Optional[Tuple[float, Optional[str]]] = None
+        self._vpn_proc_ttl: float = 10.0  # VPN clients start/stop on human timescales
+        # Shared psutil interface snapshot: (monotonic time taken, stats, addrs)
+        self._iface_snapshot: Optional[Tuple[float, dict, dict]] = None
+        self._iface_snapshot_ttl: float = 1.0
+        # Last detected connection: (monotonic time detected, result)
+        self._conn_cache: Optional[Tuple[float, ConnectionInfo]] = None
+        self._conn_ttl: float = 1.0
         logger.debug(
             f"ConnectionDetector initialized, WiFi interface: {self._wifi_interface}, airport={self._has_airport}"
         )
 
+    def _get_hwports_map(self) -> Dict[str, str]:
+        """Get a mapping of device name to hardware port (e.g. "en0" -> "Wi-Fi").
+
+        The command output is cached for 60 seconds by the subprocess cache,
+        which hands back the same output until it expires; the parsed map is
+        reused for as long as that output is unchanged.
+        """
+        # Hardware ports change very rarely - cache for 60 seconds
+        result = self._subprocess_cache.run(
+            ["networksetup", "-listallhardwareports"],
+            ttl=60.0,
+            timeout=INTERVALS.SUBPROCESS_TIMEOUT_SECONDS,
+        )
+        source, ports = self._hwports_cache
+        if result.stdout is source:
+            return ports
+
+        ports = {}
+        current_port: Optional[str] = None
+        for line in result.stdout.splitlines():
+            if line.startswith("Hardware Port:"):
+                current_port = line[len("Hardware Port:") :].strip()
+            elif line.startswith("Device:") and current_port is not None:
+                ports[line[len("Device:") :].strip()] = current_port
+                current_port = None
+
+        self._hwports_cache = (result.stdout, ports)
+        return ports
+
     def _find_wifi_interface(self) -> str:
         """Find the WiFi interface name (usually en0 or en1)."""
         try:
-            # Hardware ports change very rarely - cache for 60 seconds
-            result = self._subprocess_cache.run(
-                ["networksetup", "-listallhardwareports"],
-                ttl=60.0,
-                timeout=INTERVALS.SUBPROCESS_TIMEOUT_SECONDS,
-            )
-            lines = result.stdout.split("\n")
-            for i, line in enumerate(lines):
-                if "Wi-Fi" in line or "AirPort" in line:
-                    # Next line should have "Device: enX"
-                    if i + 1 < len(lines):
-                        match = re.search(r"Device:\s*(\w+)", lines[i + 1])
-                        if match:
-                            return match.group(1)
+            for device, port in self._get_hwports_map().items():
+                if "Wi-Fi" in port or "AirPort" in port:
+                    return device
         except Exception as e:
             logger.debug(f"Error finding WiFi interface: {e}")
         return "en0"  # Default fallback
@@ -98,7 +135,7 @@ class ConnectionDetector:
             )
             if result.returncode == 0:
                 # Output: "Current Wi-Fi Network: NetworkName"
-                match = re.search(r"Current Wi-Fi Network:\s*(.+)", result.stdout)
+                match = _CURRENT_WIFI_RE.search(result.stdout)
                 if match:
                     ssid = match.group(1).strip()
                     if ssid and ssid not in (
@@ -119,7 +156,7 @@ class ConnectionDetector:
                     check_allowed=False,  # Special path, not in allowlist
                 )
                 if result.returncode == 0:
-                    match = re.search(r"\s+SSID:\s*(.+)", result.stdout)
+                    match = _SSID_RE.search(result.stdout)
                     if match:
                         ssid = match.group(1).strip()
                         if ssid and ssid != "<redacted>":
@@ -178,7 +215,7 @@ class ConnectionDetector:
                 )
                 if result.returncode == 0:
                     # Look for "agrCtlRSSI: -XX" in output
-                    match = re.search(r"agrCtlRSSI:\s*(-?\d+)", result.stdout)
+                    match = _RSSI_RE.search(result.stdout)
                     if match:
                         return int(match.group(1))
             except Exception:
@@ -186,11 +223,31 @@ class ConnectionDetector:
 
         return None
 
+    def _snapshot_net_ifaces(self) -> Tuple[dict, dict]:
+        """Get interface stats and addresses, memoized briefly.
+
+        Connection and VPN detection both need ``net_if_stats()`` and
+        ``net_if_addrs()`` each poll; sharing one snapshot avoids enumerating
+        every interface twice.
+
+        Returns:
+            Tuple of (stats, addrs) as returned by psutil.
+        """
+        now = time.monotonic()
+        if self._iface_snapshot is not None:
+            taken_at, stats, addrs = self._iface_snapshot
+            if now - taken_at < self._iface_snapshot_ttl:
+                return stats, addrs
+
+        stats = psutil.net_if_stats()
+        addrs = psutil.net_if_addrs()
+        self._iface_snapshot = (now, stats, addrs)
+        return stats, addrs
+
     def _get_active_interfaces(self) -> List[str]:
         """Get list of active network interfaces with IP addresses."""
         active = []
-        addrs = psutil.net_if_addrs()
-        stats = psutil.net_if_stats()
+        stats, addrs = self._snapshot_net_ifaces()
 
         for iface, addr_list in addrs.items():
             # Skip loopback and inactive interfaces
@@ -201,43 +258,53 @@ class ConnectionDetector:
 
             # Check for IPv4 address
             for addr in addr_list:
-                if addr.family.name == "AF_INET" and not addr.address.startswith("127."):
+                if addr.family == AF_INET and not addr.address.startswith("127."):
                     active.append(iface)
                     break
 
         return active
 
-    def _get_ip_address(self, interface: str) -> Optional[str]:
-        """Get IP address for an interface."""
-        addrs = psutil.net_if_addrs()
-        if interface in addrs:
-            for addr in addrs[interface]:
-                if addr.family.name == "AF_INET":
-                    return addr.address
+    def _get_ip_address(self, interface: str, addrs: Optional[dict] = None) -> Optional[str]:
+        """Get IP address for an interface.
+
+        Args:
+            interface: Interface name (e.g. "en0")
+            addrs: Already-fetched ``net_if_addrs()`` map; defaults to the shared
+                interface snapshot so a detection pass enumerates addresses once.
+        """
+        if addrs is None:
+            addrs = self._snapshot_net_ifaces()[1]
+        for addr in addrs.get(interface, ()):
+            if addr.family == AF_INET:
+                return addr.address
         return None
 
     def _get_interface_type(self, interface: str) -> str:
         """Determine the type of network interface."""
         try:
-            # Hardware ports change very rarely - cache for 60 seconds
-            result = self._subprocess_cache.run(
-                ["networksetup", "-listallhardwareports"],
-                ttl=60.0,
-                timeout=INTERVALS.SUBPROCESS_TIMEOUT_SECONDS,
-            )
-            lines = result.stdout.split("\n")
-            current_port = ""
-            for line in lines:
-                if line.startswith("Hardware Port:"):
-                    current_port = line.replace("Hardware Port:", "").strip()
-                elif f"Device: {interface}" in line:
-                    return current_port
+            return self._get_hwports_map().get(interface, "Unknown")
         except Exception:
-            pass  # nosec B110 - Best effort, return "Unknown" below
-        return "Unknown"
+            return "Unknown"  # Best effort
 
     def get_current_connection(self) -> ConnectionInfo:
-        """Get information about the current network connection."""
+        """Get information about the current network connection.
+
+        The result is cached for ``_conn_ttl`` seconds so callers that ask
+        back-to-back (e.g. the connection and then its storage key) share one
+        detection pass instead of re-running the interface and SSID probes.
+        """
+        now = time.monotonic()
+        if self._conn_cache is not None:
+            detected_at, cached = self._conn_cache
+            if now - detected_at < self._conn_ttl:
+                return cached
+
+        result = self._detect_connection()
+        self._conn_cache = (now, result)
+        return result
+
+    def _detect_connection(self) -> ConnectionInfo:
+        """Detect the current network connection without caching."""
         active_interfaces = self._get_active_interfaces()
 
         if not active_interfaces:
@@ -375,6 +442,9 @@ class ConnectionDetector:
         "warp",
     )
 
+    # All VPN process names as one alternation, so each process is scanned once
+    _VPN_NAME_RE = re.compile("|".join(map(re.escape, VPN_PROCESS_NAMES)))
+
     def detect_vpn(self) -> tuple:
         """Detect if a VPN connection is active.
 
@@ -422,38 +492,53 @@ class ConnectionDetector:
     def _check_vpn_interfaces(self) -> Optional[str]:
         """Check for active VPN network interfaces."""
         try:
-            stats = psutil.net_if_stats()
-            addrs = psutil.net_if_addrs()
+            stats, addrs = self._snapshot_net_ifaces()
 
             for iface_name, iface_stats in stats.items():
                 # Check if interface is up and matches VPN patterns
-                if iface_stats.isup:
-                    for prefix in self.VPN_INTERFACE_PREFIXES:
-                        if iface_name.lower().startswith(prefix):
-                            # Verify it has an IP address assigned
-                            if iface_name in addrs:
-                                for addr in addrs[iface_name]:
-                                    if addr.family.name == "AF_INET":
-                                        return f"VPN ({iface_name})"
+                if not iface_stats.isup:
+                    continue
+                if not iface_name.lower().startswith(self.VPN_INTERFACE_PREFIXES):
+                    continue
+                # Verify it has an IP address assigned
+                for addr in addrs.get(iface_name, ()):
+                    if addr.family == AF_INET:
+                        return f"VPN ({iface_name})"
         except Exception as e:
             logger.debug(f"VPN interface check error: {e}")
         return None
 
     def _check_vpn_processes(self) -> Optional[str]:
-        """Check for running VPN processes."""
+        """Check for running VPN processes.
+
+        Walking every process is expensive, so the result is cached for
+        ``_vpn_proc_ttl`` seconds.
+        """
+        now = time.monotonic()
+        if self._vpn_proc_cache is not None:
+            checked_at, cached_name = self._vpn_proc_cache
+            if now - checked_at < self._vpn_proc_ttl:
+                return cached_name
+
+        found: Optional[str] = None
         try:
             for proc in psutil.process_iter(["name"]):
                 try:
-                    proc_name = proc.info["name"].lower()
-                    for vpn_name in self.VPN_PROCESS_NAMES:
-                        if vpn_name in proc_name:
-                            # Return a cleaned up name
-                            return proc.info["name"]
+                    name = proc.info.get("name")
+                    # Processes we can't inspect report no name; skip them
+                    # rather than aborting the whole scan
+                    if not name:
+                        continue
+                    if self._VPN_NAME_RE.search(name.lower()):
+                        found = name
+                        break
                 except (psutil.NoSuchProcess, psutil.AccessDenied):
                     continue
         except Exception as e:
             logger.debug(f"VPN process check error: {e}")
-        return None
+
+        self._vpn_proc_cache = (now, found)
+        return found
 
     def _check_vpn_services(self) -> Optional[str]:
         """Check macOS network services for active VPN."""
@@ -471,7 +556,7 @@ class ConnectionDetector:
                     line_lower = line.lower()
                     if "vpn" in line_lower or "ipsec" in line_lower or "l2tp" in line_lower:
                         # Extract service name
-                        match = re.search(r"\(\d+\)\s+(.+)", line)
+                        match = _SERVICE_RE.search(line)
                         if match:
                             service_name = match.group(1).strip()
                             # Check if this service is connected
@@ -4,9 +4,13 @@ Tracks external connections per app and provides geolocation information.
 """
 
 import ipaddress
+import socket
+import struct
+import time
 from collections import defaultdict
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Set
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import psutil
 
@@ -14,6 +18,52 @@ from config import get_logger
 
 logger = get_logger(__name__)
 
+# Identifies a live connection across polls: (pid, remote_ip, remote_port, local_port)
+_ConnectionKey = Tuple[Optional[int], str, int, int]
+
+
+def _ipv4_range(cidr: str) -> Tuple[int, int]:
+    """Return the inclusive integer bounds of an IPv4 CIDR block."""
+    network = ipaddress.IPv4Network(cidr)
+    return int(network.network_address), int(network.broadcast_address)
+
+
+# Non-routable IPv4 blocks: what ipaddress treats as private/loopback/link-local,
+# plus carrier-grade NAT space (100.64.0.0/10), precomputed as integer ranges
+_NON_EXTERNAL_V4_RANGES: Tuple[Tuple[int, int], ...] = tuple(
+    _ipv4_range(cidr)
+    for cidr in (
+        "0.0.0.0/8",
+        "10.0.0.0/8",
+        "100.64.0.0/10",
+        "127.0.0.0/8",
+        "169.254.0.0/16",
+        "172.16.0.0/12",
+        "192.0.0.0/24",
+        "192.0.2.0/24",
+        "192.168.0.0/16",
+        "198.18.0.0/15",
+        "198.51.100.0/24",
+        "203.0.113.0/24",
+        "240.0.0.0/4",
+    )
+)
+
+
+@lru_cache(maxsize=4096)
+def _is_external_address(ip: str) -> bool:
+    """Check if an IP is external; cached since the same peers recur across polls."""
+    try:
+        value: int = struct.unpack("!I", socket.inet_pton(socket.AF_INET, ip))[0]
+    except (OSError, TypeError):
+        # Not dotted-quad IPv4 - let ipaddress handle IPv6 and reject garbage
+        try:
+            addr = ipaddress.ip_address(ip)
+        except ValueError:
+            return False
+        return not addr.is_private and not addr.is_loopback and not addr.is_link_local
+    return not any(lo <= value <= hi for lo, hi in _NON_EXTERNAL_V4_RANGES)
+
 
 @dataclass
 class ConnectionInfo:
@@ -43,8 +93,11 @@ class ConnectionTracker:
         self._geolocation = geolocation_service
         # Track connections: app_name -> List[ConnectionInfo]
         self._app_connections: Dict[str, List[ConnectionInfo]] = defaultdict(list)
-        # Track seen IPs to avoid duplicate lookups
-        self._seen_ips: Set[str] = set()
+        # Resolved process names: pid -> (create_time, name). The create time
+        # guards against a recycled PID returning a stale name.
+        self._process_names: Dict[int, Tuple[float, str]] = {}
+        # Live connections persisted across polls
+        self._active_conns: Dict[_ConnectionKey, ConnectionInfo] = {}
         logger.debug("ConnectionTracker initialized")
 
     def _is_external_ip(self, ip: str) -> bool:
@@ -56,11 +109,37 @@ class ConnectionTracker:
         Returns:
             True if IP is external
         """
-        try:
-            addr = ipaddress.ip_address(ip)
-            return not addr.is_private and not addr.is_loopback and not addr.is_link_local
-        except ValueError:
-            return False
+        return _is_external_address(ip)
+
+    def _resolve_process_names(self, pids: Iterable[int]) -> Dict[int, str]:
+        """Resolve process names once per PID, reusing names from earlier polls.
+
+        Args:
+            pids: Unique PIDs owning the connections of interest
+
+        Returns:
+            Dict mapping pid -> process name ("Unknown" if it can't be read)
+        """
+        names: Dict[int, str] = {}
+        resolved: Dict[int, Tuple[float, str]] = {}
+        for pid in pids:
+            try:
+                proc = psutil.Process(pid)
+                with proc.oneshot():
+                    create_time = proc.create_time()
+                    cached = self._process_names.get(pid)
+                    if cached is not None and cached[0] == create_time:
+                        name = cached[1]
+                    else:
+                        name = proc.name()
+                resolved[pid] = (create_time, name)
+                names[pid] = name
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                names[pid] = "Unknown"
+
+        # Only keep PIDs that still own connections so the cache stays bounded
+        self._process_names = resolved
+        return names
 
     def get_external_connections(self) -> Dict[str, List[ConnectionInfo]]:
         """Get external connections grouped by app.
@@ -72,40 +151,65 @@ class ConnectionTracker:
             connections = psutil.net_connections(kind="inet")
             current_connections: Dict[str, List[ConnectionInfo]] = defaultdict(list)
 
-            for conn in connections:
-                if conn.status != "ESTABLISHED" or not conn.raddr:
-                    continue
-
-                remote_ip = conn.raddr.ip
-                if not self._is_external_ip(remote_ip):
-                    continue
-
-                # Get process name
-                app_name = "Unknown"
-                if conn.pid:
-                    try:
-                        proc = psutil.Process(conn.pid)
-                        app_name = proc.name()
-                    except (psutil.NoSuchProcess, psutil.AccessDenied):
-                        pass
-
-                # Lookup country if geolocation service available
-                country_code = None
-                if self._geolocation and remote_ip not in self._seen_ips:
-                    country_code = self._geolocation.lookup_country(remote_ip)
-                    if country_code:
-                        self._seen_ips.add(remote_ip)
-
-                conn_info = ConnectionInfo(
-                    remote_ip=remote_ip,
-                    remote_port=conn.raddr.port,
-                    local_port=conn.laddr.port if conn.laddr else 0,
-                    country_code=country_code,
+            # Mark-and-sweep: reuse ConnectionInfo for connections seen on earlier
+            # polls and drop the ones that have closed since
+            now = time.time()
+            previous = self._active_conns
+            active: Dict[_ConnectionKey, ConnectionInfo] = {}
+
+            keyed: List[Tuple[Any, _ConnectionKey]] = [
+                (
+                    conn,
+                    (
+                        conn.pid,
+                        conn.raddr.ip,
+                        conn.raddr.port,
+                        conn.laddr.port if conn.laddr else 0,
+                    ),
                 )
+                for conn in connections
+                if conn.status == "ESTABLISHED"
+                and conn.raddr
+                and self._is_external_ip(conn.raddr.ip)
+            ]
+
+            # Resolve each owning process once, not once per connection
+            pid_names = self._resolve_process_names({conn.pid for conn, _ in keyed if conn.pid})
+
+            # Look up countries for new peers in one batch, retrying live connections
+            # whose earlier lookup failed. The geolocation service caches answers
+            # (failures for a few minutes), so repeated IPs don't reach the API.
+            countries: Dict[str, Optional[str]] = {}
+            if self._geolocation:
+                lookup_ips = {
+                    key[1]
+                    for _, key in keyed
+                    if key not in previous or previous[key].country_code is None
+                }
+                if lookup_ips:
+                    countries = self._geolocation.lookup_countries(lookup_ips)
+
+            for conn, key in keyed:
+                app_name = pid_names.get(conn.pid, "Unknown") if conn.pid else "Unknown"
+
+                conn_info = previous.get(key)
+                if conn_info is None:
+                    _, remote_ip, remote_port, local_port = key
+                    conn_info = ConnectionInfo(
+                        remote_ip=remote_ip,
+                        remote_port=remote_port,
+                        local_port=local_port,
+                        country_code=countries.get(remote_ip),
+                    )
+                elif conn_info.country_code is None:
+                    conn_info.country_code = countries.get(key[1])
+                conn_info.last_seen = now
+                active[key] = conn_info
 
                 current_connections[app_name].append(conn_info)
 
             # Update tracked connections
+            self._active_conns = active
             self._app_connections = current_connections
 
             return dict(current_connections)
@@ -6,12 +6,27 @@ Tracks DNS resolution times and alerts on slow DNS.
 import socket
 import time
 from collections import deque
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List, Optional
 
 from config import NETWORK, THRESHOLDS, get_logger
 
+try:
+    # Optional: query the configured nameservers directly instead of going
+    # through getaddrinfo (which also consults /etc/hosts and mDNSResponder)
+    import dns.resolver
+except ImportError:
+    dns = None
+
 logger = get_logger(__name__)
 
+# Lookups block on the resolver, so run them side by side (one worker per test domain)
+_DNS_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="dns")
+
+# Deadline for a whole batch of concurrent lookups: any not finished by then count
+# as failed and those still queued are cancelled. Also the direct resolver's lifetime.
+_RESOLVE_TIMEOUT_SECONDS = 2.0
+
 
 class DNSMonitor:
     """Monitors DNS resolution performance.
@@ -31,14 +46,42 @@ class DNSMonitor:
     def __init__(self):
         """Initialize the DNS monitor."""
         self._latency_samples: deque = deque(maxlen=THRESHOLDS.LATENCY_SAMPLE_COUNT)
+        self._latency_sum: float = 0.0  # Running total of _latency_samples
         self._last_check: float = 0
         self._check_interval: float = NETWORK.DNS_CHECK_INTERVAL
         self._slow_dns_threshold: float = NETWORK.DNS_SLOW_THRESHOLD_MS
-        logger.debug("DNSMonitor initialized")
+        # Steady-state checks probe one domain per tick, rotating through TEST_DOMAINS
+        self._rotation_index: int = 0
+        # Most recent latency per domain, so a sample averages across the rotation
+        self._domain_latencies: Dict[str, float] = {}
+        self._resolver = self._create_resolver()
+        logger.debug(f"DNSMonitor initialized (direct resolver: {self._resolver is not None})")
+
+    @staticmethod
+    def _create_resolver():
+        """Create a dnspython resolver for direct nameserver queries, if available.
+
+        Returns:
+            A ``dns.resolver.Resolver`` bound to the system nameservers, or None
+            if dnspython isn't installed or no nameservers are configured.
+        """
+        if dns is None:
+            return None
+        try:
+            resolver = dns.resolver.Resolver()
+            resolver.lifetime = _RESOLVE_TIMEOUT_SECONDS
+            return resolver
+        except Exception as e:
+            logger.debug(f"Could not create DNS resolver, using getaddrinfo: {e}")
+            return None
 
     def check_dns_performance(self, force: bool = False) -> Optional[float]:
         """Check DNS resolution performance.
 
+        Each check resolves a single rotating test domain. Only when that probe
+        is approaching the slow threshold are all test domains resolved, to
+        confirm the slowdown isn't specific to one domain.
+
         Args:
             force: Force check even if interval hasn't elapsed
 
@@ -52,21 +95,63 @@ class DNSMonitor:
 
         self._last_check = current_time
 
-        latencies = []
-        for domain in self.TEST_DOMAINS:
-            latency = self._resolve_domain(domain)
-            if latency is not None:
-                latencies.append(latency)
+        domain = self.TEST_DOMAINS[self._rotation_index % len(self.TEST_DOMAINS)]
+        self._rotation_index += 1
+        queried = [domain]
+        results = self._resolve_all(queried)
+
+        probe = results.get(domain)
+        if probe is None or probe > 0.5 * self._slow_dns_threshold:
+            queried = self.TEST_DOMAINS
+            results = self._resolve_all(queried)
+
+        # A failed lookup drops the domain's last latency rather than averaging a stale one
+        for name in queried:
+            if name not in results:
+                self._domain_latencies.pop(name, None)
 
-        if not latencies:
+        if not results:
             return None
 
+        self._domain_latencies.update(results)
+        latencies = self._domain_latencies.values()
         avg_latency = sum(latencies) / len(latencies)
-        self._latency_samples.append(avg_latency)
+        self._add_sample(avg_latency)
 
         logger.debug(f"DNS check: {avg_latency:.1f}ms average")
         return avg_latency
 
+    def _add_sample(self, latency: float) -> None:
+        """Append a latency sample, keeping the running sum in step with the deque."""
+        samples = self._latency_samples
+        if len(samples) == samples.maxlen:
+            self._latency_sum -= samples[0]  # Evicted by the append below
+        samples.append(latency)
+        self._latency_sum += latency
+
+    def _resolve_all(self, domains: List[str]) -> Dict[str, float]:
+        """Resolve domains concurrently so total time is the slowest lookup.
+
+        Args:
+            domains: Domain names to resolve
+
+        Returns:
+            Dict mapping domain -> latency in milliseconds, for the lookups
+            that succeeded
+        """
+        futures = {_DNS_POOL.submit(self._resolve_domain, domain): domain for domain in domains}
+        done, not_done = wait(futures, timeout=_RESOLVE_TIMEOUT_SECONDS)
+        # Lookups still queued behind slow ones are dropped rather than run late
+        for future in not_done:
+            future.cancel()
+
+        latencies = {}
+        for future in done:
+            latency = future.result()
+            if latency is not None:
+                latencies[futures[future]] = latency
+        return latencies
+
     def _resolve_domain(self, domain: str) -> Optional[float]:
         """Resolve a domain name and measure the time.
 
@@ -77,9 +162,12 @@ class DNSMonitor:
             Resolution time in milliseconds, or None if failed
         """
         try:
-            start = time.time()
-            socket.gethostbyname(domain)
-            elapsed = (time.time() - start) * 1000  # Convert to ms
+            start = time.perf_counter()
+            if self._resolver is not None:
+                self._resolver.resolve(domain, "A")
+            else:
+                socket.getaddrinfo(domain, None, type=socket.SOCK_STREAM)
+            elapsed = (time.perf_counter() - start) * 1000  # Convert to ms
             return elapsed
         except Exception as e:
             logger.debug(f"DNS resolution failed for {domain}: {e}")
@@ -93,7 +181,7 @@ class DNSMonitor:
         """
         if not self._latency_samples:
             return None
-        return sum(self._latency_samples) / len(self._latency_samples)
+        return self._latency_sum / len(self._latency_samples)
 
     def get_current_dns_latency(self) -> Optional[float]:
         """Get the most recent DNS latency measurement.
@@ -119,3 +207,5 @@ class DNSMonitor:
     def clear_samples(self) -> None:
         """Clear DNS latency samples (e.g., on session reset)."""
         self._latency_samples.clear()
+        self._latency_sum = 0.0
+        self._domain_latencies.clear()
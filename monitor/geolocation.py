@@ -1,20 +1,158 @@
 """IP geolocation service for external connections.
 
 Provides country lookup for IP addresses using free geolocation APIs.
-Results are cached to minimize API calls.
+Results are cached to minimize API calls: recently used entries in memory,
+everything else in a small SQLite database read on demand.
 """
 
+import atexit
+import http.client
 import json
+import socket
+import sqlite3
+import struct
+import threading
 import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Optional
-from urllib.error import URLError
-from urllib.request import Request, urlopen
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
 
 from config import STORAGE, get_logger
 
+try:
+    # Optional: orjson parses and serializes bytes directly and is several
+    # times faster than the stdlib for the dict-heavy cache file
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment,unused-ignore]
+
 logger = get_logger(__name__)
 
+# Batch requests are I/O-bound, so large lookups send their chunks side by side
+_LOOKUP_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="geolocation")
+
+# Keep-alive HTTP connections, one per host per thread (http.client isn't thread-safe)
+_http_local = threading.local()
+
+_HTTP_HEADERS = {"User-Agent": "NetworkMonitor/1.0"}
+
+# Live services, flushed once at exit; weak so registering doesn't keep them alive
+_services: "weakref.WeakSet[GeolocationService]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_services() -> None:
+    """Persist entries still pending in every live service when the process exits."""
+    for service in list(_services):
+        service.flush()
+
+
+def _http_request(url: str, body: Optional[bytes] = None, timeout: float = 3.0) -> bytes:
+    """Send a GET (or a JSON POST when ``body`` is given) over a reused connection.
+
+    Reusing the socket saves the TCP handshake on every lookup after the first.
+
+    Args:
+        url: Absolute http:// URL
+        body: JSON request body; switches the method to POST
+        timeout: Socket timeout in seconds
+
+    Returns:
+        Response body
+
+    Raises:
+        OSError: On connection failures, timeouts, or an HTTP error status
+        http.client.HTTPException: On a malformed response
+    """
+    parts = urlsplit(url)
+    path = f"{parts.path}?{parts.query}" if parts.query else parts.path
+    headers = dict(_HTTP_HEADERS)
+    if body is not None:
+        headers["Content-Type"] = "application/json"
+
+    connections = getattr(_http_local, "connections", None)
+    if connections is None:
+        connections = _http_local.connections = {}
+
+    # A kept-alive socket may have been closed by the server since the last
+    # request, so retry once on a fresh connection
+    for attempt in range(2):
+        conn = connections.get(parts.netloc)
+        reused = conn is not None
+        if conn is None:
+            conn = connections[parts.netloc] = http.client.HTTPConnection(
+                parts.netloc, timeout=timeout
+            )
+        try:
+            conn.request("POST" if body is not None else "GET", path, body=body, headers=headers)
+            response = conn.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            del connections[parts.netloc]
+            if reused and attempt == 0:
+                continue
+            raise
+        if response.status >= 400:
+            raise OSError(f"HTTP {response.status} from {parts.netloc}")
+        return data
+    raise OSError(f"Could not reach {parts.netloc}")
+
+
+# Display names for common country codes
+_COUNTRY_NAMES: Dict[str, str] = {
+    "US": "USA",
+    "GB": "UK",
+    "DE": "Germany",
+    "FR": "France",
+    "CA": "Canada",
+    "AU": "Australia",
+    "JP": "Japan",
+    "CN": "China",
+    "IN": "India",
+    "BR": "Brazil",
+    "MX": "Mexico",
+    "IT": "Italy",
+    "ES": "Spain",
+    "NL": "Netherlands",
+    "SE": "Sweden",
+    "NO": "Norway",
+    "DK": "Denmark",
+    "FI": "Finland",
+    "PL": "Poland",
+    "RU": "Russia",
+}
+
+# Private/local IPv4 blocks as (network, netmask) pairs of packed 32-bit ints
+_PRIVATE_V4_RANGES = (
+    (0x0A000000, 0xFF000000),  # 10.0.0.0/8
+    (0xC0A80000, 0xFFFF0000),  # 192.168.0.0/16
+    (0xAC100000, 0xFFF00000),  # 172.16.0.0/12
+    (0x7F000000, 0xFF000000),  # 127.0.0.0/8
+    (0xA9FE0000, 0xFFFF0000),  # 169.254.0.0/16 (link-local)
+)
+
+# First octets that can start a private address; anything else is public
+_PRIVATE_FIRST_OCTETS = frozenset({10, 127, 169, 172, 192})
+
+
+def _json_loads(data: bytes) -> Any:
+    """Parse JSON from raw bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj) -> bytes:
+    """Serialize an object to compact JSON bytes, using orjson when available."""
+    if orjson is not None:
+        encoded: bytes = orjson.dumps(obj)
+        return encoded
+    return json.dumps(obj, separators=(",", ":")).encode()
+
 
 class GeolocationService:
     """Provides IP geolocation lookup with caching.
@@ -26,12 +164,36 @@ class GeolocationService:
     # Free API endpoint (45 requests/minute limit)
     API_URL = "http://ip-api.com/json/{ip}?fields=status,country,countryCode"
 
-    # Cache file location
+    # Batch endpoint: up to 100 IPs per POST (15 requests/minute limit)
+    BATCH_API_URL = "http://ip-api.com/batch?fields=status,country,countryCode,query"
+    BATCH_SIZE = 100
+
+    # Cache database location, plus the JSON cache it replaced (migrated on first use)
+    CACHE_DB = "geolocation_cache.db"
     CACHE_FILE = "geolocation_cache.json"
 
     # Cache expiration (7 days)
     CACHE_EXPIRY_SECONDS = 7 * 24 * 60 * 60
 
+    # Failed lookups are remembered briefly so an unreachable API or an
+    # unresolvable IP doesn't cost a fresh request (and timeout) every poll
+    NEGATIVE_CACHE_EXPIRY_SECONDS = 5 * 60
+
+    # Hot in-memory entries; least recently used are evicted (they stay on disk)
+    MAX_CACHE_ENTRIES = 1000
+
+    # New entries to accumulate before writing them to the database
+    SAVE_EVERY_N_ENTRIES = 32
+
+    CACHE_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS geo (
+        ip TEXT PRIMARY KEY,
+        country_code TEXT NOT NULL,
+        country TEXT,
+        timestamp REAL NOT NULL
+    )
+    """
+
     def __init__(self, data_dir: Optional[Path] = None):
         """Initialize the geolocation service.
 
@@ -41,38 +203,106 @@ class GeolocationService:
         if data_dir is None:
             data_dir = Path.home() / STORAGE.DATA_DIR_NAME
         self.data_dir = data_dir
+        self.cache_db = data_dir / self.CACHE_DB
         self.cache_file = data_dir / self.CACHE_FILE
-        self._cache: Dict[str, dict] = {}
-        self._load_cache()
-        logger.debug(f"GeolocationService initialized, cache: {len(self._cache)} entries")
+        # Hot cache, ordered least to most recently used so eviction pops from the front
+        self._cache: "OrderedDict[str, dict]" = OrderedDict()
+        # Successful lookups not yet written to the database
+        self._pending: Dict[str, dict] = {}
+        # Opened on first use, so constructing the service does no disk I/O
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.RLock()
+        # Persist any entries still pending when the process exits
+        _services.add(self)
+        logger.debug("GeolocationService initialized")
+
+    def _db(self) -> Optional[sqlite3.Connection]:
+        """Return the cache database connection, opening it on first use.
+
+        Returns:
+            The connection, or None if the database couldn't be opened
+        """
+        with self._db_lock:
+            if self._conn is None:
+                try:
+                    self.data_dir.mkdir(parents=True, exist_ok=True)
+                    conn = sqlite3.connect(self.cache_db, check_same_thread=False)
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.execute("PRAGMA synchronous=NORMAL")
+                    conn.execute(self.CACHE_SCHEMA)
+                    conn.execute(
+                        "DELETE FROM geo WHERE timestamp < ?",
+                        (time.time() - self.CACHE_EXPIRY_SECONDS,),
+                    )
+                    conn.commit()
+                except (OSError, sqlite3.Error) as e:
+                    logger.error(f"Could not open geolocation cache: {e}")
+                    return None
+                self._conn = conn
+                self._migrate_json_cache(conn)
+            return self._conn
 
-    def _load_cache(self) -> None:
-        """Load geolocation cache from disk."""
+    def _migrate_json_cache(self, conn: sqlite3.Connection) -> None:
+        """Import unexpired entries from the old JSON cache file, then remove it."""
+        if not self.cache_file.exists():
+            return
         try:
-            if self.cache_file.exists():
-                with open(self.cache_file) as f:
-                    data = json.load(f)
-                    # Filter expired entries
-                    current_time = time.time()
-                    self._cache = {
-                        ip: entry
-                        for ip, entry in data.items()
-                        if current_time - entry.get("timestamp", 0) < self.CACHE_EXPIRY_SECONDS
-                    }
-                    logger.debug(f"Loaded {len(self._cache)} valid cache entries")
+            with open(self.cache_file, "rb") as f:
+                data = _json_loads(f.read())
+            cutoff = time.time() - self.CACHE_EXPIRY_SECONDS
+            rows = [
+                (ip, entry["country_code"], entry.get("country", ""), entry["timestamp"])
+                for ip, entry in data.items()
+                if entry.get("country_code") and entry.get("timestamp", 0) > cutoff
+            ]
+            conn.executemany("INSERT OR IGNORE INTO geo VALUES (?, ?, ?, ?)", rows)
+            conn.commit()
+            self.cache_file.unlink()
+            logger.debug(f"Migrated {len(rows)} geolocation cache entries to SQLite")
         except Exception as e:
-            logger.debug(f"Could not load geolocation cache: {e}")
-            self._cache = {}
+            logger.debug(f"Could not migrate geolocation cache: {e}")
+
+    def _load_entry(self, ip: str) -> Optional[dict]:
+        """Read an unexpired entry for an IP from the database."""
+        conn = self._db()
+        if conn is None:
+            return None
+        try:
+            with self._db_lock:
+                row = conn.execute(
+                    "SELECT country_code, country, timestamp FROM geo"
+                    " WHERE ip = ? AND timestamp > ?",
+                    (ip, time.time() - self.CACHE_EXPIRY_SECONDS),
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.debug(f"Geolocation cache read failed for {ip}: {e}")
+            return None
+        if row is None:
+            return None
+        return {"country_code": row[0], "country": row[1], "timestamp": row[2]}
 
     def _save_cache(self) -> None:
-        """Save geolocation cache to disk."""
+        """Write pending entries to the cache database in one transaction."""
+        conn = self._db()
+        if conn is None:
+            return
+        rows = [
+            (ip, entry["country_code"], entry.get("country", ""), entry["timestamp"])
+            for ip, entry in self._pending.items()
+        ]
         try:
-            self.data_dir.mkdir(parents=True, exist_ok=True)
-            with open(self.cache_file, "w") as f:
-                json.dump(self._cache, f, indent=2)
-        except Exception as e:
+            with self._db_lock:
+                conn.executemany("INSERT OR REPLACE INTO geo VALUES (?, ?, ?, ?)", rows)
+                conn.commit()
+            self._pending.clear()
+        except sqlite3.Error as e:
             logger.error(f"Could not save geolocation cache: {e}")
 
+    def flush(self) -> None:
+        """Write any unsaved cache entries to disk. Call on application shutdown."""
+        if self._pending:
+            self._save_cache()
+
     def _is_private_ip(self, ip: str) -> bool:
         """Check if IP is private/local.
 
@@ -80,31 +310,89 @@ class GeolocationService:
             ip: IP address string
 
         Returns:
-            True if IP is private (10.x, 192.168.x, 172.16-31.x, 127.x)
+            True if IP is private (10.x, 192.168.x, 172.16-31.x, 127.x, 169.254.x)
+            or not a valid dotted-quad IPv4 address
         """
-        parts = ip.split(".")
-        if len(parts) != 4:
-            return True
-
         try:
-            first = int(parts[0])
-            second = int(parts[1])
-
-            # Private IP ranges
-            if first == 10:
-                return True
-            if first == 192 and second == 168:
-                return True
-            if first == 172 and 16 <= second <= 31:
-                return True
-            if first == 127:
-                return True
-            if first == 169 and second == 254:  # Link-local
-                return True
-        except ValueError:
+            # inet_pton is strict: short forms like "1.2.3" are rejected
+            value: int = struct.unpack("!I", socket.inet_pton(socket.AF_INET, ip))[0]
+        except (OSError, TypeError):
             return True
+        # Most observed IPs are public, so reject on the first octet before range matching
+        if value >> 24 not in _PRIVATE_FIRST_OCTETS:
+            return False
+        return any(value & mask == network for network, mask in _PRIVATE_V4_RANGES)
+
+    def _is_fresh(self, entry: dict, now: float) -> bool:
+        """Check whether a cache entry is still within its expiry."""
+        if entry.get("negative"):
+            expiry = self.NEGATIVE_CACHE_EXPIRY_SECONDS
+        else:
+            expiry = self.CACHE_EXPIRY_SECONDS
+        timestamp: float = entry.get("timestamp", 0)
+        return now - timestamp < expiry
+
+    def _get_cached(self, ip: str) -> Optional[dict]:
+        """Return the unexpired cache entry for an IP, marking it recently used.
+
+        Checks the hot cache first and falls back to the database, promoting
+        what it finds. Negative entries (recent failed lookups) are returned
+        too; their ``country_code`` is None.
+        """
+        entry = self._cache.get(ip)
+        if entry is None:
+            entry = self._pending.get(ip) or self._load_entry(ip)
+            if entry is None:
+                return None
+            self._put(ip, entry)
+            return entry
+        if not self._is_fresh(entry, time.time()):
+            return None
+        self._cache.move_to_end(ip)
+        return entry
+
+    def _put(self, ip: str, entry: dict) -> None:
+        """Insert a cache entry as most recently used, evicting the LRU entry if full."""
+        self._cache[ip] = entry
+        self._cache.move_to_end(ip)
+        if len(self._cache) > self.MAX_CACHE_ENTRIES:
+            self._cache.popitem(last=False)
+
+    def _remember_failure(self, ip: str) -> None:
+        """Cache a failed lookup for NEGATIVE_CACHE_EXPIRY_SECONDS."""
+        self._put(ip, {"country_code": None, "timestamp": time.time(), "negative": True})
+
+    def _store(self, ip: str, data: dict) -> Optional[str]:
+        """Cache a successful API result for an IP.
+
+        Args:
+            ip: IP address that was looked up
+            data: Decoded API response for that IP
+
+        Returns:
+            Country code, or None if the response wasn't a successful lookup
+            (which is then cached as a negative entry)
+        """
+        country_code: Optional[str] = (
+            data.get("countryCode") if data.get("status") == "success" else None
+        )
+        if not country_code:
+            self._remember_failure(ip)
+            return None
 
-        return False
+        entry = {
+            "country_code": country_code,
+            "country": data.get("country", ""),
+            "timestamp": time.time(),
+        }
+        self._put(ip, entry)
+        self._pending[ip] = entry
+        return country_code
+
+    def _maybe_save_cache(self) -> None:
+        """Write new entries to the database once enough have accumulated."""
+        if len(self._pending) >= self.SAVE_EVERY_N_ENTRIES:
+            self._save_cache()
 
     def lookup_country(self, ip: str) -> Optional[str]:
         """Look up country for an IP address.
@@ -119,35 +407,86 @@ class GeolocationService:
             return None
 
         # Check cache first
-        if ip in self._cache:
-            entry = self._cache[ip]
-            if time.time() - entry.get("timestamp", 0) < self.CACHE_EXPIRY_SECONDS:
-                return entry.get("country_code")
+        entry = self._get_cached(ip)
+        if entry is not None:
+            return entry.get("country_code")
 
         # Lookup via API
         try:
-            url = self.API_URL.format(ip=ip)
-            request = Request(url, headers={"User-Agent": "NetworkMonitor/1.0"})
-
-            with urlopen(request, timeout=3.0) as response:
-                data = json.loads(response.read().decode())
-
-                if data.get("status") == "success":
-                    country_code = data.get("countryCode")
-                    if country_code:
-                        # Cache the result
-                        self._cache[ip] = {
-                            "country_code": country_code,
-                            "country": data.get("country", ""),
-                            "timestamp": time.time(),
-                        }
-                        self._save_cache()
-                        return country_code
-        except (URLError, json.JSONDecodeError, KeyError, ValueError) as e:
+            data = _json_loads(_http_request(self.API_URL.format(ip=ip)))
+            country_code = self._store(ip, data)
+            self._maybe_save_cache()
+            return country_code
+        except (OSError, http.client.HTTPException, KeyError, ValueError, AttributeError) as e:
             logger.debug(f"Geolocation lookup failed for {ip}: {e}")
+            self._remember_failure(ip)
 
         return None
 
+    def lookup_countries(self, ips: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Look up countries for many IP addresses at once.
+
+        Uncached public IPs are resolved through the batch endpoint, so N new
+        addresses cost ceil(N / BATCH_SIZE) requests instead of N. When there
+        is more than one chunk, the requests are sent concurrently.
+
+        Args:
+            ips: IP addresses to look up
+
+        Returns:
+            Dict mapping each IP -> country code, or None if lookup failed
+        """
+        results: Dict[str, Optional[str]] = {}
+        pending: List[str] = []
+        for ip in dict.fromkeys(ips):
+            if not ip or self._is_private_ip(ip):
+                results[ip] = None
+                continue
+            entry = self._get_cached(ip)
+            if entry is not None:
+                results[ip] = entry.get("country_code")
+            else:
+                pending.append(ip)
+
+        chunks = [
+            pending[start : start + self.BATCH_SIZE]
+            for start in range(0, len(pending), self.BATCH_SIZE)
+        ]
+        # Fetch concurrently, but only touch the cache from this thread
+        for chunk, responses in zip(chunks, _LOOKUP_POOL.map(self._fetch_batch, chunks)):
+            chunk_ips = set(chunk)
+            answered = set()
+            for data in responses:
+                query_ip: str = data.get("query", "")
+                if query_ip in chunk_ips:
+                    answered.add(query_ip)
+                    results[query_ip] = self._store(query_ip, data)
+            # IPs the API didn't answer for (or the whole request failed)
+            for ip in chunk_ips - answered:
+                results[ip] = None
+                self._remember_failure(ip)
+
+        self._maybe_save_cache()
+        return results
+
+    def _fetch_batch(self, ips: List[str]) -> List[dict]:
+        """POST one chunk of IPs to the batch endpoint.
+
+        Args:
+            ips: Up to BATCH_SIZE IP addresses
+
+        Returns:
+            Per-IP result dicts from the API, or an empty list if the request failed
+        """
+        try:
+            data = _json_loads(_http_request(self.BATCH_API_URL, body=_json_dumps(ips)))
+            if not isinstance(data, list):
+                raise ValueError(f"unexpected batch response: {data!r}")
+            return [entry for entry in data if isinstance(entry, dict)]
+        except (OSError, http.client.HTTPException, ValueError) as e:
+            logger.debug(f"Geolocation batch lookup failed for {len(ips)} IPs: {e}")
+            return []
+
     def get_country_name(self, country_code: str) -> str:
         """Get country name from country code.
 
@@ -157,27 +496,4 @@ class GeolocationService:
         Returns:
             Country name or code if not found
         """
-        # Basic mapping for common countries
-        country_names = {
-            "US": "USA",
-            "GB": "UK",
-            "DE": "Germany",
-            "FR": "France",
-            "CA": "Canada",
-            "AU": "Australia",
-            "JP": "Japan",
-            "CN": "China",
-            "IN": "India",
-            "BR": "Brazil",
-            "MX": "Mexico",
-            "IT": "Italy",
-            "ES": "Spain",
-            "NL": "Netherlands",
-            "SE": "Sweden",
-            "NO": "Norway",
-            "DK": "Denmark",
-            "FI": "Finland",
-            "PL": "Poland",
-            "RU": "Russia",
-        }
-        return country_names.get(country_code, country_code)
+        return _COUNTRY_NAMES.get(country_code, country_code)
@@ -1,16 +1,35 @@
 """Network issue detection and logging."""
 
+import re
+import shutil
+import socket
 import time
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from config import INTERVALS, NETWORK, THRESHOLDS, get_logger
 from config.subprocess_cache import safe_run
+from monitor.utils import DATACLASS_SLOTS
 
 logger = get_logger(__name__)
 
+# Absolute path to ping, resolved once. An absolute executable lets
+# subprocess use posix_spawn instead of fork+exec (see _icmp_ping).
+_PING_BIN = shutil.which("ping") or "ping"
+
+# Latency patterns for different ping output formats, tried in order
+_PING_PATTERNS = (
+    # "time=9.742 ms" or "time<1 ms"
+    re.compile(r"time[=<](\d+\.?\d*)\s*ms"),
+    # macOS summary "round-trip min/avg/max/stddev = X/Y/Z/W ms"
+    re.compile(r"round-trip.*?=\s*[\d.]+/([\d.]+)/"),
+    # Fallback: any number before "ms"
+    re.compile(r"(\d+\.?\d*)\s*ms"),
+)
+
 
 class IssueType(Enum):
     """Types of network issues."""
@@ -23,11 +42,45 @@ class IssueType(Enum):
     QUALITY_DROP = "quality_drop"
 
 
-@dataclass
+# Troubleshooting tips per diagnosed quality-drop cause
+_TROUBLESHOOTING_TIPS: Dict[str, Tuple[str, ...]] = {
+    "high_latency": (
+        "Check if other devices are using bandwidth",
+        "Try moving closer to your WiFi router",
+        "Restart your router/modem",
+        "Check for background downloads or updates",
+        "Consider using a wired connection",
+    ),
+    "high_jitter": (
+        "Network connection is unstable",
+        "May indicate WiFi interference",
+        "Try changing WiFi channel",
+        "Check for microwave or other interference",
+        "Consider using 5GHz instead of 2.4GHz",
+    ),
+    "poor_connection": (
+        "Connection quality is degraded",
+        "Check signal strength",
+        "Restart network equipment",
+        "Contact your ISP if issue persists",
+        "Check for service outages in your area",
+    ),
+    "network_congestion": (
+        "Network may be congested",
+        "Too many devices or applications using bandwidth",
+        "Try limiting active connections",
+        "Schedule large downloads for off-peak hours",
+    ),
+}
+_DEFAULT_TIPS: Tuple[str, ...] = ("Check your network connection",)
+
+
+# Issues are kept by the hundred, hence slots
+@dataclass(**DATACLASS_SLOTS)
 class NetworkIssue:
     """Represents a detected network issue."""
 
-    timestamp: datetime
+    timestamp: float  # Epoch seconds; formatted only when serialized
     issue_type: IssueType
     description: str
     details: dict = field(default_factory=dict)
@@ -35,7 +88,7 @@ class NetworkIssue:
     def to_dict(self) -> dict:
         """Convert to dictionary for JSON serialization."""
         return {
-            "timestamp": self.timestamp.isoformat(),
+            "timestamp": datetime.fromtimestamp(self.timestamp).isoformat(),
             "type": self.issue_type.value,
             "description": self.description,
             "details": self.details,
@@ -45,7 +98,7 @@ class NetworkIssue:
     def from_dict(cls, data: dict) -> "NetworkIssue":
         """Create from dictionary."""
         return cls(
-            timestamp=datetime.fromisoformat(data["timestamp"]),
+            timestamp=datetime.fromisoformat(data["timestamp"]).timestamp(),
             issue_type=IssueType(data["type"]),
             description=data["description"],
             details=data.get("details", {}),
@@ -59,31 +112,37 @@ class IssueDetector:
     HIGH_LATENCY_MS = THRESHOLDS.HIGH_LATENCY_MS
     SPEED_DROP_THRESHOLD = THRESHOLDS.SPEED_DROP_RATIO
     PING_HOST = NETWORK.DEFAULT_PING_HOST
+    # Port for the TCP handshake probe (8.8.8.8 and most public hosts serve HTTPS)
+    PING_PORT = 443
 
     def __init__(self, max_issues: int = None, event_bus=None):
-        self._issues: List[NetworkIssue] = []
         self._max_issues = max_issues or THRESHOLDS.MAX_ISSUES_STORED
+        # Bounded ring buffer: appending past max_issues drops the oldest issue
+        self._issues: deque = deque(maxlen=self._max_issues)
         self._was_connected = True
+        # Interval bookkeeping below uses time.monotonic() so wall-clock
+        # adjustments can't skip or stall checks; issues keep wall-clock timestamps
         self._last_disconnect_time: Optional[float] = None
-        self._last_latency_check: float = 0
+        self._last_latency_check: float = float("-inf")
         self._latency_check_interval = (
             INTERVALS.LATENCY_CHECK_SECONDS * 3
         )  # Less frequent for issue check
         self._average_speed: float = 0
         self._last_quality_score: Optional[int] = None
-        self._quality_drop_cooldown: float = 0  # Prevent spamming
+        self._quality_drop_cooldown: float = float("-inf")  # Last alert; prevents spamming
         self._event_bus = event_bus  # Optional event bus for publishing events
         logger.debug("IssueDetector initialized")
 
     def check_connectivity(self, is_connected: bool) -> Optional[NetworkIssue]:
         """Check for connectivity changes and log issues."""
         issue = None
+        current_time = time.time()
 
         if not is_connected and self._was_connected:
             # Just disconnected
-            self._last_disconnect_time = time.time()
+            self._last_disconnect_time = time.monotonic()
             issue = NetworkIssue(
-                timestamp=datetime.now(),
+                timestamp=current_time,
                 issue_type=IssueType.DISCONNECT,
                 description="Network connection lost",
             )
@@ -93,10 +152,10 @@ class IssueDetector:
             # Just reconnected
             duration = 0
             if self._last_disconnect_time:
-                duration = int(time.time() - self._last_disconnect_time)
+                duration = int(time.monotonic() - self._last_disconnect_time)
 
             issue = NetworkIssue(
-                timestamp=datetime.now(),
+                timestamp=current_time,
                 issue_type=IssueType.RECONNECT,
                 description=f"Network reconnected after {duration}s",
                 details={"downtime_seconds": duration},
@@ -109,12 +168,12 @@ class IssueDetector:
 
     def check_latency(self, force: bool = False) -> Optional[NetworkIssue]:
         """Check network latency via ping."""
-        current_time = time.time()
+        now = time.monotonic()
 
-        if not force and (current_time - self._last_latency_check) < self._latency_check_interval:
+        if not force and (now - self._last_latency_check) < self._latency_check_interval:
             return None
 
-        self._last_latency_check = current_time
+        self._last_latency_check = now
         latency = self._ping()
 
         if latency is None:
@@ -123,7 +182,7 @@ class IssueDetector:
 
         if latency > self.HIGH_LATENCY_MS:
             issue = NetworkIssue(
-                timestamp=datetime.now(),
+                timestamp=time.time(),
                 issue_type=IssueType.HIGH_LATENCY,
                 description=f"High latency detected: {latency:.0f}ms",
                 details={"latency_ms": latency},
@@ -149,7 +208,7 @@ class IssueDetector:
             and average_speed > THRESHOLDS.MIN_SPEED_FOR_DROP_ALERT
         ):
             issue = NetworkIssue(
-                timestamp=datetime.now(),
+                timestamp=time.time(),
                 issue_type=IssueType.SPEED_DROP,
                 description=f"Speed dropped to {ratio*100:.0f}% of average",
                 details={
@@ -182,10 +241,10 @@ class IssueDetector:
         if current_score is None:
             return None
 
-        current_time = time.time()
+        now = time.monotonic()
 
         # Cooldown to prevent spam (minimum 60 seconds between quality drop alerts)
-        if current_time - self._quality_drop_cooldown < 60:
+        if now - self._quality_drop_cooldown < 60:
             self._last_quality_score = current_score
             return None
 
@@ -201,7 +260,7 @@ class IssueDetector:
                 cause = self._diagnose_quality_drop(current_score, latency, jitter)
 
                 issue = NetworkIssue(
-                    timestamp=datetime.now(),
+                    timestamp=time.time(),
                     issue_type=IssueType.QUALITY_DROP,
                     description=f"Quality dropped: {self._last_quality_score}% → {current_score}%",
                     details={
@@ -215,7 +274,7 @@ class IssueDetector:
                     },
                 )
                 self._add_issue(issue)
-                self._quality_drop_cooldown = current_time
+                self._quality_drop_cooldown = now
 
                 # Publish event for quality degradation
                 if self._event_bus:
@@ -250,41 +309,12 @@ class IssueDetector:
 
     def _get_troubleshooting_tips(self, cause: str) -> List[str]:
         """Get troubleshooting tips based on the cause."""
-        tips = {
-            "high_latency": [
-                "Check if other devices are using bandwidth",
-                "Try moving closer to your WiFi router",
-                "Restart your router/modem",
-                "Check for background downloads or updates",
-                "Consider using a wired connection",
-            ],
-            "high_jitter": [
-                "Network connection is unstable",
-                "May indicate WiFi interference",
-                "Try changing WiFi channel",
-                "Check for microwave or other interference",
-                "Consider using 5GHz instead of 2.4GHz",
-            ],
-            "poor_connection": [
-                "Connection quality is degraded",
-                "Check signal strength",
-                "Restart network equipment",
-                "Contact your ISP if issue persists",
-                "Check for service outages in your area",
-            ],
-            "network_congestion": [
-                "Network may be congested",
-                "Too many devices or applications using bandwidth",
-                "Try limiting active connections",
-                "Schedule large downloads for off-peak hours",
-            ],
-        }
-        return tips.get(cause, ["Check your network connection"])
+        return list(_TROUBLESHOOTING_TIPS.get(cause, _DEFAULT_TIPS))
 
     def log_connection_change(self, old_conn: str, new_conn: str) -> NetworkIssue:
         """Log a connection change event."""
         issue = NetworkIssue(
-            timestamp=datetime.now(),
+            timestamp=time.time(),
             issue_type=IssueType.CONNECTION_CHANGE,
             description=f"Connection changed: {old_conn} → {new_conn}",
             details={"from": old_conn, "to": new_conn},
@@ -293,32 +323,55 @@ class IssueDetector:
         return issue
 
     def _ping(self, host: str = None) -> Optional[float]:
-        """Ping and return latency in milliseconds."""
+        """Ping and return latency in milliseconds.
+
+        Times a TCP handshake first, which avoids spawning a process per check,
+        and falls back to ICMP ``ping`` for hosts that don't answer on PING_PORT.
+        """
         target = host or self.PING_HOST
+        latency = self._tcp_ping(target)
+        if latency is None:
+            latency = self._icmp_ping(target)
+        return latency
+
+    def _tcp_ping(self, host: str, port: Optional[int] = None) -> Optional[float]:
+        """Time a TCP connect to the host and return the latency in milliseconds.
+
+        Args:
+            host: Host to probe
+            port: TCP port to connect to (defaults to PING_PORT)
+
+        Returns:
+            Handshake round-trip time in milliseconds, or None if the host
+            couldn't be reached
+        """
+        start = time.perf_counter()
+        try:
+            with socket.create_connection(
+                (host, port or self.PING_PORT), timeout=INTERVALS.PING_TIMEOUT_SECONDS
+            ):
+                pass
+        except ConnectionRefusedError:
+            pass  # A RST still took one round trip, so it's a valid measurement
+        except OSError:
+            return None
+        return (time.perf_counter() - start) * 1000
+
+    def _icmp_ping(self, target: str) -> Optional[float]:
+        """Run the system ping command and return latency in milliseconds."""
         try:
+            # close_fds=False is needed for the posix_spawn fast path; Python's
+            # own descriptors are non-inheritable by default, so none leak to ping
             result = safe_run(
-                ["ping", "-c", "1", "-W", "2", target],
+                [_PING_BIN, "-c", "1", "-W", "2", target],
                 timeout=INTERVALS.PING_TIMEOUT_SECONDS + 3,  # Allow for ping timeout + overhead
+                close_fds=False,
             )
             if result.returncode == 0:
-                import re
-
-                # Try multiple patterns for different ping output formats
-
-                # Pattern 1: "time=9.742 ms" or "time<1 ms"
-                match = re.search(r"time[=<](\d+\.?\d*)\s*ms", result.stdout)
-                if match:
-                    return float(match.group(1))
-
-                # Pattern 2: macOS format "round-trip min/avg/max/stddev = X/Y/Z/W ms"
-                match = re.search(r"round-trip.*?=\s*[\d.]+/([\d.]+)/", result.stdout)
-                if match:
-                    return float(match.group(1))
-
-                # Pattern 3: Just look for any number before "ms"
-                match = re.search(r"(\d+\.?\d*)\s*ms", result.stdout)
-                if match:
-                    return float(match.group(1))
+                for pattern in _PING_PATTERNS:
+                    match = pattern.search(result.stdout)
+                    if match:
+                        return float(match.group(1))
         except Exception:
             pass  # nosec B110 - Ping failures expected, return None
         return None
@@ -334,16 +387,14 @@ class IssueDetector:
     def _add_issue(self, issue: NetworkIssue) -> None:
         """Add an issue to the log, maintaining max size."""
         self._issues.append(issue)
-        if len(self._issues) > self._max_issues:
-            self._issues.pop(0)
 
     def get_recent_issues(self, count: int = 10) -> List[NetworkIssue]:
         """Get the most recent issues."""
-        return self._issues[-count:]
+        return list(self._issues)[-count:]
 
     def get_all_issues(self) -> List[NetworkIssue]:
         """Get all logged issues."""
-        return self._issues.copy()
+        return list(self._issues)
 
     def get_issues_as_dicts(self) -> List[dict]:
         """Get all issues as dictionaries for JSON serialization."""
@@ -351,7 +402,9 @@ class IssueDetector:
 
     def load_issues(self, issues_data: List[dict]) -> None:
         """Load issues from dictionary data."""
-        self._issues = [NetworkIssue.from_dict(d) for d in issues_data]
+        self._issues = deque(
+            (NetworkIssue.from_dict(d) for d in issues_data), maxlen=self._max_issues
+        )
 
     def clear_issues(self) -> None:
         """Clear all logged issues."""
@@ -4,20 +4,83 @@ Exports network monitoring metrics to time-series databases
 for long-term storage and Grafana dashboards.
 """
 
-from typing import Dict
+import http.client
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
 
 from config import get_logger
 
+try:
+    # Optional: InfluxDB export (pip install influxdb-client)
+    import influxdb_client
+    from influxdb_client.client.write_api import SYNCHRONOUS
+except ImportError:
+    influxdb_client = None
+    SYNCHRONOUS = None
+
+try:
+    # Optional: Prometheus Pushgateway export (pip install prometheus-client)
+    import prometheus_client
+except ImportError:
+    prometheus_client = None
+
 logger = get_logger(__name__)
 
+# Prometheus gauges: (export data key, metric name, help text)
+_PROMETHEUS_GAUGES = (
+    ("upload_speed", "network_upload_speed_bytes", "Upload speed in bytes/sec"),
+    ("download_speed", "network_download_speed_bytes", "Download speed in bytes/sec"),
+    ("latency_ms", "network_latency_ms", "Network latency in milliseconds"),
+    ("quality_score", "network_quality_score", "Network quality score (0-100)"),
+    ("device_count", "network_device_count", "Number of network devices"),
+)
+
 
 class MetricsExporter:
     """Exports metrics to InfluxDB or Prometheus."""
 
+    # Points to buffer before writing them to InfluxDB in one request
+    INFLUX_BATCH_SIZE = 100
+
+    # Maximum seconds a buffered point waits before the batch is written
+    INFLUX_FLUSH_INTERVAL_SECONDS = 1.0
+
+    # Buffered points kept while InfluxDB is unreachable; oldest are dropped
+    INFLUX_MAX_BUFFERED = 1000
+
+    # Consecutive Pushgateway failures before pushes are paused
+    PUSH_MAX_FAILURES = 3
+
+    # Seconds to stop pushing after PUSH_MAX_FAILURES, so a down gateway isn't hammered
+    PUSH_BACKOFF_SECONDS = 60.0
+
+    # Samples waiting for the continuous exporter; new samples are dropped when full
+    EXPORT_QUEUE_SIZE = 10_000
+
     def __init__(self):
         """Initialize the metrics exporter."""
+        # Client and write API are kept open across exports to the same target
         self._influx_client = None
-        self._prometheus_enabled = False
+        self._influx_write_api = None
+        self._influx_target: Optional[Tuple[str, str, str, str]] = None
+        self._influx_buffer: List = []
+        # -inf so the first point is written immediately
+        self._last_flush = float("-inf")
+        # Registry and gauges are built once and updated in place on each push
+        self._prom_registry = None
+        self._prom_gauges: Dict[str, Any] = {}  # key -> prometheus_client.Gauge
+        # Keep-alive connection to the Pushgateway, keyed by (scheme, netloc)
+        self._push_conn: Optional[http.client.HTTPConnection] = None
+        self._push_conn_key: Optional[Tuple[str, str]] = None
+        self._push_failures = 0
+        self._push_paused_until = float("-inf")
+        # Continuous export: record() feeds the queue, a daemon thread drains it
+        self._export_queue: Optional[queue.Queue] = None
+        self._export_thread: Optional[threading.Thread] = None
+        self._export_stop = threading.Event()
         logger.debug("MetricsExporter initialized")
 
     def export_to_influxdb(
@@ -25,6 +88,10 @@ class MetricsExporter:
     ) -> bool:
         """Export metrics to InfluxDB.
 
+        Points are buffered and written in batches of INFLUX_BATCH_SIZE, or
+        once INFLUX_FLUSH_INTERVAL_SECONDS has passed since the last write.
+        Call close() to write any remaining points.
+
         Args:
             data: Dictionary with metrics (upload_speed, download_speed, latency, etc.)
             endpoint: InfluxDB endpoint URL
@@ -33,42 +100,104 @@ class MetricsExporter:
             bucket: InfluxDB bucket name
 
         Returns:
-            True if export succeeded, False otherwise
+            True if the point was written or buffered, False otherwise
         """
         try:
-            # Try to import influxdb-client (optional dependency)
-            try:
-                from influxdb_client import InfluxDBClient, Point
-                from influxdb_client.client.write_api import SYNCHRONOUS
-            except ImportError:
-                logger.warning(
-                    "influxdb-client not installed. Install with: pip install influxdb-client"
-                )
+            if not self._buffer_influx_point(data, endpoint, token, org, bucket):
                 return False
+            if (
+                len(self._influx_buffer) >= self.INFLUX_BATCH_SIZE
+                or time.monotonic() - self._last_flush >= self.INFLUX_FLUSH_INTERVAL_SECONDS
+            ):
+                return self._flush_influx()
+            return True
+        except Exception as e:
+            logger.error(f"InfluxDB export error: {e}", exc_info=True)
+            return False
 
-            # Create client
-            client = InfluxDBClient(url=endpoint, token=token, org=org)
-            write_api = client.write_api(write_options=SYNCHRONOUS)
-
-            # Create data point
-            point = (
-                Point("network_metrics")
-                .field("upload_speed", data.get("upload_speed", 0))
-                .field("download_speed", data.get("download_speed", 0))
-                .field("latency_ms", data.get("latency_ms", 0))
-                .field("quality_score", data.get("quality_score", 0))
-                .field("device_count", data.get("device_count", 0))
+    def _buffer_influx_point(
+        self, data: Dict, endpoint: str, token: str, org: str, bucket: str
+    ) -> bool:
+        """Add a data point to the InfluxDB buffer without writing it.
+
+        Args:
+            data: Dictionary with metrics, as for export_to_influxdb
+            endpoint: InfluxDB endpoint URL
+            token: InfluxDB authentication token
+            org: InfluxDB organization
+            bucket: InfluxDB bucket name
+
+        Returns:
+            True if the point was buffered, False if influxdb-client is missing
+        """
+        if influxdb_client is None:
+            logger.warning(
+                "influxdb-client not installed. Install with: pip install influxdb-client"
             )
+            return False
+
+        # Reuse the client while the target is unchanged
+        target = (endpoint, token, org, bucket)
+        if target != self._influx_target:
+            self._close_influx()
+            self._influx_client = influxdb_client.InfluxDBClient(url=endpoint, token=token, org=org)
+            self._influx_write_api = self._influx_client.write_api(write_options=SYNCHRONOUS)
+            self._influx_target = target
 
-            # Write to InfluxDB
-            write_api.write(bucket=bucket, org=org, record=point)
-            client.close()
+        # Create data point
+        point = (
+            influxdb_client.Point("network_metrics")
+            .field("upload_speed", data.get("upload_speed", 0))
+            .field("download_speed", data.get("download_speed", 0))
+            .field("latency_ms", data.get("latency_ms", 0))
+            .field("quality_score", data.get("quality_score", 0))
+            .field("device_count", data.get("device_count", 0))
+        )
+        self._influx_buffer.append(point)
+        return True
 
-            logger.debug("Metrics exported to InfluxDB")
+    def _flush_influx(self) -> bool:
+        """Write buffered points to InfluxDB in a single request.
+
+        Returns:
+            True if the buffer was written (or empty), False otherwise
+        """
+        target = self._influx_target
+        if not self._influx_buffer or self._influx_write_api is None or target is None:
             return True
+        _, _, org, bucket = target
+        points, self._influx_buffer = self._influx_buffer, []
+        try:
+            self._influx_write_api.write(bucket=bucket, org=org, record=points)
         except Exception as e:
             logger.error(f"InfluxDB export error: {e}", exc_info=True)
+            # Keep the points for the next attempt, within bounds
+            self._influx_buffer = points[-self.INFLUX_MAX_BUFFERED :]
             return False
+        finally:
+            self._last_flush = time.monotonic()
+        logger.debug(f"Exported {len(points)} points to InfluxDB")
+        return True
+
+    def _close_influx(self) -> None:
+        """Flush pending points and close the InfluxDB client, if open."""
+        if self._influx_client is None:
+            return
+        self._flush_influx()
+        try:
+            self._influx_client.close()
+        except Exception as e:
+            logger.debug(f"Error closing InfluxDB client: {e}")
+        self._influx_client = None
+        self._influx_write_api = None
+        self._influx_target = None
+        self._influx_buffer.clear()
+
+    def close(self) -> None:
+        """Write any buffered metrics and release connections. Call on shutdown."""
+        self.stop_continuous_export()
+        self._close_influx()
+        self._close_push_connection()
 
     def export_to_prometheus(
         self, data: Dict, gateway_url: str, job: str = "network_monitor"
@@ -84,43 +213,42 @@ class MetricsExporter:
             True if export succeeded, False otherwise
         """
         try:
-            # Try to import prometheus_client (optional dependency)
-            try:
-                from prometheus_client import CollectorRegistry, Gauge, push_to_gateway
-            except ImportError:
+            if prometheus_client is None:
                 logger.warning(
                     "prometheus-client not installed. Install with: pip install prometheus-client"
                 )
                 return False
 
-            # Create registry and metrics
-            registry = CollectorRegistry()
+            if time.monotonic() < self._push_paused_until:
+                logger.debug("Prometheus push skipped: Pushgateway recently unreachable")
+                return False
 
-            upload_gauge = Gauge(
-                "network_upload_speed_bytes", "Upload speed in bytes/sec", registry=registry
-            )
-            download_gauge = Gauge(
-                "network_download_speed_bytes", "Download speed in bytes/sec", registry=registry
-            )
-            latency_gauge = Gauge(
-                "network_latency_ms", "Network latency in milliseconds", registry=registry
-            )
-            quality_gauge = Gauge(
-                "network_quality_score", "Network quality score (0-100)", registry=registry
-            )
-            device_gauge = Gauge(
-                "network_device_count", "Number of network devices", registry=registry
-            )
+            if self._prom_registry is None:
+                self._prom_registry = prometheus_client.CollectorRegistry()
+                self._prom_gauges = {
+                    key: prometheus_client.Gauge(name, help_text, registry=self._prom_registry)
+                    for key, name, help_text in _PROMETHEUS_GAUGES
+                }
 
             # Set metric values
-            upload_gauge.set(data.get("upload_speed", 0))
-            download_gauge.set(data.get("download_speed", 0))
-            latency_gauge.set(data.get("latency_ms", 0))
-            quality_gauge.set(data.get("quality_score", 0))
-            device_gauge.set(data.get("device_count", 0))
+            for key, gauge in self._prom_gauges.items():
+                gauge.set(data.get(key, 0))
 
-            # Push to gateway
-            push_to_gateway(gateway_url, job=job, registry=registry)
+            # Push to gateway over a reused connection
+            try:
+                prometheus_client.push_to_gateway(
+                    gateway_url,
+                    job=job,
+                    registry=self._prom_registry,
+                    handler=self._keepalive_handler,
+                )
+            except Exception:
+                self._push_failures += 1
+                if self._push_failures >= self.PUSH_MAX_FAILURES:
+                    self._push_paused_until = time.monotonic() + self.PUSH_BACKOFF_SECONDS
+                    self._push_failures = 0
+                raise
+            self._push_failures = 0
 
             logger.debug("Metrics exported to Prometheus Pushgateway")
             return True
@@ -128,15 +256,153 @@ class MetricsExporter:
             logger.error(f"Prometheus export error: {e}", exc_info=True)
             return False
 
+    def _keepalive_handler(
+        self, url: str, method: str, timeout: Optional[float], headers: List, data: bytes
+    ) -> Callable[[], None]:
+        """Pushgateway handler that sends requests over a persistent connection.
+
+        Matches the ``handler`` signature expected by ``push_to_gateway``.
+        """
+
+        def handle() -> None:
+            parts = urlsplit(url)
+            path = parts.path + (f"?{parts.query}" if parts.query else "")
+            # A reused connection may have been closed by the server; retry once fresh
+            for attempt in range(2):
+                conn = self._push_connection(parts.scheme, parts.netloc, timeout)
+                try:
+                    conn.request(method, path, body=data, headers=dict(headers))
+                    response = conn.getresponse()
+                    response.read()
+                    break
+                except (OSError, http.client.HTTPException):
+                    self._close_push_connection()
+                    if attempt:
+                        raise
+            if response.status >= 400:
+                raise OSError(f"Pushgateway error: {response.status} {response.reason}")
+
+        return handle
+
+    def _push_connection(
+        self, scheme: str, netloc: str, timeout: Optional[float]
+    ) -> http.client.HTTPConnection:
+        """Return the open Pushgateway connection, creating it if needed."""
+        if self._push_conn is None or self._push_conn_key != (scheme, netloc):
+            self._close_push_connection()
+            conn_cls = (
+                http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            )
+            self._push_conn = conn_cls(netloc, timeout=timeout)
+            self._push_conn_key = (scheme, netloc)
+        return self._push_conn
+
+    def _close_push_connection(self) -> None:
+        """Close the Pushgateway connection, if open."""
+        if self._push_conn is not None:
+            self._push_conn.close()
+            self._push_conn = None
+            self._push_conn_key = None
+
     def start_continuous_export(self, interval: int, export_type: str, **kwargs) -> None:
         """Start continuous background export.
 
+        Samples passed to record() are exported by a daemon thread. InfluxDB
+        points are written together every ``interval`` seconds, or sooner
+        once INFLUX_BATCH_SIZE are buffered;
+        the Pushgateway only keeps the latest value, so the newest sample is
+        pushed once per interval.
+
         Args:
             interval: Export interval in seconds
             export_type: 'influxdb' or 'prometheus'
-            **kwargs: Export-specific parameters
+            **kwargs: Export-specific parameters (endpoint/token/org/bucket for
+                InfluxDB, gateway_url/job for Prometheus)
+        """
+        if export_type not in ("influxdb", "prometheus"):
+            logger.error(f"Unknown export type: {export_type}")
+            return
+        if self._export_thread is not None and self._export_thread.is_alive():
+            logger.warning("Continuous export is already running")
+            return
+
+        self._export_queue = queue.Queue(maxsize=self.EXPORT_QUEUE_SIZE)
+        self._export_stop.clear()
+        self._export_thread = threading.Thread(
+            target=self._export_worker,
+            args=(self._export_queue, interval, export_type, kwargs),
+            name="metrics-export",
+            daemon=True,
+        )
+        self._export_thread.start()
+        logger.info(f"Continuous {export_type} export started (interval: {interval}s)")
+
+    def record(self, data: Dict) -> bool:
+        """Queue a metrics sample for continuous export without blocking.
+
+        Args:
+            data: Dictionary with metrics, as for the export methods
+
+        Returns:
+            True if queued, False if continuous export isn't running or the
+            queue is full (the sample is dropped)
         """
-        # This would be implemented to run in a background thread
-        # For now, just log that it's not fully implemented
-        logger.info(f"Continuous {export_type} export requested (interval: {interval}s)")
-        # TODO: Implement background thread for continuous export
+        if self._export_queue is None:
+            return False
+        try:
+            self._export_queue.put_nowait(data)
+        except queue.Full:
+            logger.warning("Metrics export queue full, dropping sample")
+            return False
+        return True
+
+    def stop_continuous_export(self) -> None:
+        """Stop the background exporter, exporting any samples still queued."""
+        thread, samples = self._export_thread, self._export_queue
+        if thread is None or samples is None:
+            return
+        self._export_stop.set()
+        try:
+            # Wake the worker if it is waiting on an empty queue
+            samples.put_nowait(None)
+        except queue.Full:
+            pass  # Worker is busy and will see the stop flag
+        thread.join(timeout=5.0)
+        self._export_thread = None
+        self._export_queue = None
+
+    def _export_worker(
+        self, samples: queue.Queue, interval: float, export_type: str, options: Dict
+    ) -> None:
+        """Drain queued samples, exporting on batch size or once per interval."""
+        latest: Optional[Dict] = None
+        deadline = time.monotonic() + interval
+        stopping = False
+        while not stopping:
+            try:
+                data = samples.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                data = None
+            stopping = self._export_stop.is_set() and samples.empty()
+
+            if data is not None:
+                if export_type == "influxdb":
+                    # Buffer only: the batch is written when full or at the deadline
+                    try:
+                        if (
+                            self._buffer_influx_point(data, **options)
+                            and len(self._influx_buffer) >= self.INFLUX_BATCH_SIZE
+                        ):
+                            self._flush_influx()
+                    except Exception as e:
+                        logger.error(f"InfluxDB export error: {e}", exc_info=True)
+                else:
+                    latest = data
+
+            if stopping or time.monotonic() >= deadline:
+                if export_type == "influxdb":
+                    self._flush_influx()
+                elif latest is not None:
+                    self.export_to_prometheus(latest, **options)
+                    latest = None
+                deadline = time.monotonic() + interval
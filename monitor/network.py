@@ -15,18 +15,20 @@ Example:
 from __future__ import annotations
 
 import time
+from collections import deque
 from dataclasses import dataclass
-from typing import List, Optional, Tuple
+from typing import Deque, Optional, Tuple
 
 import psutil
 
 from config import THRESHOLDS, get_logger
-from monitor.utils import format_bytes
+from monitor.utils import DATACLASS_SLOTS, format_bytes
 
 logger = get_logger(__name__)
 
 
-@dataclass
+# Slotted: a new instance is created every refresh
+@dataclass(**DATACLASS_SLOTS)
 class SpeedStats:
     """Current network speed statistics.
 
@@ -51,6 +53,9 @@ class NetworkStats:
 
     Attributes:
         SPEED_SAMPLE_COUNT: Number of samples to keep for averaging.
+        COUNTERS_MAX_AGE: Seconds a psutil counter reading is reused for.
+        SESSION_TOTALS_MAX_AGE: Seconds the counters from the last speed
+            sample are reused for session totals.
 
     Example:
         >>> stats = NetworkStats()
@@ -60,27 +65,58 @@ class NetworkStats:
         >>> sent, recv = stats.get_session_totals()
     """
 
+    # Calls within the same UI refresh share one psutil.net_io_counters() read
+    COUNTERS_MAX_AGE = 0.05
+
+    # get_session_totals usually follows get_current_stats in the same refresh,
+    # with pings and drawing in between, so it reuses that sample's counters
+    SESSION_TOTALS_MAX_AGE = 0.5
+
     def __init__(self) -> None:
         """Initialize the NetworkStats collector."""
         self._last_bytes_sent: int = 0
         self._last_bytes_recv: int = 0
-        self._last_time: float = 0
+        # Monotonic nanosecond timestamps: immune to wall-clock jumps, and
+        # integer deltas keep full precision
+        self._last_time_ns: int = 0
         self._session_start_sent: int = 0
         self._session_start_recv: int = 0
-        self._session_start_time: float = 0
+        self._session_start_time_ns: int = 0
         self._peak_upload: float = 0
         self._peak_download: float = 0
-        self._speed_samples: List[Tuple[float, float]] = []
+        self._speed_samples: Deque[Tuple[float, float]] = deque(
+            maxlen=THRESHOLDS.SPEED_SAMPLE_COUNT
+        )
+        # Running totals of the samples, kept in step with the deque
+        self._sum_upload: float = 0.0
+        self._sum_download: float = 0.0
         self._initialized: bool = False
+        # Last counter reading and the monotonic time it was taken
+        self._counters_cache: Optional[Tuple[int, int]] = None
+        self._counters_cache_time: float = 0.0
 
-    def _get_total_bytes(self) -> Tuple[int, int]:
+    def _get_total_bytes(self, max_age: Optional[float] = None) -> Tuple[int, int]:
         """Get total bytes sent and received across all interfaces.
 
+        Aggregating the counters walks every interface, so a reading is
+        reused for up to COUNTERS_MAX_AGE seconds.
+
+        Args:
+            max_age: Oldest cached reading to accept, in seconds. Defaults to
+                COUNTERS_MAX_AGE; pass 0 to force a fresh read.
+
         Returns:
             Tuple of (bytes_sent, bytes_received) since system boot.
         """
+        if max_age is None:
+            max_age = self.COUNTERS_MAX_AGE
+        now = time.monotonic()
+        if self._counters_cache is not None and now - self._counters_cache_time < max_age:
+            return self._counters_cache
         counters = psutil.net_io_counters()
-        return counters.bytes_sent, counters.bytes_recv
+        self._counters_cache = (counters.bytes_sent, counters.bytes_recv)
+        self._counters_cache_time = now
+        return self._counters_cache
 
     def initialize(self) -> None:
         """Initialize the baseline measurements.
@@ -88,15 +124,15 @@ class NetworkStats:
         Call this once before collecting stats. Automatically called
         by get_current_stats() if not already initialized.
         """
-        sent, recv = self._get_total_bytes()
-        current_time = time.time()
+        sent, recv = self._get_total_bytes(max_age=0)
+        current_time = time.monotonic_ns()
 
         self._last_bytes_sent = sent
         self._last_bytes_recv = recv
-        self._last_time = current_time
+        self._last_time_ns = current_time
         self._session_start_sent = sent
         self._session_start_recv = recv
-        self._session_start_time = current_time
+        self._session_start_time_ns = current_time
         self._initialized = True
         logger.debug("NetworkStats initialized")
 
@@ -118,34 +154,33 @@ class NetworkStats:
             self.initialize()
             return None
 
-        current_time = time.time()
-        sent, recv = self._get_total_bytes()
+        current_time = time.monotonic_ns()
+        # Always read fresh here: a cached reading would be older than
+        # current_time and skew the speed calculation
+        sent, recv = self._get_total_bytes(max_age=0)
 
-        time_delta = current_time - self._last_time
-        if time_delta < 0.1:  # Avoid division by very small numbers
+        time_delta_ns = current_time - self._last_time_ns
+        if time_delta_ns < 100_000_000:  # Under 0.1s; avoid dividing by tiny intervals
             return None
 
         # Calculate speeds
         bytes_sent_delta = sent - self._last_bytes_sent
         bytes_recv_delta = recv - self._last_bytes_recv
 
-        upload_speed = bytes_sent_delta / time_delta
-        download_speed = bytes_recv_delta / time_delta
+        upload_speed = bytes_sent_delta * 1_000_000_000 / time_delta_ns
+        download_speed = bytes_recv_delta * 1_000_000_000 / time_delta_ns
 
         # Update peak speeds
         self._peak_upload = max(self._peak_upload, upload_speed)
         self._peak_download = max(self._peak_download, download_speed)
 
         # Store for averaging
-        self._speed_samples.append((upload_speed, download_speed))
-        # Keep last N samples for average calculation
-        if len(self._speed_samples) > THRESHOLDS.SPEED_SAMPLE_COUNT:
-            self._speed_samples.pop(0)
+        self._add_sample(upload_speed, download_speed)
 
         # Update last values
         self._last_bytes_sent = sent
         self._last_bytes_recv = recv
-        self._last_time = current_time
+        self._last_time_ns = current_time
 
         return SpeedStats(
             upload_speed=upload_speed,
@@ -154,13 +189,43 @@ class NetworkStats:
             total_recv=recv,
         )
 
+    def _add_sample(self, upload_speed: float, download_speed: float) -> None:
+        """Add a speed sample to the rolling window, updating the running totals.
+
+        The deque keeps the last SPEED_SAMPLE_COUNT samples; when full, the
+        oldest is evicted on append, so it is subtracted from the totals first.
+
+        Args:
+            upload_speed: Upload speed in bytes per second.
+            download_speed: Download speed in bytes per second.
+        """
+        samples = self._speed_samples
+        if len(samples) == samples.maxlen:
+            old_upload, old_download = samples[0]
+            self._sum_upload -= old_upload
+            self._sum_download -= old_download
+        samples.append((upload_speed, download_speed))
+        self._sum_upload += upload_speed
+        self._sum_download += download_speed
+
     def get_session_totals(self) -> Tuple[int, int]:
         """Get bytes sent/received since session start.
 
+        Reuses the counters read by the last get_current_stats() call when
+        they are under SESSION_TOTALS_MAX_AGE old and postdate the session start.
+
         Returns:
             Tuple of (bytes_sent, bytes_received) for current session.
         """
-        sent, recv = self._get_total_bytes()
+        sample_age_ns = time.monotonic_ns() - self._last_time_ns
+        if (
+            self._initialized
+            and self._last_time_ns >= self._session_start_time_ns
+            and sample_age_ns < self.SESSION_TOTALS_MAX_AGE * 1_000_000_000
+        ):
+            sent, recv = self._last_bytes_sent, self._last_bytes_recv
+        else:
+            sent, recv = self._get_total_bytes()
         return (
             sent - self._session_start_sent,
             recv - self._session_start_recv,
@@ -186,9 +251,8 @@ class NetworkStats:
         if not self._speed_samples:
             return 0.0, 0.0
 
-        avg_upload = sum(s[0] for s in self._speed_samples) / len(self._speed_samples)
-        avg_download = sum(s[1] for s in self._speed_samples) / len(self._speed_samples)
-        return avg_upload, avg_download
+        count = len(self._speed_samples)
+        return self._sum_upload / count, self._sum_download / count
 
     def reset_session(self) -> None:
         """Reset session statistics.
@@ -197,10 +261,12 @@ class NetworkStats:
         Does not affect the initialized state.
         """
         self._session_start_sent, self._session_start_recv = self._get_total_bytes()
-        self._session_start_time = time.time()
+        self._session_start_time_ns = time.monotonic_ns()
         self._peak_upload = 0
         self._peak_download = 0
-        self._speed_samples = []
+        self._speed_samples.clear()
+        self._sum_upload = 0.0
+        self._sum_download = 0.0
 
 
 # Re-export format_bytes for backwards compatibility
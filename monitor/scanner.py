@@ -8,19 +8,28 @@ Uses multiple sources for device identification:
 5. Custom device names (user-assigned, persisted)
 """
 
+import atexit
+import ctypes
+import ctypes.util
 import json
+import queue
 import re
 import socket
+import struct
 import subprocess
+import sys
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from dataclasses import dataclass, field
-from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
 
 from config import INTERVALS, NETWORK, get_logger
 from config.subprocess_cache import get_subprocess_cache
+from monitor.utils import DATACLASS_SLOTS
 
 logger = get_logger(__name__)
 
@@ -69,7 +78,8 @@ DEVICE_TYPE_ICONS = {
 }
 
 
-@dataclass
+# Slotted: scans track every device on the network, refreshed each poll
+@dataclass(**DATACLASS_SLOTS)
 class NetworkDevice:
     """Represents a device on the network."""
 
@@ -83,9 +93,12 @@ class NetworkDevice:
     custom_name: Optional[str] = None
     mdns_name: Optional[str] = None  # Name from Bonjour/mDNS
     services: List[str] = field(default_factory=list)
-    first_seen: datetime = field(default_factory=datetime.now)
-    last_seen: datetime = field(default_factory=datetime.now)
+    # Epoch seconds; cheaper to stamp per device per scan than datetime objects
+    first_seen: float = field(default_factory=time.time)
+    last_seen: float = field(default_factory=time.time)
     is_online: bool = True
+    # (vendor, hostname, services, mdns_name) the type was last inferred from
+    _infer_key: Optional[Tuple] = field(default=None, init=False, repr=False, compare=False)
 
     def __hash__(self):
         return hash(self.mac_address)
@@ -212,30 +225,38 @@ SERVICE_TYPE_MAP = {
     "_apple-mobdev2._tcp": DeviceType.PHONE,
 }
 
-# Hostname patterns for device type inference
+# Hostname patterns for device type inference, in priority order. Patterns are
+# lowercase and matched against lowercased names: case-sensitive regexes let
+# the re module scan for their literal prefixes, which IGNORECASE disables.
 HOSTNAME_PATTERNS = [
-    (r"(?i)(iphone|ios)", DeviceType.PHONE, "iOS", "iPhone"),
-    (r"(?i)(ipad)", DeviceType.TABLET, "iPadOS", "iPad"),
-    (r"(?i)(macbook|mbp|mba)", DeviceType.LAPTOP, "macOS", "MacBook"),
-    (r"(?i)(imac|mac-?pro|mac-?mini|mac-?studio)", DeviceType.DESKTOP, "macOS", None),
-    (r"(?i)(apple-?watch|watch)", DeviceType.WATCH, "watchOS", "Apple Watch"),
-    (r"(?i)(apple-?tv|appletv)", DeviceType.TV, "tvOS", "Apple TV"),
-    (r"(?i)(homepod)", DeviceType.SPEAKER, None, "HomePod"),
-    (r"(?i)(android|pixel|galaxy|oneplus|xiaomi|redmi)", DeviceType.PHONE, "Android", None),
-    (r"(?i)(echo|alexa)", DeviceType.SPEAKER, None, "Amazon Echo"),
-    (r"(?i)(fire-?tv|firestick)", DeviceType.TV, None, "Fire TV"),
-    (r"(?i)(chromecast)", DeviceType.TV, None, "Chromecast"),
-    (r"(?i)(roku)", DeviceType.TV, None, "Roku"),
-    (r"(?i)(playstation|ps[345])", DeviceType.GAMING, None, "PlayStation"),
-    (r"(?i)(xbox)", DeviceType.GAMING, None, "Xbox"),
-    (r"(?i)(switch)", DeviceType.GAMING, None, "Nintendo Switch"),
-    (r"(?i)(printer|print|laserjet|deskjet)", DeviceType.PRINTER, None, None),
-    (r"(?i)(cam|camera|doorbell)", DeviceType.CAMERA, None, None),
-    (r"(?i)(tv|television|smarttv|bravia|webos|tizen)", DeviceType.TV, None, None),
-    (r"(?i)(sonos|speaker)", DeviceType.SPEAKER, None, None),
-    (r"(?i)(desktop|workstation|pc)", DeviceType.DESKTOP, "Windows", None),
-    (r"(?i)(laptop|notebook|surface)", DeviceType.LAPTOP, "Windows", None),
-    (r"(?i)(raspberry|raspi|pi\d)", DeviceType.IOT, "Linux", "Raspberry Pi"),
+    (r"(iphone|ios)", DeviceType.PHONE, "iOS", "iPhone"),
+    (r"(ipad)", DeviceType.TABLET, "iPadOS", "iPad"),
+    (r"(macbook|mbp|mba)", DeviceType.LAPTOP, "macOS", "MacBook"),
+    (r"(imac|mac-?pro|mac-?mini|mac-?studio)", DeviceType.DESKTOP, "macOS", None),
+    (r"(apple-?watch|watch)", DeviceType.WATCH, "watchOS", "Apple Watch"),
+    (r"(apple-?tv|appletv)", DeviceType.TV, "tvOS", "Apple TV"),
+    (r"(homepod)", DeviceType.SPEAKER, None, "HomePod"),
+    (r"(android|pixel|galaxy|oneplus|xiaomi|redmi)", DeviceType.PHONE, "Android", None),
+    (r"(echo|alexa)", DeviceType.SPEAKER, None, "Amazon Echo"),
+    (r"(fire-?tv|firestick)", DeviceType.TV, None, "Fire TV"),
+    (r"(chromecast)", DeviceType.TV, None, "Chromecast"),
+    (r"(roku)", DeviceType.TV, None, "Roku"),
+    (r"(playstation|ps[345])", DeviceType.GAMING, None, "PlayStation"),
+    (r"(xbox)", DeviceType.GAMING, None, "Xbox"),
+    (r"(switch)", DeviceType.GAMING, None, "Nintendo Switch"),
+    (r"(printer|print|laserjet|deskjet)", DeviceType.PRINTER, None, None),
+    (r"(cam|camera|doorbell)", DeviceType.CAMERA, None, None),
+    (r"(tv|television|smarttv|bravia|webos|tizen)", DeviceType.TV, None, None),
+    (r"(sonos|speaker)", DeviceType.SPEAKER, None, None),
+    (r"(desktop|workstation|pc)", DeviceType.DESKTOP, "Windows", None),
+    (r"(laptop|notebook|surface)", DeviceType.LAPTOP, "Windows", None),
+    (r"(raspberry|raspi|pi\d)", DeviceType.IOT, "Linux", "Raspberry Pi"),
+]
+
+# Compiled once; infer_device_type runs for every device on every scan
+_HOSTNAME_MATCHERS = [
+    (re.compile(pattern), dtype, os_h, model_h)
+    for pattern, dtype, os_h, model_h in HOSTNAME_PATTERNS
 ]
 
 
@@ -244,17 +265,38 @@ HOSTNAME_PATTERNS = [
 # ============================================================================
 
 
+@lru_cache(maxsize=512)
+def _name_key(mac_address: str) -> str:
+    """Return the DeviceNameStore key for a MAC; cached since scans repeat the same MACs."""
+    return mac_address.upper().replace("-", ":")
+
+
 class DeviceNameStore:
-    """Stores user-assigned custom names for devices."""
+    """Stores user-assigned custom names for devices.
+
+    Changes are written to disk on a short debounce timer, so a burst of
+    renames costs one write; flush() (also run at exit) writes immediately.
+    """
 
     _instance = None
     _names: Dict[str, str] = {}
     _store_path: Optional[Path] = None
+    # Set on the singleton in __new__
+    _lock: threading.Lock
+    _save_timer: Optional[threading.Timer]
+    _dirty: bool
+
+    # Changes within this many seconds of each other share one write
+    SAVE_DELAY_SECONDS = 0.5
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
+            cls._instance._lock = threading.Lock()
+            cls._instance._save_timer = None
+            cls._instance._dirty = False
             cls._instance._load()
+            atexit.register(cls._instance.flush)
         return cls._instance
 
     def _get_store_path(self) -> Path:
@@ -269,31 +311,59 @@ class DeviceNameStore:
             path = self._get_store_path()
             if path.exists():
                 with open(path) as f:
-                    self._names = json.load(f)
+                    # Re-key in case the file holds MACs in another form
+                    self._names = {_name_key(mac): name for mac, name in json.load(f).items()}
         except Exception:
             self._names = {}
 
     def _save(self) -> None:
-        try:
-            with open(self._get_store_path(), "w") as f:
-                json.dump(self._names, f, indent=2)
-        except Exception as e:
-            logger.error(f"Error saving device names: {e}")
+        """Write pending changes to disk atomically (temp file, then rename)."""
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                path = self._get_store_path()
+                temp_file = path.with_suffix(".tmp")
+                with open(temp_file, "w") as f:
+                    json.dump(self._names, f, indent=2)
+                temp_file.replace(path)
+                self._dirty = False
+            except Exception as e:
+                logger.error(f"Error saving device names: {e}")
+
+    def _schedule_save(self) -> None:
+        """Mark names changed and restart the save timer. Caller holds _lock."""
+        self._dirty = True
+        if self._save_timer is not None:
+            self._save_timer.cancel()
+        self._save_timer = threading.Timer(self.SAVE_DELAY_SECONDS, self._save)
+        self._save_timer.daemon = True
+        self._save_timer.start()
+
+    def flush(self) -> None:
+        """Write any pending changes now. Call on application shutdown."""
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+        self._save()
 
     def get_name(self, mac_address: str) -> Optional[str]:
-        mac = mac_address.upper().replace("-", ":")
+        mac = _name_key(mac_address)
         return self._names.get(mac)
 
     def set_name(self, mac_address: str, name: str) -> None:
-        mac = mac_address.upper().replace("-", ":")
-        self._names[mac] = name
-        self._save()
+        mac = _name_key(mac_address)
+        with self._lock:
+            self._names[mac] = name
+            self._schedule_save()
 
     def remove_name(self, mac_address: str) -> None:
-        mac = mac_address.upper().replace("-", ":")
-        if mac in self._names:
-            del self._names[mac]
-            self._save()
+        mac = _name_key(mac_address)
+        with self._lock:
+            if mac in self._names:
+                del self._names[mac]
+                self._schedule_save()
 
 
 # ============================================================================
@@ -310,6 +380,8 @@ class OUIDatabase:
 
     _instance = None
     _vendors: Dict[str, str] = {}
+    # (prefix length, {prefix: vendor}) pairs, longest first; built from _vendors
+    _prefix_tables: List[Tuple[int, Dict[str, str]]] = []
     _loaded = False
 
     # Possible paths for OUI database (version-agnostic)
@@ -348,17 +420,17 @@ class OUIDatabase:
         for path in all_paths:
             try:
                 if Path(path).exists():
-                    with open(path, encoding="utf-8", errors="ignore") as f:
-                        for line in f:
-                            line = line.strip()
-                            if not line or line.startswith("#"):
-                                continue
-                            parts = line.split("\t", 1)
-                            if len(parts) == 2:
-                                prefix = parts[0].upper().replace(":", "").replace("-", "")
-                                vendor = parts[1].strip()
-                                self._vendors[prefix] = vendor
+                    # One read and a single comprehension over "PREFIX\tVendor" lines
+                    text = Path(path).read_text(encoding="utf-8", errors="ignore")
+                    self._vendors = {
+                        prefix.upper().replace(":", "").replace("-", ""): vendor.strip()
+                        for prefix, sep, vendor in (
+                            line.strip().partition("\t") for line in text.splitlines()
+                        )
+                        if sep and not prefix.startswith("#")
+                    }
 
+                    self._index_prefixes()
                     self._loaded = True
                     logger.info(f"Loaded {len(self._vendors)} OUI entries from {path}")
                     return
@@ -372,20 +444,40 @@ class OUIDatabase:
             "080027": "Oracle VirtualBox",
             "0050F2": "Microsoft",
         }
+        self._index_prefixes()
         logger.warning("Using fallback OUI database (install arp-scan for better vendor detection)")
         self._loaded = True
 
+    def _index_prefixes(self) -> None:
+        """Split vendors into one table per prefix length, longest first.
+
+        OUI files mostly hold 24-bit prefixes, so lookups probe only the
+        lengths that actually occur - usually a single dict probe. Cached
+        lookups from the previous tables are discarded.
+        """
+        tables: Dict[int, Dict[str, str]] = {}
+        for prefix, vendor in self._vendors.items():
+            tables.setdefault(len(prefix), {})[prefix] = vendor
+        self._prefix_tables = sorted(tables.items(), reverse=True)
+        _lookup_vendor.cache_clear()
+
     def lookup(self, mac_address: str) -> Optional[str]:
         """Look up vendor from MAC address."""
-        mac_clean = mac_address.upper().replace(":", "").replace("-", "").replace(".", "")
+        return _lookup_vendor(mac_address)
 
-        # Try progressively shorter prefixes (6, 5, 4, 3 bytes)
-        for length in [12, 10, 8, 6]:
-            prefix = mac_clean[:length]
-            if prefix in self._vendors:
-                return self._vendors[prefix]
 
-        return None
+@lru_cache(maxsize=4096)
+def _lookup_vendor(mac_address: str) -> Optional[str]:
+    """Resolve a MAC to its vendor; cached since the same devices recur across scans."""
+    mac_clean = mac_address.upper().replace(":", "").replace("-", "").replace(".", "")
+
+    # Most specific assignment wins: try the longest prefixes first
+    for length, vendors in OUIDatabase()._prefix_tables:
+        vendor = vendors.get(mac_clean[:length])
+        if vendor is not None:
+            return vendor
+
+    return None
 
 
 # ============================================================================
@@ -455,17 +547,16 @@ def infer_device_type(
     os_hint = None
     model_hint = None
 
-    # Check hostname patterns first (most specific)
-    for pattern, dtype, os_h, model_h in HOSTNAME_PATTERNS:
-        check_strings = [s for s in [hostname, mdns_name] if s]
-        for s in check_strings:
-            if re.search(pattern, s):
+    # Check hostname patterns first (most specific). Both names are searched
+    # at once, joined on a newline that no pattern can match across.
+    names = "\n".join(s for s in (hostname, mdns_name) if s).lower()
+    if names:
+        for regex, dtype, os_h, model_h in _HOSTNAME_MATCHERS:
+            if regex.search(names):
                 device_type = dtype
                 os_hint = os_h
                 model_hint = model_h
                 break
-        if device_type != DeviceType.UNKNOWN:
-            break
 
     # Check services (mDNS)
     if services and device_type == DeviceType.UNKNOWN:
@@ -476,17 +567,24 @@ def infer_device_type(
 
     # Check vendor
     if device_type == DeviceType.UNKNOWN and vendor:
-        vendor_lower = vendor.lower()
-        for vendor_key, dtype in VENDOR_TYPE_MAP.items():
-            if vendor_key in vendor_lower:
-                device_type = dtype
-                break
+        device_type = _vendor_device_type(vendor)
 
     return device_type, os_hint, model_hint
 
 
+@lru_cache(maxsize=1024)
+def _vendor_device_type(vendor: str) -> DeviceType:
+    """Map a vendor name to a device type; cached since vendors repeat across devices."""
+    vendor_lower = vendor.lower()
+    for vendor_key, dtype in VENDOR_TYPE_MAP.items():
+        if vendor_key in vendor_lower:
+            return dtype
+    return DeviceType.UNKNOWN
+
+
+@lru_cache(maxsize=1024)
 def normalize_mac(mac_address: str) -> str:
-    """Normalize MAC address to XX:XX:XX:XX:XX:XX format."""
+    """Normalize MAC address to XX:XX:XX:XX:XX:XX format; cached since scans repeat MACs."""
     mac_clean = mac_address.upper().replace("-", ":").replace(".", ":")
     parts = mac_clean.split(":")
     if len(parts) == 6:
@@ -494,6 +592,154 @@ def normalize_mac(mac_address: str) -> str:
     return mac_address.upper()
 
 
+# ============================================================================
+# ARP table
+# ============================================================================
+
+PROC_NET_ARP = Path("/proc/net/arp")
+
+# /proc/net/arp flag for a resolved entry (ATF_COM)
+_ATF_COM = 0x2
+
+# sysctl MIB for the routing table's link-layer entries: the same dump
+# `arp -an` reads on macOS, {CTL_NET, PF_ROUTE, 0, AF_INET, NET_RT_FLAGS, RTF_LLINFO}
+_ARP_SYSCTL_MIB = (4, 17, 0, socket.AF_INET, 2, 0x400)
+
+# struct rt_msghdr on Darwin: rtm_msglen (u16) leads, the header is 92 bytes
+_RT_MSGHDR_SIZE = 92
+
+# Broadcast and all-zero (unresolved) link-layer addresses
+_SKIP_MACS = frozenset({"FF:FF:FF:FF:FF:FF", "00:00:00:00:00:00"})
+
+# `arp -an` line: ? (192.168.1.1) at 00:11:22:33:44:55 on en0 ...
+_ARP_LINE_RE = re.compile(r"\((\d+\.\d+\.\d+\.\d+)\)\s+at\s+([0-9a-fA-F:]+)")
+
+
+@lru_cache(maxsize=1)
+def _libc() -> Optional[ctypes.CDLL]:
+    """Load the C library for sysctl, or None if unavailable."""
+    path = ctypes.util.find_library("c")
+    if not path:
+        return None
+    try:
+        libc = ctypes.CDLL(path, use_errno=True)
+    except OSError:
+        return None
+    libc.sysctl.argtypes = [
+        ctypes.POINTER(ctypes.c_int),
+        ctypes.c_uint,
+        ctypes.c_void_p,
+        ctypes.POINTER(ctypes.c_size_t),
+        ctypes.c_void_p,
+        ctypes.c_size_t,
+    ]
+    return libc
+
+
+def _read_arp_table_linux() -> List[Tuple[str, str]]:
+    """Read resolved (ip, mac) pairs from /proc/net/arp.
+
+    Columns are: IP address, HW type, Flags, HW address, Mask, Device.
+    Entries without the ATF_COM flag are incomplete and skipped.
+    """
+    pairs = []
+    with PROC_NET_ARP.open() as f:
+        next(f, None)  # Header
+        for line in f:
+            fields = line.split()
+            if len(fields) >= 4 and int(fields[2], 16) & _ATF_COM:
+                pairs.append((fields[0], normalize_mac(fields[3])))
+    return pairs
+
+
+def _parse_route_dump(buf: bytes) -> List[Tuple[str, str]]:
+    """Decode a NET_RT_FLAGS routing dump into (ip, mac) pairs.
+
+    Each message is an rt_msghdr followed by a sockaddr_inarp (the IP) and a
+    sockaddr_dl (the link-layer address). Entries without a link-layer
+    address are incomplete and skipped.
+    """
+    pairs = []
+    offset = 0
+    end = len(buf)
+    while offset + _RT_MSGHDR_SIZE <= end:
+        (msglen,) = struct.unpack_from("=H", buf, offset)
+        if msglen == 0:
+            break
+
+        sin = offset + _RT_MSGHDR_SIZE
+        sin_len = buf[sin]
+        ip = socket.inet_ntoa(buf[sin + 4 : sin + 8])
+
+        # Sockaddrs are padded to 4-byte boundaries (SA_SIZE)
+        sdl = sin + (1 + ((sin_len - 1) | 3) if sin_len else 4)
+        nlen, alen = buf[sdl + 5], buf[sdl + 6]
+        if alen == 6:
+            mac_start = sdl + 8 + nlen
+            mac = ":".join(f"{b:02X}" for b in buf[mac_start : mac_start + 6])
+            pairs.append((ip, mac))
+
+        offset += msglen
+    return pairs
+
+
+def _read_arp_table_bsd() -> List[Tuple[str, str]]:
+    """Read resolved (ip, mac) pairs from the routing table via sysctl.
+
+    Raises:
+        OSError: If libc or the sysctl call is unavailable.
+    """
+    libc = _libc()
+    if libc is None:
+        raise OSError("libc not found")
+
+    mib = (ctypes.c_int * len(_ARP_SYSCTL_MIB))(*_ARP_SYSCTL_MIB)
+    size = ctypes.c_size_t()
+    if libc.sysctl(mib, len(mib), None, ctypes.byref(size), None, 0) != 0:
+        raise OSError(ctypes.get_errno(), "sysctl size query failed")
+    if size.value == 0:
+        return []
+
+    buf = ctypes.create_string_buffer(size.value)
+    if libc.sysctl(mib, len(mib), buf, ctypes.byref(size), None, 0) != 0:
+        raise OSError(ctypes.get_errno(), "sysctl read failed")
+    return _parse_route_dump(buf.raw[: size.value])
+
+
+def _read_arp_table() -> Optional[List[Tuple[str, str]]]:
+    """Read the kernel ARP table directly, without running `arp`.
+
+    Returns:
+        List of (ip, mac) for resolved entries, or None if the table can't be
+        read natively on this platform.
+    """
+    try:
+        if sys.platform.startswith("linux"):
+            return _read_arp_table_linux()
+        if sys.platform == "darwin":
+            return _read_arp_table_bsd()
+    except (OSError, ValueError, IndexError, struct.error) as e:
+        logger.debug(f"Native ARP table read failed: {e}")
+    return None
+
+
+# ============================================================================
+# Hostname resolution
+# ============================================================================
+
+# Reverse lookups block on the resolver, so devices are resolved side by side
+_HOSTNAME_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hostname")
+
+
+def _reverse_lookup(ip: str) -> Optional[str]:
+    """Reverse-resolve an IP address, or None if it has no name."""
+    try:
+        hostname, _, _ = socket.gethostbyaddr(ip)
+        return hostname
+    except (OSError, UnicodeError):
+        return None
+
+
 # ============================================================================
 # Network Scanner
 # ============================================================================
@@ -510,25 +756,30 @@ class NetworkScanner:
     5. Custom names - User-assigned, persisted
     """
 
+    # Forced scans within this many seconds of the last one return its result
+    FORCED_SCAN_MIN_INTERVAL = 2.0
+
     def __init__(self, event_bus=None):
         self._devices: Dict[str, NetworkDevice] = {}
         self._lock = threading.Lock()
         self._last_scan: float = 0
+        self._last_scan_quick: bool = False
         self._last_mdns_scan: float = 0
         self._scan_interval = INTERVALS.DEVICE_SCAN_SECONDS * 2  # Less frequent than UI update
         self._mdns_scan_interval = INTERVALS.MDNS_SCAN_SECONDS
-        self._own_mac_addresses: Set[str] = self._get_own_mac_addresses()
+        self._own_mac_addresses: FrozenSet[str] = self._get_own_mac_addresses()
         self._name_store = DeviceNameStore()
         self._oui_db = OUIDatabase()
         self._mdns_names: Dict[str, str] = {}
         self._subprocess_cache = get_subprocess_cache()
         self._event_bus = event_bus  # Optional event bus for publishing events
         self._previously_online_devices: Set[str] = set()  # Track devices that were online
+        self._ip_to_mac: Dict[str, str] = {}  # Last MAC seen at each IP
 
-        # Lazy hostname resolution
-        self._pending_hostname_resolution: Set[str] = set()  # MACs pending resolution
-        self._hostname_resolution_in_progress: bool = False
-        self._hostname_resolve_lock = threading.Lock()
+        # Lazy hostname resolution: MACs queued for one worker, started on the
+        # first request; None in the queue stops it
+        self._hostname_queue: Optional["queue.Queue[Optional[str]]"] = None
+        self._hostname_thread: Optional[threading.Thread] = None
 
         # Check tool availability
         self._has_dns_sd = ToolChecker.has_dns_sd()
@@ -539,7 +790,7 @@ class NetworkScanner:
             f"dns-sd={self._has_dns_sd}, nmap={self._has_nmap}"
         )
 
-    def _get_own_mac_addresses(self) -> Set[str]:
+    def _get_own_mac_addresses(self) -> FrozenSet[str]:
         """Get MAC addresses of our own interfaces."""
         own_macs = set()
         try:
@@ -549,11 +800,11 @@ class NetworkScanner:
                 for addr in addrs:
                     if addr.family.name == "AF_LINK":
                         mac = normalize_mac(addr.address)
-                        if mac and mac != "00:00:00:00:00:00":
+                        if mac and mac not in _SKIP_MACS:
                             own_macs.add(mac)
         except Exception:
             pass  # nosec B110 - Best effort MAC detection
-        return own_macs
+        return frozenset(own_macs)
 
     def set_device_name(self, mac_address: str, name: str) -> None:
         """Set a custom name for a device."""
@@ -571,7 +822,7 @@ class NetworkScanner:
     # ARP Table Scan with OUI Lookup
     # ========================================================================
 
-    def _run_arp_with_oui(self) -> List[Tuple[str, str, str]]:
+    def _run_arp_with_oui(self) -> List[Tuple[str, str, Optional[str]]]:
         """Scan ARP table and look up vendors from OUI database.
 
         Returns list of (ip, mac, vendor).
@@ -579,42 +830,49 @@ class NetworkScanner:
         devices = []
 
         try:
-            # Use cached subprocess for ARP (changes slowly)
-            result = self._subprocess_cache.run(
-                ["arp", "-an"], ttl=10.0, timeout=NETWORK.ARP_SCAN_TIMEOUT  # Cache for 10 seconds
-            )
-
-            if result.returncode == 0:
-                # Parse: ? (192.168.1.1) at 00:11:22:33:44:55 on en0 ...
-                pattern = r"\((\d+\.\d+\.\d+\.\d+)\)\s+at\s+([0-9a-fA-F:]+)"
-
-                for line in result.stdout.split("\n"):
-                    match = re.search(pattern, line)
-                    if match:
-                        ip = match.group(1)
-                        mac = normalize_mac(match.group(2))
-
-                        # Skip invalid
-                        if mac == "(INCOMPLETE)" or mac == "FF:FF:FF:FF:FF:FF":
-                            continue
-                        if mac in self._own_mac_addresses:
-                            continue
+            # Read the kernel table directly; fall back to `arp -an` elsewhere
+            pairs = _read_arp_table()
+            if pairs is None:
+                pairs = self._run_arp_command()
 
-                        # Skip multicast/broadcast
-                        first_octet = int(ip.split(".")[0])
-                        if 224 <= first_octet <= 239 or ip.endswith(".255"):
-                            continue
+            for ip, mac in pairs:
+                # Skip broadcast/unresolved entries and our own interfaces
+                if mac in _SKIP_MACS or mac in self._own_mac_addresses:
+                    continue
+
+                # Skip multicast/broadcast, comparing the packed octets
+                try:
+                    packed = socket.inet_aton(ip)
+                except OSError:
+                    continue
+                if 224 <= packed[0] <= 239 or packed[3] == 255:
+                    continue
 
-                        # Look up vendor from OUI database
-                        vendor = self._oui_db.lookup(mac)
+                # Look up vendor from OUI database
+                vendor = self._oui_db.lookup(mac)
 
-                        devices.append((ip, mac, vendor))
+                devices.append((ip, mac, vendor))
 
         except Exception as e:
             logger.error(f"ARP scan error: {e}", exc_info=True)
 
         return devices
 
+    def _run_arp_command(self) -> List[Tuple[str, str]]:
+        """Parse resolved (ip, mac) pairs from `arp -an` output."""
+        pairs = []
+
+        # Use cached subprocess for ARP (changes slowly)
+        result = self._subprocess_cache.run(
+            ["arp", "-an"], ttl=10.0, timeout=NETWORK.ARP_SCAN_TIMEOUT  # Cache for 10 seconds
+        )
+
+        if result.returncode == 0:
+            for match in _ARP_LINE_RE.finditer(result.stdout):
+                pairs.append((match.group(1), normalize_mac(match.group(2))))
+
+        return pairs
+
     # ========================================================================
     # dns-sd / mDNS / Bonjour
     # ========================================================================
@@ -641,20 +899,31 @@ class NetworkScanner:
             "_companion-link._tcp",
         ]
 
+        # Browse every service type at once and share a single listen window,
+        # rather than waiting 0.5s per type
+        procs = []
         for service_type in services_to_check:
             try:
-                # Run dns-sd with a short timeout via background process
                 proc = subprocess.Popen(
                     ["dns-sd", "-B", service_type, "local."],
                     stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
                     text=True,
                 )
+                procs.append((service_type, proc))
+            except Exception:
+                pass  # nosec B110 - mDNS discovery is best-effort
 
-                # Wait briefly and kill
-                time.sleep(0.5)
-                proc.terminate()
+        if not procs:
+            return discovered
 
+        # Wait briefly and kill
+        time.sleep(0.5)
+        for _, proc in procs:
+            proc.terminate()
+
+        for service_type, proc in procs:
+            try:
                 try:
                     stdout, _ = proc.communicate(timeout=1)
                 except subprocess.TimeoutExpired:
@@ -693,17 +962,34 @@ class NetworkScanner:
     # Hostname resolution
     # ========================================================================
 
-    def _resolve_hostname(self, ip: str, timeout: float = None) -> Optional[str]:
+    def _resolve_hostname(self, ip: str, timeout: Optional[float] = None) -> Optional[str]:
         """Try to resolve hostname for an IP address."""
+        return self._resolve_hostnames([ip], timeout)[0]
+
+    def _resolve_hostnames(
+        self, ips: List[str], timeout: Optional[float] = None
+    ) -> List[Optional[str]]:
+        """Resolve hostnames for several IP addresses concurrently.
+
+        Lookups run on a shared pool, so the batch takes about as long as its
+        slowest lookup rather than the sum of them.
+
+        Args:
+            ips: IP addresses to look up
+            timeout: Seconds to wait for each lookup before giving up on it
+
+        Returns:
+            Hostname (or None) for each IP, in the same order.
+        """
         timeout = timeout or NETWORK.HOSTNAME_RESOLVE_TIMEOUT
-        try:
-            socket.setdefaulttimeout(timeout)
-            hostname, _, _ = socket.gethostbyaddr(ip)
-            return hostname
-        except Exception:
-            return None
-        finally:
-            socket.setdefaulttimeout(None)
+        futures = [_HOSTNAME_POOL.submit(_reverse_lookup, ip) for ip in ips]
+        hostnames = []
+        for future in futures:
+            try:
+                hostnames.append(future.result(timeout=timeout))
+            except FutureTimeoutError:
+                hostnames.append(None)
+        return hostnames
 
     def resolve_missing_hostnames(self) -> None:
         """Resolve hostnames for devices that don't have one yet.
@@ -716,8 +1002,8 @@ class NetworkScanner:
                 d for d in self._devices.values() if d.is_online and d.hostname is None
             ]
 
-        for device in devices_to_resolve:
-            hostname = self._resolve_hostname(device.ip_address, timeout=2.0)
+        hostnames = self._resolve_hostnames([d.ip_address for d in devices_to_resolve], timeout=2.0)
+        for device, hostname in zip(devices_to_resolve, hostnames):
             if hostname:
                 self._apply_hostname_to_device(device.mac_address, hostname)
 
@@ -729,15 +1015,29 @@ class NetworkScanner:
                 dev.hostname = hostname
 
                 # Re-infer device type with hostname
-                device_type, os_hint, model_hint = infer_device_type(
-                    dev.vendor, hostname, dev.services, dev.mdns_name
-                )
-                if device_type != DeviceType.UNKNOWN:
-                    dev.device_type = device_type
-                if os_hint:
-                    dev.os_hint = os_hint
-                if model_hint:
-                    dev.model_hint = model_hint
+                self._reinfer_device(dev)
+
+    @staticmethod
+    def _reinfer_device(device: NetworkDevice) -> None:
+        """Re-infer a device's type, OS and model from its current names and services.
+
+        Bonjour re-announces the same services, so inference is skipped when
+        none of its inputs changed since the last run. Call with _lock held.
+        """
+        key = (device.vendor, device.hostname, tuple(device.services), device.mdns_name)
+        if key == device._infer_key:
+            return
+        device._infer_key = key
+
+        device_type, os_hint, model_hint = infer_device_type(
+            device.vendor, device.hostname, device.services, device.mdns_name
+        )
+        if device_type != DeviceType.UNKNOWN:
+            device.device_type = device_type
+        if os_hint:
+            device.os_hint = os_hint
+        if model_hint:
+            device.model_hint = model_hint
 
     def request_hostname_resolution(self, mac_address: str) -> None:
         """Request lazy hostname resolution for a specific device.
@@ -756,52 +1056,68 @@ class NetworkScanner:
             if device.hostname is not None:
                 return  # Already resolved
 
-        # Add to pending queue
-        with self._hostname_resolve_lock:
-            self._pending_hostname_resolution.add(mac)
-
-            # Start background resolution if not already running
-            if not self._hostname_resolution_in_progress:
-                self._hostname_resolution_in_progress = True
-                threading.Thread(target=self._process_hostname_queue, daemon=True).start()
+            if self._hostname_queue is None:
+                self._hostname_queue = queue.Queue()
+                self._hostname_thread = threading.Thread(
+                    target=self._hostname_worker,
+                    args=(self._hostname_queue,),
+                    daemon=True,
+                    name="hostname-queue",
+                )
+                self._hostname_thread.start()
+            self._hostname_queue.put_nowait(mac)
 
-    def _process_hostname_queue(self) -> None:
-        """Process pending hostname resolution requests in the background.
+    def stop_hostname_resolution(self) -> None:
+        """Stop the background hostname worker, dropping any queued requests.
 
-        This is lazy resolution - devices are resolved one at a time with
-        a small delay to avoid overwhelming DNS.
+        A later request_hostname_resolution() starts a new worker.
         """
-        try:
-            while True:
-                # Get next MAC to resolve
-                with self._hostname_resolve_lock:
-                    if not self._pending_hostname_resolution:
-                        self._hostname_resolution_in_progress = False
-                        return
-                    mac = self._pending_hostname_resolution.pop()
-
-                # Get device IP
-                with self._lock:
-                    if mac not in self._devices:
-                        continue
-                    device = self._devices[mac]
-                    if device.hostname is not None:
-                        continue  # Already resolved
-                    ip = device.ip_address
+        with self._lock:
+            requests, thread = self._hostname_queue, self._hostname_thread
+            self._hostname_queue = self._hostname_thread = None
+        if requests is None or thread is None:
+            return
+        requests.put_nowait(None)
+        thread.join(timeout=5.0)
 
-                # Resolve hostname (blocking but in background thread)
-                hostname = self._resolve_hostname(ip, timeout=2.0)
-                if hostname:
-                    self._apply_hostname_to_device(mac, hostname)
-                    logger.debug(f"Lazy resolved {ip} -> {hostname}")
+    def _hostname_worker(self, requests: "queue.Queue[Optional[str]]") -> None:
+        """Resolve queued hostname requests in the background.
 
-                # Small delay between resolutions to be nice to DNS
-                time.sleep(0.1)
+        This is lazy resolution - each pass takes every queued device and
+        resolves them together on the hostname pool, which also bounds how
+        many lookups hit DNS at once. Returns when None is queued.
 
-        except Exception as e:
-            logger.error(f"Hostname resolution queue error: {e}", exc_info=True)
-            with self._hostname_resolve_lock:
-                self._hostname_resolution_in_progress = False
+        Args:
+            requests: Queue of MAC addresses to resolve.
+        """
+        while True:
+            # Block for the next request, then take everything else queued so far
+            macs = {requests.get()}
+            while True:
+                try:
+                    macs.add(requests.get_nowait())
+                except queue.Empty:
+                    break
+            if None in macs:
+                return
+
+            try:
+                # Get device IPs for those still unresolved
+                with self._lock:
+                    targets = [
+                        (mac, self._devices[mac].ip_address)
+                        for mac in macs
+                        if mac in self._devices and self._devices[mac].hostname is None
+                    ]
+
+                # Resolve hostnames (blocking but in background thread)
+                hostnames = self._resolve_hostnames([ip for _, ip in targets], timeout=2.0)
+                for (mac, ip), hostname in zip(targets, hostnames):
+                    if hostname:
+                        self._apply_hostname_to_device(mac, hostname)
+                        logger.debug(f"Lazy resolved {ip} -> {hostname}")
+            except Exception as e:
+                logger.error(f"Hostname resolution queue error: {e}", exc_info=True)
 
     def request_resolution_for_visible(self, macs: List[str]) -> None:
         """Request hostname resolution for a list of visible devices.
@@ -824,15 +1140,23 @@ class NetworkScanner:
             quick: Skip slow operations (mDNS, hostname resolution)
 
         Optimization: Only triggers mDNS/hostname resolution when new devices
-        are detected, not on every scan interval.
+        are detected, not on every scan interval. Repeated forced scans within
+        FORCED_SCAN_MIN_INTERVAL seconds reuse the last result, unless a full
+        scan follows a quick one.
         """
         current_time = time.time()
+        elapsed = current_time - self._last_scan
 
-        if not force and (current_time - self._last_scan) < self._scan_interval:
+        if force:
+            reuse = elapsed < self.FORCED_SCAN_MIN_INTERVAL and (quick or not self._last_scan_quick)
+        else:
+            reuse = elapsed < self._scan_interval
+        if reuse:
             with self._lock:
                 return list(self._devices.values())
 
         self._last_scan = current_time
+        self._last_scan_quick = quick
         discovered = []
         new_devices_found = False
 
@@ -851,7 +1175,8 @@ class NetworkScanner:
                     # Update existing device
                     device = self._devices[mac]
                     device.ip_address = ip
-                    device.last_seen = datetime.now()
+                    self._ip_to_mac[ip] = mac
+                    device.last_seen = current_time
                     device.is_online = True
                     if vendor and not device.vendor:
                         device.vendor = vendor
@@ -876,11 +1201,12 @@ class NetworkScanner:
                         model_hint=model_hint,
                         custom_name=custom_name,
                         mdns_name=mdns_name,
-                        first_seen=datetime.now(),
-                        last_seen=datetime.now(),
+                        first_seen=current_time,
+                        last_seen=current_time,
                         is_online=True,
                     )
                     self._devices[mac] = device
+                    self._ip_to_mac[ip] = mac
 
                     # Publish event for newly discovered device
                     if self._event_bus:
@@ -915,13 +1241,14 @@ class NetworkScanner:
                             )
                         self._previously_online_devices.add(mac)
 
-            # Mark unseen devices as offline
-            for mac, device in self._devices.items():
-                if mac not in seen_macs:
-                    was_online = device.is_online
-                    device.is_online = False
-                    if was_online and mac in self._previously_online_devices:
-                        self._previously_online_devices.discard(mac)
+            # Mark unseen devices as offline. Every online device is in
+            # _previously_online_devices, so only that set needs checking
+            for mac in self._previously_online_devices - seen_macs:
+                device = self._devices[mac]
+                device.is_online = False
+                if self._ip_to_mac.get(device.ip_address) == mac:
+                    del self._ip_to_mac[device.ip_address]
+            self._previously_online_devices = seen_macs
 
         # Only run expensive discovery when new devices are found (or forced)
         if not quick and (new_devices_found or force):
@@ -943,23 +1270,21 @@ class NetworkScanner:
                 if ip:
                     with self._lock:
                         # Find device with this IP
-                        for device in self._devices.values():
-                            if device.ip_address == ip:
-                                device.mdns_name = display_name
-                                device.services = list(set(device.services + services))
-                                self._mdns_names[device.mac_address] = display_name
-
-                                # Re-infer device type with services
-                                device_type, os_hint, model_hint = infer_device_type(
-                                    device.vendor, device.hostname, device.services, display_name
-                                )
-                                if device_type != DeviceType.UNKNOWN:
-                                    device.device_type = device_type
-                                if os_hint:
-                                    device.os_hint = os_hint
-                                if model_hint:
-                                    device.model_hint = model_hint
-                                break
+                        mac = self._ip_to_mac.get(ip)
+                        device = self._devices.get(mac) if mac is not None else None
+                        if device is None or device.ip_address != ip:
+                            continue
+                        device.mdns_name = display_name
+                        # Keep announcement order; dns-sd repeats a service per interface
+                        known = set(device.services)
+                        for service in services:
+                            if service not in known:
+                                known.add(service)
+                                device.services.append(service)
+                        self._mdns_names[device.mac_address] = display_name
+
+                        # Re-infer device type with services
+                        self._reinfer_device(device)
         except Exception as e:
             logger.error(f"mDNS scan error: {e}", exc_info=True)
 
@@ -988,3 +1313,5 @@ class NetworkScanner:
         """Clear all known devices."""
         with self._lock:
             self._devices.clear()
+            self._previously_online_devices.clear()
+            self._ip_to_mac.clear()
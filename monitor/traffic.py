@@ -1,10 +1,14 @@
 """Traffic breakdown by process/service."""
 
+import heapq
+import re
 import subprocess
 import time
 from collections import defaultdict
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Tuple
+from functools import lru_cache
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 import psutil
 
@@ -14,6 +18,120 @@ from monitor.utils import format_bytes
 
 logger = get_logger(__name__)
 
+# nettop interleaves timestamp rows such as "17:40:29" with process rows
+_TIMESTAMP_RE = re.compile(r"[\d:]+")
+
+
+# Substrings of lowercased process names -> friendly names; first match wins
+_NAME_MAP = {
+    "google chrome": "Chrome",
+    "google chrome helper": "Chrome",
+    "chrome": "Chrome",
+    "firefox": "Firefox",
+    "safari": "Safari",
+    "safarinetworkingprivacy": "Safari",
+    "safarilaunchchecker": "Safari",
+    "microsoft edge": "Edge",
+    "msedge": "Edge",
+    "slack": "Slack",
+    "slack helper": "Slack",
+    "zoom.us": "Zoom",
+    "spotify": "Spotify",
+    "spotify helper": "Spotify",
+    "discord": "Discord",
+    "discord helper": "Discord",
+    "telegram": "Telegram",
+    "whatsapp": "WhatsApp",
+    "signal": "Signal",
+    "messages": "Messages",
+    "facetime": "FaceTime",
+    "mail": "Mail",
+    "outlook": "Outlook",
+    "microsoft outlook": "Outlook",
+    "thunderbird": "Thunderbird",
+    "dropbox": "Dropbox",
+    "onedrive": "OneDrive",
+    "google drive": "Google Drive",
+    "icloud": "iCloud",
+    "cloudd": "iCloud",
+    "bird": "iCloud",
+    "code": "VS Code",
+    "code helper": "VS Code",
+    "cursor": "Cursor",
+    "cursor helper": "Cursor",
+    "node": "Node.js",
+    "python": "Python",
+    "python3": "Python",
+    "java": "Java",
+    "docker": "Docker",
+    "com.docker": "Docker",
+    "vpnkit": "Docker",
+    "ssh": "SSH",
+    "sshd": "SSH",
+    "git": "Git",
+    "git-remote-https": "Git",
+    "curl": "curl",
+    "wget": "wget",
+    "brew": "Homebrew",
+    "softwareupdated": "Software Update",
+    "apsd": "Apple Push",
+    "appstoreagent": "App Store",
+    "storedownloadd": "App Store",
+    "nsurlsessiond": "System Downloads",
+    "com.apple.nsurlsessiond": "System Downloads",
+    "trustd": "System Security",
+    "syspolicyd": "System Security",
+    "networkserviceproxy": "Network Proxy",
+    "rapportd": "Rapport (Handoff)",
+    "sharingd": "AirDrop/Sharing",
+    "identityservicesd": "Apple ID",
+    "parsecd": "Siri",
+    "assistantd": "Siri",
+    "mediaremoted": "Media Remote",
+    "itunescloudd": "iTunes/Music",
+    "music": "Music",
+    "podcasts": "Podcasts",
+    "tv": "Apple TV",
+    "netflix": "Netflix",
+    "prime video": "Prime Video",
+    "vlc": "VLC",
+    "iina": "IINA",
+    "transmit": "Transmit",
+    "filezilla": "FileZilla",
+    "cyberduck": "Cyberduck",
+    "tower": "Tower (Git)",
+    "sourcetree": "SourceTree",
+    "postman": "Postman",
+    "insomnia": "Insomnia",
+    "charles": "Charles Proxy",
+    "wireshark": "Wireshark",
+    "little snitch": "Little Snitch",
+    "lulu": "Lulu Firewall",
+    "tunnelblick": "Tunnelblick VPN",
+    "openvpn": "OpenVPN",
+    "wireguard": "WireGuard",
+    "nordvpn": "NordVPN",
+    "expressvpn": "ExpressVPN",
+    "steam": "Steam",
+    "steam helper": "Steam",
+    "epic games": "Epic Games",
+    "battle.net": "Battle.net",
+}
+
+
+@lru_cache(maxsize=1024)
+def _friendly_process_name(name: str) -> str:
+    """Map a process name to a friendly name; cached since the same processes recur."""
+    # Clean up common process names
+    name_lower = name.lower()
+
+    for key, friendly_name in _NAME_MAP.items():
+        if key in name_lower:
+            return friendly_name
+
+    # Capitalize first letter if not mapped
+    return name.split()[0].capitalize() if name else "Unknown"
+
 
 @dataclass
 class ProcessTraffic:
@@ -33,111 +151,7 @@ class ProcessTraffic:
     @property
     def display_name(self) -> str:
         """Get a clean display name for the process."""
-        # Clean up common process names
-        name_lower = self.name.lower()
-
-        # Map common process names to friendly names
-        name_map = {
-            "google chrome": "Chrome",
-            "google chrome helper": "Chrome",
-            "chrome": "Chrome",
-            "firefox": "Firefox",
-            "safari": "Safari",
-            "safarinetworkingprivacy": "Safari",
-            "safarilaunchchecker": "Safari",
-            "microsoft edge": "Edge",
-            "msedge": "Edge",
-            "slack": "Slack",
-            "slack helper": "Slack",
-            "zoom.us": "Zoom",
-            "spotify": "Spotify",
-            "spotify helper": "Spotify",
-            "discord": "Discord",
-            "discord helper": "Discord",
-            "telegram": "Telegram",
-            "whatsapp": "WhatsApp",
-            "signal": "Signal",
-            "messages": "Messages",
-            "facetime": "FaceTime",
-            "mail": "Mail",
-            "outlook": "Outlook",
-            "microsoft outlook": "Outlook",
-            "thunderbird": "Thunderbird",
-            "dropbox": "Dropbox",
-            "onedrive": "OneDrive",
-            "google drive": "Google Drive",
-            "icloud": "iCloud",
-            "cloudd": "iCloud",
-            "bird": "iCloud",
-            "code": "VS Code",
-            "code helper": "VS Code",
-            "cursor": "Cursor",
-            "cursor helper": "Cursor",
-            "node": "Node.js",
-            "python": "Python",
-            "python3": "Python",
-            "java": "Java",
-            "docker": "Docker",
-            "com.docker": "Docker",
-            "vpnkit": "Docker",
-            "ssh": "SSH",
-            "sshd": "SSH",
-            "git": "Git",
-            "git-remote-https": "Git",
-            "curl": "curl",
-            "wget": "wget",
-            "brew": "Homebrew",
-            "softwareupdated": "Software Update",
-            "apsd": "Apple Push",
-            "appstoreagent": "App Store",
-            "storedownloadd": "App Store",
-            "nsurlsessiond": "System Downloads",
-            "com.apple.nsurlsessiond": "System Downloads",
-            "trustd": "System Security",
-            "syspolicyd": "System Security",
-            "networkserviceproxy": "Network Proxy",
-            "rapportd": "Rapport (Handoff)",
-            "sharingd": "AirDrop/Sharing",
-            "identityservicesd": "Apple ID",
-            "parsecd": "Siri",
-            "assistantd": "Siri",
-            "mediaremoted": "Media Remote",
-            "itunescloudd": "iTunes/Music",
-            "music": "Music",
-            "podcasts": "Podcasts",
-            "tv": "Apple TV",
-            "netflix": "Netflix",
-            "prime video": "Prime Video",
-            "vlc": "VLC",
-            "iina": "IINA",
-            "transmit": "Transmit",
-            "filezilla": "FileZilla",
-            "cyberduck": "Cyberduck",
-            "tower": "Tower (Git)",
-            "sourcetree": "SourceTree",
-            "postman": "Postman",
-            "insomnia": "Insomnia",
-            "charles": "Charles Proxy",
-            "wireshark": "Wireshark",
-            "little snitch": "Little Snitch",
-            "lulu": "Lulu Firewall",
-            "tunnelblick": "Tunnelblick VPN",
-            "openvpn": "OpenVPN",
-            "wireguard": "WireGuard",
-            "nordvpn": "NordVPN",
-            "expressvpn": "ExpressVPN",
-            "steam": "Steam",
-            "steam helper": "Steam",
-            "epic games": "Epic Games",
-            "battle.net": "Battle.net",
-        }
-
-        for key, friendly_name in name_map.items():
-            if key in name_lower:
-                return friendly_name
-
-        # Capitalize first letter if not mapped
-        return self.name.split()[0].capitalize() if self.name else "Unknown"
+        return _friendly_process_name(self.name)
 
 
 @dataclass
@@ -148,11 +162,22 @@ class ServiceCategory:
     bytes_in: int = 0
     bytes_out: int = 0
     processes: List[str] = field(default_factory=list)
+    # Membership index for processes, so adding stays O(1) per connection
+    _process_set: Set[str] = field(default_factory=set, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._process_set.update(self.processes)
 
     @property
     def total_bytes(self) -> int:
         return self.bytes_in + self.bytes_out
 
+    def add_process(self, name: str) -> None:
+        """Record a process in this category, keeping first-seen order."""
+        if name not in self._process_set:
+            self._process_set.add(name)
+            self.processes.append(name)
+
 
 # Port to service category mapping
 PORT_CATEGORIES = {
@@ -194,31 +219,107 @@ PORT_CATEGORIES = {
 
 
 class TrafficMonitor:
-    """Monitors network traffic by process."""
+    """Monitors network traffic by process.
+
+    Attributes:
+        PROCESS_NAME_CACHE_SIZE: Most PID names cached; when full, entries
+            for exited processes are pruned, then the oldest if still needed.
+        CONNECTIONS_MAX_AGE: Seconds a connection snapshot is shared between
+            callers in the same refresh.
+    """
+
+    PROCESS_NAME_CACHE_SIZE = 512
+
+    # get_traffic_by_process and categorize_traffic run back to back each refresh
+    CONNECTIONS_MAX_AGE = 0.5
 
     def __init__(self):
         self._process_traffic: Dict[int, ProcessTraffic] = {}
+        # Resolved process names: pid -> (create_time, name). The create time
+        # guards against a recycled PID returning a stale name.
+        self._process_names: Dict[int, Tuple[float, str]] = {}
+        # Last established-connection snapshot and the monotonic time it was taken
+        self._connections_cache: Optional[List] = None
+        self._connections_cache_time: float = 0.0
         self._last_nettop_data: Dict[str, Tuple[int, int]] = {}  # process -> (bytes_in, bytes_out)
         self._lock = None  # Will use threading lock if needed
         self._subprocess_cache = get_subprocess_cache()
         logger.debug("TrafficMonitor initialized")
 
     def _get_process_name(self, pid: int) -> Optional[str]:
-        """Get process name from PID."""
+        """Get process name from PID, reusing the name from earlier refreshes."""
         try:
             proc = psutil.Process(pid)
-            return proc.name()
+            create_time = proc.create_time()
+            cached = self._process_names.get(pid)
+            if cached is not None and cached[0] == create_time:
+                return cached[1]
+            name = proc.name()
         except (psutil.NoSuchProcess, psutil.AccessDenied):
             return None
 
+        if len(self._process_names) >= self.PROCESS_NAME_CACHE_SIZE:
+            self._prune_process_names()
+        self._process_names[pid] = (create_time, name)
+        return name
+
+    def _resolve_pid_names(self, pids: Iterable[int]) -> Dict[int, str]:
+        """Resolve process names for a set of PIDs, skipping ones that can't be read.
+
+        Args:
+            pids: Unique PIDs owning connections
+
+        Returns:
+            Dict mapping pid -> process name
+        """
+        names = {}
+        for pid in pids:
+            name = self._get_process_name(pid)
+            if name:
+                names[pid] = name
+        return names
+
+    def _prune_process_names(self) -> None:
+        """Drop cached names for processes that have exited.
+
+        If most entries belong to live processes, the oldest are dropped as
+        well so the cache stays bounded and the next prune is a while off.
+        """
+        live_pids = set(psutil.pids())
+        names = {pid: entry for pid, entry in self._process_names.items() if pid in live_pids}
+        if len(names) > self.PROCESS_NAME_CACHE_SIZE * 3 // 4:
+            # Insertion order: the first entries are the oldest
+            for pid in list(islice(names, len(names) - self.PROCESS_NAME_CACHE_SIZE // 2)):
+                del names[pid]
+        self._process_names = names
+
+    def _snapshot_connections(self) -> List:
+        """Get established TCP connections, reused for up to CONNECTIONS_MAX_AGE seconds.
+
+        Only TCP sockets can be ESTABLISHED, so UDP tables aren't enumerated.
+
+        Returns:
+            List of psutil connection tuples with status ESTABLISHED.
+        """
+        now = time.monotonic()
+        if (
+            self._connections_cache is not None
+            and now - self._connections_cache_time < self.CONNECTIONS_MAX_AGE
+        ):
+            return self._connections_cache
+        self._connections_cache = [
+            conn for conn in psutil.net_connections(kind="tcp") if conn.status == "ESTABLISHED"
+        ]
+        self._connections_cache_time = now
+        return self._connections_cache
+
     def _get_active_connections(self) -> Dict[int, List[tuple]]:
         """Get active network connections grouped by PID."""
         connections_by_pid: Dict[int, List[tuple]] = defaultdict(list)
 
         try:
-            connections = psutil.net_connections(kind="inet")
-            for conn in connections:
-                if conn.pid and conn.status == "ESTABLISHED":
+            for conn in self._snapshot_connections():
+                if conn.pid:
                     local_port = conn.laddr.port if conn.laddr else 0
                     remote_port = conn.raddr.port if conn.raddr else 0
                     connections_by_pid[conn.pid].append((local_port, remote_port))
@@ -244,67 +345,40 @@ class TrafficMonitor:
             if proc.returncode == 0:
                 # Parse nettop output
                 # Format: process_name      bytes_in    bytes_out
-                lines = proc.stdout.strip().split("\n")
-
-                for line in lines:
+                for line in proc.stdout.splitlines():
                     # Skip header and empty lines
                     if not line.strip() or "bytes_in" in line.lower() or line.startswith("time"):
                         continue
 
                     # Split by whitespace
                     parts = line.split()
-                    if len(parts) >= 3:
-                        try:
-                            # First part is process name (may include .pid suffix)
-                            proc_info = parts[0].strip()
-
-                            # Skip time-like entries
-                            if ":" in proc_info and proc_info.count(":") >= 1:
-                                # Might be timestamp like "17:40:29"
-                                if all(c.isdigit() or c == ":" for c in proc_info):
-                                    continue
-
-                            # Extract process name (remove .pid suffix if present)
-                            if "." in proc_info:
-                                # Check if last part is a number (PID)
-                                name_parts = proc_info.rsplit(".", 1)
-                                if name_parts[-1].isdigit():
-                                    proc_name = name_parts[0]
-                                else:
-                                    proc_name = proc_info
-                            else:
-                                proc_name = proc_info
-
-                            # Skip system/empty names
-                            if not proc_name or proc_name in ("time", "interface", "-"):
-                                continue
-
-                            # Last two numeric values are usually bytes_in and bytes_out
-                            bytes_in = 0
-                            bytes_out = 0
-
-                            numeric_values = []
-                            for part in parts[1:]:
-                                part = part.strip()
-                                if part.isdigit():
-                                    numeric_values.append(int(part))
-
-                            if len(numeric_values) >= 2:
-                                bytes_in = numeric_values[0]
-                                bytes_out = numeric_values[1]
-                            elif len(numeric_values) == 1:
-                                bytes_in = numeric_values[0]
-
-                            if proc_name and (bytes_in > 0 or bytes_out > 0):
-                                if proc_name in result:
-                                    result[proc_name] = (
-                                        result[proc_name][0] + bytes_in,
-                                        result[proc_name][1] + bytes_out,
-                                    )
-                                else:
-                                    result[proc_name] = (bytes_in, bytes_out)
-                        except (ValueError, IndexError):
-                            continue
+                    if len(parts) < 3:
+                        continue
+
+                    # First part is process name (may include .pid suffix)
+                    proc_info = parts[0]
+
+                    # Skip time-like entries such as "17:40:29"
+                    if ":" in proc_info and _TIMESTAMP_RE.fullmatch(proc_info):
+                        continue
+
+                    # Extract process name (remove .pid suffix if present)
+                    proc_name, dot, pid = proc_info.rpartition(".")
+                    if not (dot and pid.isdigit()):
+                        proc_name = proc_info
+
+                    # Skip system/empty names
+                    if not proc_name or proc_name in ("time", "interface", "-"):
+                        continue
+
+                    # First two numeric values are bytes_in and bytes_out
+                    numeric_values = [int(part) for part in parts[1:] if part.isdecimal()]
+                    bytes_in = numeric_values[0] if numeric_values else 0
+                    bytes_out = numeric_values[1] if len(numeric_values) >= 2 else 0
+
+                    if bytes_in > 0 or bytes_out > 0:
+                        prev_in, prev_out = result.get(proc_name, (0, 0))
+                        result[proc_name] = (prev_in + bytes_in, prev_out + bytes_out)
         except Exception as e:
             # Log but don't fail - nettop may not be available
             logger.debug(f"nettop error (may be unavailable): {e}")
@@ -325,18 +399,24 @@ class TrafficMonitor:
             )
 
             if result.returncode == 0:
-                lines = result.stdout.strip().split("\n")
-                for line in lines[1:]:  # Skip header
-                    parts = line.split()
-                    if len(parts) >= 1:
-                        # Clean up process name
-                        proc_name = parts[0].replace("\\x20", " ").strip()
-                        # Skip kernel and system
-                        if proc_name in ("kernel", "launchd", "mDNSRespo", "mDNSResponder"):
-                            continue
-                        # Count connections (ESTABLISHED or has remote address)
-                        if "ESTABLISHED" in line or "->" in line or "LISTEN" not in line:
-                            process_connections[proc_name] += 1
+                for line in result.stdout.splitlines()[1:]:  # Skip header
+                    # Count connections (ESTABLISHED or has remote address). The
+                    # substring tests run first so listening sockets are dropped
+                    # before the line is split.
+                    if "LISTEN" in line and "ESTABLISHED" not in line and "->" not in line:
+                        continue
+
+                    # Only the first column (the command) is needed
+                    parts = line.split(None, 1)
+                    if not parts:
+                        continue
+
+                    # Clean up process name
+                    proc_name = parts[0].replace("\\x20", " ").strip()
+                    # Skip kernel and system
+                    if proc_name in ("kernel", "launchd", "mDNSRespo", "mDNSResponder"):
+                        continue
+                    process_connections[proc_name] += 1
         except subprocess.TimeoutExpired:
             pass  # nosec B110 - lsof timeout expected
         except Exception:
@@ -351,9 +431,10 @@ class TrafficMonitor:
 
         # Primary method: Use psutil for fast connection data
         connections_by_pid = self._get_active_connections()
+        pid_names = self._resolve_pid_names(connections_by_pid)
 
         for pid, conns in connections_by_pid.items():
-            name = self._get_process_name(pid)
+            name = pid_names.get(pid)
             if name and name not in seen_names:
                 seen_names.add(name)
                 traffic = ProcessTraffic(pid=pid, name=name, connections=len(conns))
@@ -372,10 +453,11 @@ class TrafficMonitor:
 
         return traffic_list
 
-    def get_traffic_summary(self) -> List[Tuple[str, int, int, int]]:
-        """Get a summary of traffic by process.
+    def _iter_summary(self) -> Iterator[Tuple[str, int, int, int]]:
+        """Yield traffic aggregated by display name, in no particular order.
 
-        Returns list of (display_name, bytes_in, bytes_out, connections)
+        Yields:
+            (display_name, bytes_in, bytes_out, connections) tuples.
         """
         traffic = self.get_traffic_by_process()
 
@@ -394,21 +476,25 @@ class TrafficMonitor:
             else:
                 aggregated[name] = (t.bytes_in, t.bytes_out, t.connections)
 
-        # Convert to list and sort
-        result = [(name, data[0], data[1], data[2]) for name, data in aggregated.items()]
+        for name, data in aggregated.items():
+            yield (name, data[0], data[1], data[2])
 
-        # Sort by total bytes, then connections
-        result.sort(key=lambda x: (x[1] + x[2], x[3]), reverse=True)
+    def get_traffic_summary(self) -> List[Tuple[str, int, int, int]]:
+        """Get a summary of traffic by process.
 
-        return result
+        Returns list of (display_name, bytes_in, bytes_out, connections)
+        """
+        # Sort by total bytes, then connections
+        return sorted(self._iter_summary(), key=lambda x: (x[1] + x[2], x[3]), reverse=True)
 
     def get_top_processes(self, limit: int = 10) -> List[Tuple[str, int, int, int]]:
         """Get top N processes by traffic.
 
+        Selects the top rows directly rather than sorting every process.
+
         Returns list of (display_name, bytes_in, bytes_out, connections)
         """
-        summary = self.get_traffic_summary()
-        return summary[:limit]
+        return heapq.nlargest(limit, self._iter_summary(), key=lambda x: (x[1] + x[2], x[3]))
 
     def categorize_traffic(self) -> Dict[str, ServiceCategory]:
         """Categorize traffic by service type."""
@@ -416,12 +502,11 @@ class TrafficMonitor:
 
         # Get connections and categorize by port
         try:
-            connections = psutil.net_connections(kind="inet")
+            connections = self._snapshot_connections()
+            # One name lookup per process, not per connection
+            pid_names = self._resolve_pid_names({conn.pid for conn in connections if conn.pid})
 
             for conn in connections:
-                if conn.status != "ESTABLISHED":
-                    continue
-
                 # Determine category from port
                 remote_port = conn.raddr.port if conn.raddr else 0
                 local_port = conn.laddr.port if conn.laddr else 0
@@ -431,16 +516,14 @@ class TrafficMonitor:
                 )
 
                 # Get process name
-                proc_name = None
-                if conn.pid:
-                    proc_name = self._get_process_name(conn.pid)
+                proc_name = pid_names.get(conn.pid)
 
                 if category_name not in categories:
                     categories[category_name] = ServiceCategory(name=category_name)
 
                 cat = categories[category_name]
-                if proc_name and proc_name not in cat.processes:
-                    cat.processes.append(proc_name)
+                if proc_name:
+                    cat.add_process(proc_name)
 
         except (psutil.AccessDenied, psutil.NoSuchProcess):
             pass
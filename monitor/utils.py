@@ -13,11 +13,26 @@ Example:
 
 from __future__ import annotations
 
-from typing import Union
+import sys
+from typing import Dict, Union
 
 # Type alias for numeric values
 NumericValue = Union[int, float]
 
+# Keyword arguments for @dataclass that drop the per-instance __dict__ on
+# records kept in bulk; dataclass slots need Python 3.10+, so older
+# interpreters get regular classes. Usage: @dataclass(**DATACLASS_SLOTS)
+DATACLASS_SLOTS: Dict[str, bool] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+# format_bytes scale for each bit length of the byte count: (divisor, unit).
+# Each unit spans 10 bits; longer counts fall back to the last entry, PB.
+_BYTE_UNITS = ("B", "KB", "MB", "GB", "TB", "PB")
+_MAX_BYTE_BITS = 10 * (len(_BYTE_UNITS) - 1) + 1
+_BYTE_SCALES = tuple(
+    (1024.0**index, _BYTE_UNITS[index])
+    for index in (max(bits - 1, 0) // 10 for bits in range(_MAX_BYTE_BITS + 1))
+)
+
 
 def format_bytes(bytes_value: NumericValue, speed: bool = False) -> str:
     """Format bytes to human-readable string.
@@ -44,18 +59,16 @@ def format_bytes(bytes_value: NumericValue, speed: bool = False) -> str:
         >>> format_bytes(1099511627776)
         '1.0 TB'
     """
+    suffix = "/s" if speed else ""
     if bytes_value == 0:
-        suffix = "/s" if speed else ""
         return f"0 B{suffix}"
 
-    suffix = "/s" if speed else ""
-    value = float(bytes_value)
-
-    for unit in ["B", "KB", "MB", "GB", "TB"]:
-        if abs(value) < 1024.0:
-            return f"{value:.1f} {unit}{suffix}"
-        value /= 1024.0
-    return f"{value:.1f} PB{suffix}"
+    try:
+        divisor, unit = _BYTE_SCALES[int(abs(bytes_value)).bit_length()]
+    except (IndexError, OverflowError, ValueError):
+        # Past the table (over 2 PB), inf and NaN: all shown in the largest unit
+        divisor, unit = _BYTE_SCALES[-1]
+    return f"{bytes_value / divisor:.1f} {unit}{suffix}"
 
 
 def format_duration(seconds: NumericValue) -> str:
@@ -1427,7 +1427,7 @@ class NetworkMonitorApp(rumps.App):
 
         # Show most recent first
         for issue in reversed(issues):
-            time_str = issue.timestamp.strftime("%H:%M")
+            time_str = datetime.fromtimestamp(issue.timestamp).strftime("%H:%M")
             desc = issue.description[:35]
 
             # Make quality drop events clickable
@@ -2353,6 +2353,7 @@ class NetworkMonitorApp(rumps.App):
             }
 
             success = exporter.export_to_influxdb(export_data, endpoint, token, org, bucket)
+            exporter.close()
 
             if success:
                 rumps.notification(
@@ -2405,6 +2406,7 @@ class NetworkMonitorApp(rumps.App):
             }
 
             success = exporter.export_to_prometheus(export_data, gateway_url)
+            exporter.close()
 
             if success:
                 rumps.notification(
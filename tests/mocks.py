@@ -11,6 +11,7 @@ Usage:
 """
 
 import tempfile
+import time
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
@@ -65,13 +66,13 @@ class MockNetworkDevice:
 class MockNetworkIssue:
     """Mock network issue."""
 
-    timestamp: datetime = field(default_factory=datetime.now)
+    timestamp: float = field(default_factory=time.time)
     issue_type: str = "test"
     description: str = "Test issue"
 
     def to_dict(self) -> dict:
         return {
-            "timestamp": self.timestamp.isoformat(),
+            "timestamp": datetime.fromtimestamp(self.timestamp).isoformat(),
             "type": self.issue_type,
             "description": self.description,
         }
@@ -241,6 +242,9 @@ class MockNetworkScanner:
     def resolve_missing_hostnames(self) -> None:
         pass
 
+    def stop_hostname_resolution(self) -> None:
+        pass
+
     def get_all_devices(self) -> List[MockNetworkDevice]:
         return self._devices
 
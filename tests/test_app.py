@@ -277,6 +277,7 @@ class TestAppController:
 
         assert not controller._running
         assert len(events) == 1
+        mock_deps.geolocation_service.flush.assert_called_once()
 
     def test_controller_update_returns_state(self, mock_deps):
         """Update should return current state dictionary."""
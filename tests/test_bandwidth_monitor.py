@@ -2,11 +2,11 @@
 
 from unittest.mock import patch
 
-from monitor.bandwidth_monitor import BandwidthAlert, BandwidthMonitor, BandwidthSample
+from monitor.bandwidth_monitor import BandwidthAlert, BandwidthMonitor, BandwidthSample, _AppState
 
 
 class TestBandwidthSample:
-    """Tests for BandwidthSample dataclass."""
+    """Tests for BandwidthSample tuple."""
 
     def test_creation(self):
         """Test creating a bandwidth sample."""
@@ -15,6 +15,12 @@ class TestBandwidthSample:
         assert sample.bytes_in == 1000
         assert sample.bytes_out == 500
 
+    def test_is_immutable_tuple(self):
+        """Samples are compact tuples without a per-instance __dict__."""
+        sample = BandwidthSample(1.0, 10, 20)
+        assert tuple(sample) == (1.0, 10, 20)
+        assert not hasattr(sample, "__dict__")
+
 
 class TestBandwidthAlert:
     """Tests for BandwidthAlert dataclass."""
@@ -34,15 +40,30 @@ class TestBandwidthAlert:
         assert alert.window_seconds == 30
 
 
+class TestAppState:
+    """Tests for the per-app _AppState record."""
+
+    def test_defaults(self):
+        """A fresh state has an empty window and no baseline."""
+        state = _AppState(window_seconds=10)
+        assert len(state.samples) == 0
+        assert state.samples.maxlen == 10
+        assert state.prev_in is None
+        assert state.window_total == 0
+        assert state.last_alert is None
+
+    def test_is_slotted(self):
+        """State uses __slots__, so it has no per-instance __dict__."""
+        assert not hasattr(_AppState(1), "__dict__")
+
+
 class TestBandwidthMonitor:
     """Tests for BandwidthMonitor class."""
 
     def test_init(self):
         """Test monitor initialization."""
         monitor = BandwidthMonitor()
-        assert monitor._app_samples == {}
-        assert monitor._previous_bytes == {}
-        assert monitor._alerted_apps == {}
+        assert monitor._states == {}
         assert monitor._alert_cooldown == 300.0
 
     def test_check_thresholds_empty_thresholds(self):
@@ -79,7 +100,7 @@ class TestBandwidthMonitor:
 
         alerts = monitor.check_thresholds(process_traffic, thresholds)
         assert alerts == []
-        assert "Safari" in monitor._app_samples
+        assert "Safari" in monitor._states
 
     def test_check_thresholds_accumulates_samples(self):
         """Test that samples are accumulated over time."""
@@ -92,7 +113,7 @@ class TestBandwidthMonitor:
         # Second call adds sample
         monitor.check_thresholds([("Safari", 2000, 1000, 2)], thresholds)
 
-        assert len(monitor._app_samples["Safari"]) == 1
+        assert len(monitor._states["Safari"].samples) == 1
 
     @patch("monitor.bandwidth_monitor.time")
     def test_check_thresholds_triggers_alert(self, mock_time_module):
@@ -100,7 +121,8 @@ class TestBandwidthMonitor:
         monitor = BandwidthMonitor()
 
         # Simulate time progression
-        mock_time_module.time.side_effect = [1000.0, 1001.0, 1002.0, 1003.0, 1004.0, 1005.0]
+        mock_time_module.monotonic.side_effect = [1000.0, 1001.0, 1002.0, 1003.0, 1004.0, 1005.0]
+        mock_time_module.time.return_value = 1_700_000_000.0
 
         # 1 Mbps = 125,000 bytes/sec
         # Set threshold to 0.1 Mbps = 12,500 bytes/sec
@@ -118,8 +140,9 @@ class TestBandwidthMonitor:
         # Should trigger alert (high bandwidth)
         assert len(alerts) == 1
         assert alerts[0].app_name == "Safari"
+        assert alerts[0].timestamp == 1_700_000_000.0  # Wall clock for display
 
-    @patch("time.time")
+    @patch("time.monotonic")
     def test_check_thresholds_alert_cooldown(self, mock_time):
         """Test that alert cooldown prevents alert spam."""
         monitor = BandwidthMonitor()
@@ -127,36 +150,91 @@ class TestBandwidthMonitor:
 
         # Mark Safari as recently alerted
         mock_time.return_value = 1000.0
-        monitor._alerted_apps["Safari"] = 990.0  # 10 seconds ago
+        state = monitor._states["Safari"] = _AppState(window_seconds=30)
+        state.last_alert = 990.0  # 10 seconds ago
 
         # Even with high bandwidth, should not alert due to cooldown
         thresholds = {"Safari": 0.1}
 
         # Set up samples manually to simulate threshold violation
-        from collections import deque
-
-        monitor._app_samples["Safari"] = deque(
+        state.samples.extend(
             [
                 BandwidthSample(998.0, 100000, 100000),
                 BandwidthSample(999.0, 100000, 100000),
-            ],
-            maxlen=30,
+            ]
         )
-        monitor._previous_bytes["Safari"] = (200000, 200000)
+        state.window_total = 400000
+        state.prev_in = 200000
+        state.prev_out = 200000
 
         alerts = monitor.check_thresholds([("Safari", 300000, 300000, 2)], thresholds)
 
         # Should not trigger due to cooldown
         assert len(alerts) == 0
 
+    @patch("monitor.bandwidth_monitor.time")
+    def test_window_total_tracks_evictions(self, mock_time_module):
+        """Running window total should match the samples left in the deque."""
+        monitor = BandwidthMonitor()
+        mock_time_module.monotonic.side_effect = [float(t) for t in range(1000, 1010)]
+        thresholds = {"Safari": 1000.0}  # High threshold, won't trigger
+
+        total = 0
+        for i in range(10):
+            total += i * 100
+            monitor.check_thresholds([("Safari", total, 0, 1)], thresholds, window_seconds=3)
+
+        state = monitor._states["Safari"]
+        assert len(state.samples) == 3
+        assert state.window_total == sum(s.bytes_in + s.bytes_out for s in state.samples)
+
+    def test_clear_samples_rebaselines(self):
+        """After clear_samples the next check should only set a new baseline."""
+        monitor = BandwidthMonitor()
+        thresholds = {"Safari": 0.001}
+
+        monitor.check_thresholds([("Safari", 1000, 500, 2)], thresholds)
+        monitor.check_thresholds([("Safari", 2000, 1000, 2)], thresholds)
+        monitor.clear_samples()
+        monitor.check_thresholds([("Safari", 500_000_000, 500_000_000, 2)], thresholds)
+
+        state = monitor._states["Safari"]
+        assert len(state.samples) == 0
+        assert state.prev_in == 500_000_000
+        assert state.prev_out == 500_000_000
+
+    def test_counter_reset_clamps_delta(self):
+        """A counter that goes backwards should record a zero delta, not a negative one."""
+        monitor = BandwidthMonitor()
+        thresholds = {"Safari": 1000.0}
+
+        monitor.check_thresholds([("Safari", 5000, 5000, 2)], thresholds)
+        monitor.check_thresholds([("Safari", 100, 6000, 2)], thresholds)
+
+        state = monitor._states["Safari"]
+        assert state.samples[-1].bytes_in == 0
+        assert state.samples[-1].bytes_out == 1000
+        assert state.prev_in == 100
+
+    def test_window_change_resizes_deques(self):
+        """Changing window_seconds should recreate deques with the new maxlen."""
+        monitor = BandwidthMonitor()
+        thresholds = {"Safari": 100.0}
+
+        monitor.check_thresholds([("Safari", 1000, 500, 2)], thresholds, window_seconds=30)
+        monitor.check_thresholds([("Safari", 2000, 500, 2)], thresholds, window_seconds=10)
+
+        assert monitor._states["Safari"].samples.maxlen == 10
+
     def test_reset_alert_cooldown(self):
         """Test resetting alert cooldown for an app."""
         monitor = BandwidthMonitor()
-        monitor._alerted_apps["Safari"] = 1234567890.0
+        state = monitor._states["Safari"] = _AppState(window_seconds=30)
+        state.last_alert = 1234567890.0
 
         monitor.reset_alert_cooldown("Safari")
 
-        assert "Safari" not in monitor._alerted_apps
+        assert state.last_alert is None
 
     def test_reset_alert_cooldown_nonexistent(self):
         """Test reset_alert_cooldown for app that hasn't alerted."""
@@ -170,14 +248,19 @@ class TestBandwidthMonitor:
         monitor = BandwidthMonitor()
 
         # Add some data
-        from collections import deque
-
-        monitor._app_samples["Safari"] = deque([BandwidthSample(1.0, 100, 100)])
-        monitor._previous_bytes["Safari"] = (100, 100)
-        monitor._alerted_apps["Safari"] = 1000.0
-
+        state = monitor._states["Safari"] = _AppState(window_seconds=30)
+        state.samples.append(BandwidthSample(1.0, 100, 100))
+        state.window_total = 200
+        state.prev_in = 100
+        state.prev_out = 100
+        state.last_alert = 1000.0
+
+        samples = state.samples
         monitor.clear_samples()
 
-        assert monitor._app_samples == {}
-        assert monitor._previous_bytes == {}
-        assert monitor._alerted_apps == {}
+        assert monitor._states["Safari"] is state
+        assert state.samples is samples
+        assert len(samples) == 0
+        assert state.prev_in is None
+        assert state.window_total == 0
+        assert state.last_alert is None
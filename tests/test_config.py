@@ -1,5 +1,6 @@
 """Tests for the config module."""
 
+import os
 import tempfile
 from pathlib import Path
 
@@ -14,6 +15,7 @@ from config.exceptions import (
     SubprocessError,
 )
 from config.logging_config import LogContext, get_logger, setup_logging
+from config.singleton import SingletonLock
 from config.subprocess_cache import SubprocessCache, get_subprocess_cache, safe_run
 
 
@@ -204,6 +206,30 @@ class TestSubprocessCache:
         assert cache1 is cache2
 
 
+class TestSingletonLock:
+    """Tests for SingletonLock pid file handling."""
+
+    def test_pid_file_round_trip(self, tmp_path, monkeypatch):
+        """_write_pid should produce a file get_running_pid can read back."""
+        monkeypatch.setattr(tempfile, "gettempdir", lambda: str(tmp_path))
+        lock = SingletonLock("test-lock")
+
+        lock._write_pid()
+
+        assert lock.get_running_pid() == os.getpid()
+
+        lock._remove_pid()
+        assert lock.get_running_pid() is None
+
+    def test_get_running_pid_ignores_garbage(self, tmp_path, monkeypatch):
+        """A corrupt pid file should be treated as no running instance."""
+        monkeypatch.setattr(tempfile, "gettempdir", lambda: str(tmp_path))
+        lock = SingletonLock("test-lock")
+        (tmp_path / "test-lock.pid").write_bytes(b"\xff\xfenot-a-pid")
+
+        assert lock.get_running_pid() is None
+
+
 @pytest.fixture
 def temp_data_dir():
     """Create a temporary directory for test data."""
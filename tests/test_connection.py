@@ -1,5 +1,6 @@
 """Tests for connection detection."""
 
+import socket
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -144,11 +145,11 @@ class TestConnectionDetector:
 
         # Mock interface addresses
         mock_addr = MagicMock()
-        mock_addr.family.name = "AF_INET"
+        mock_addr.family = socket.AF_INET
         mock_addr.address = "192.168.1.100"
 
         mock_lo_addr = MagicMock()
-        mock_lo_addr.family.name = "AF_INET"
+        mock_lo_addr.family = socket.AF_INET
         mock_lo_addr.address = "127.0.0.1"
 
         mock_addrs.return_value = {
@@ -164,7 +165,7 @@ class TestConnectionDetector:
     def test_get_ip_address(self, mock_addrs, detector):
         """Test getting IP address for an interface."""
         mock_addr = MagicMock()
-        mock_addr.family.name = "AF_INET"
+        mock_addr.family = socket.AF_INET
         mock_addr.address = "192.168.1.100"
 
         mock_addrs.return_value = {"en0": [mock_addr]}
@@ -172,6 +173,29 @@ class TestConnectionDetector:
         ip = detector._get_ip_address("en0")
         assert ip == "192.168.1.100"
 
+    @patch("psutil.net_if_stats")
+    @patch("psutil.net_if_addrs")
+    def test_get_ip_address_reuses_snapshot(self, mock_addrs, mock_stats, detector):
+        """Test that address lookups after interface detection don't re-enumerate."""
+        mock_stats.return_value = {"en0": MagicMock(isup=True)}
+        mock_addr = MagicMock()
+        mock_addr.family = socket.AF_INET
+        mock_addr.address = "192.168.1.100"
+        mock_addrs.return_value = {"en0": [mock_addr]}
+
+        assert detector._get_active_interfaces() == ["en0"]
+        assert detector._get_ip_address("en0") == "192.168.1.100"
+        assert mock_addrs.call_count == 1
+
+    def test_get_ip_address_explicit_addrs(self, detector):
+        """Test passing an already-fetched address map."""
+        mock_addr = MagicMock()
+        mock_addr.family = socket.AF_INET
+        mock_addr.address = "10.0.0.5"
+        with patch("psutil.net_if_addrs") as mock_addrs:
+            assert detector._get_ip_address("en1", {"en1": [mock_addr]}) == "10.0.0.5"
+            mock_addrs.assert_not_called()
+
     def test_get_ip_address_not_found(self, detector):
         """Test getting IP address for non-existent interface."""
         with patch("psutil.net_if_addrs", return_value={}):
@@ -202,7 +226,7 @@ class TestVPNDetection:
         }
 
         mock_addr = MagicMock()
-        mock_addr.family.name = "AF_INET"
+        mock_addr.family = socket.AF_INET
         mock_addrs.return_value = {
             "utun0": [mock_addr],
         }
@@ -211,6 +235,21 @@ class TestVPNDetection:
         assert result is not None
         assert "utun0" in result
 
+    @patch("psutil.net_if_stats")
+    @patch("psutil.net_if_addrs")
+    def test_interface_snapshot_shared(self, mock_addrs, mock_stats, detector):
+        """Test that interface and VPN checks share one psutil snapshot."""
+        mock_stats.return_value = {"en0": MagicMock(isup=True)}
+        mock_addr = MagicMock()
+        mock_addr.family = socket.AF_INET
+        mock_addr.address = "192.168.1.2"
+        mock_addrs.return_value = {"en0": [mock_addr]}
+
+        assert detector._get_active_interfaces() == ["en0"]
+        assert detector._check_vpn_interfaces() is None
+        assert mock_stats.call_count == 1
+        assert mock_addrs.call_count == 1
+
     @patch("psutil.process_iter")
     def test_check_vpn_processes(self, mock_process_iter, detector):
         """Test detecting VPN via running process."""
@@ -221,6 +260,34 @@ class TestVPNDetection:
         result = detector._check_vpn_processes()
         assert result == "openvpn"
 
+    @patch("psutil.process_iter")
+    def test_check_vpn_processes_skips_unnamed(self, mock_process_iter, detector):
+        """Test that processes without a readable name don't abort the scan."""
+        unnamed = MagicMock()
+        unnamed.info = {"name": None}
+        vpn = MagicMock()
+        vpn.info = {"name": "Tunnelblick"}
+        mock_process_iter.return_value = [unnamed, vpn]
+
+        assert detector._check_vpn_processes() == "Tunnelblick"
+
+    @patch("psutil.process_iter")
+    def test_check_vpn_processes_cached(self, mock_process_iter, detector):
+        """Test that the VPN process scan is reused within the TTL."""
+        mock_proc = MagicMock()
+        mock_proc.info = {"name": "WireGuard"}
+        mock_process_iter.return_value = [mock_proc]
+
+        assert detector._check_vpn_processes() == "WireGuard"
+        assert detector._check_vpn_processes() == "WireGuard"
+        assert mock_process_iter.call_count == 1
+
+        # Expired cache triggers a fresh scan
+        detector._vpn_proc_ttl = 0.0
+        mock_process_iter.return_value = []
+        assert detector._check_vpn_processes() is None
+        assert mock_process_iter.call_count == 2
+
 
 class TestWifiSSID:
     """Tests for WiFi SSID detection."""
@@ -307,6 +374,26 @@ class TestInterfaceType:
             iface_type = detector._get_interface_type("en1")
             assert iface_type == "Ethernet"
 
+    def test_get_interface_type_exact_device_match(self, detector):
+        """Test that en1 does not match a later en10 device line."""
+        detector._subprocess_cache.run.return_value = MagicMock(
+            returncode=0,
+            stdout=(
+                "Hardware Port: Thunderbolt Bridge\nDevice: en10\n\n"
+                "Hardware Port: Ethernet\nDevice: en1\n"
+            ),
+        )
+
+        assert detector._get_interface_type("en1") == "Ethernet"
+        assert detector._get_interface_type("en10") == "Thunderbolt Bridge"
+
+    def test_hwports_map_parsed_once_per_output(self, detector):
+        """Test that unchanged command output is not re-parsed."""
+        first = detector._get_hwports_map()
+        second = detector._get_hwports_map()
+        assert first is second
+        assert first == {"en0": "Wi-Fi"}
+
     def test_get_interface_type_unknown(self, detector):
         """Test unknown interface type."""
         with patch("monitor.connection.get_subprocess_cache") as mock:
@@ -374,6 +461,17 @@ class TestGetCurrentConnection:
                     assert conn.is_connected is True
                     assert conn.connection_type == "Ethernet"
 
+    def test_get_current_connection_cached(self, detector):
+        """Test back-to-back calls reuse one detection pass."""
+        with patch.object(detector, "_get_active_interfaces", return_value=[]) as mock_active:
+            detector.get_current_connection()
+            assert detector.get_connection_key() == "Disconnected"
+            assert mock_active.call_count == 1
+
+            detector._conn_cache = None  # Expire the cached result
+            detector.get_current_connection()
+            assert mock_active.call_count == 2
+
     def test_get_current_connection_bridge(self, detector):
         """Test get_current_connection with bridge interface."""
         detector._wifi_interface = "en1"
@@ -41,7 +41,6 @@ class TestConnectionTracker:
         tracker = ConnectionTracker()
         assert tracker._geolocation is None
         assert tracker._app_connections == {}
-        assert tracker._seen_ips == set()
 
     def test_init_with_geolocation(self):
         """Test tracker initialization with geolocation service."""
@@ -82,6 +81,19 @@ class TestConnectionTracker:
         assert tracker._is_external_ip("1.1.1.1") is True
         assert tracker._is_external_ip("142.250.80.46") is True
 
+    def test_is_external_ip_cgnat(self):
+        """Test is_external_ip returns False for carrier-grade NAT space."""
+        tracker = ConnectionTracker()
+        assert tracker._is_external_ip("100.64.0.1") is False
+        assert tracker._is_external_ip("100.127.255.254") is False
+
+    def test_is_external_ip_ipv6(self):
+        """Test is_external_ip falls back to ipaddress for IPv6."""
+        tracker = ConnectionTracker()
+        assert tracker._is_external_ip("2001:4860:4860::8888") is True
+        assert tracker._is_external_ip("::1") is False
+        assert tracker._is_external_ip("fe80::1") is False
+
     def test_is_external_ip_invalid(self):
         """Test is_external_ip returns False for invalid IPs."""
         tracker = ConnectionTracker()
@@ -179,7 +191,7 @@ class TestConnectionTracker:
     def test_get_external_connections_with_geolocation(self, mock_net_connections, mock_process):
         """Test that geolocation is looked up when service provided."""
         mock_geo = MagicMock()
-        mock_geo.lookup_country.return_value = "US"
+        mock_geo.lookup_countries.return_value = {"8.8.8.8": "US"}
         tracker = ConnectionTracker(geolocation_service=mock_geo)
 
         mock_conn = MagicMock()
@@ -197,7 +209,7 @@ class TestConnectionTracker:
 
         result = tracker.get_external_connections()
 
-        mock_geo.lookup_country.assert_called_once_with("8.8.8.8")
+        mock_geo.lookup_countries.assert_called_once_with({"8.8.8.8"})
         assert result["Safari"][0].country_code == "US"
 
     @patch("psutil.net_connections")
@@ -217,7 +229,11 @@ class TestConnectionTracker:
     def test_get_countries_per_app(self, mock_net_connections, mock_process):
         """Test get_countries_per_app returns unique countries."""
         mock_geo = MagicMock()
-        mock_geo.lookup_country.side_effect = ["US", "DE", "US"]  # Duplicate US
+        mock_geo.lookup_countries.return_value = {
+            "8.8.8.8": "US",
+            "1.1.1.1": "DE",
+            "142.250.80.46": "US",  # Duplicate US
+        }
         tracker = ConnectionTracker(geolocation_service=mock_geo)
 
         # Create multiple connections
@@ -242,3 +258,127 @@ class TestConnectionTracker:
         # Should have unique, sorted countries
         assert "Safari" in result
         assert result["Safari"] == ["DE", "US"]  # Sorted, unique
+
+    @patch("psutil.Process")
+    @patch("psutil.net_connections")
+    def test_process_name_resolved_once_per_pid(self, mock_net_connections, mock_process):
+        """Connections sharing a PID should trigger a single name lookup."""
+        tracker = ConnectionTracker()
+
+        conns = []
+        for i, ip in enumerate(["8.8.8.8", "1.1.1.1"]):
+            mock_conn = MagicMock()
+            mock_conn.status = "ESTABLISHED"
+            mock_conn.raddr.ip = ip
+            mock_conn.raddr.port = 443
+            mock_conn.laddr.port = 54320 + i
+            mock_conn.pid = 1234
+            conns.append(mock_conn)
+        mock_net_connections.return_value = conns
+
+        mock_proc = MagicMock()
+        mock_proc.name.return_value = "Safari"
+        mock_proc.create_time.return_value = 1000.0
+        mock_process.return_value = mock_proc
+
+        result = tracker.get_external_connections()
+        assert len(result["Safari"]) == 2
+        assert mock_proc.name.call_count == 1
+
+        # Same PID and create time on the next poll reuses the cached name
+        tracker.get_external_connections()
+        assert mock_proc.name.call_count == 1
+
+        # A recycled PID (new create time) is looked up again
+        mock_proc.create_time.return_value = 2000.0
+        tracker.get_external_connections()
+        assert mock_proc.name.call_count == 2
+
+    @patch("psutil.Process")
+    @patch("psutil.net_connections")
+    def test_connections_persist_across_polls(self, mock_net_connections, mock_process):
+        """Long-lived connections keep their ConnectionInfo; closed ones are dropped."""
+        mock_geo = MagicMock()
+        mock_geo.lookup_countries.return_value = {"8.8.8.8": "US"}
+        tracker = ConnectionTracker(geolocation_service=mock_geo)
+
+        mock_conn = MagicMock()
+        mock_conn.status = "ESTABLISHED"
+        mock_conn.raddr.ip = "8.8.8.8"
+        mock_conn.raddr.port = 443
+        mock_conn.laddr.port = 54321
+        mock_conn.pid = 1234
+        mock_net_connections.return_value = [mock_conn]
+
+        mock_proc = MagicMock()
+        mock_proc.name.return_value = "Safari"
+        mock_proc.create_time.return_value = 1000.0
+        mock_process.return_value = mock_proc
+
+        first = tracker.get_external_connections()["Safari"][0]
+        second = tracker.get_external_connections()["Safari"][0]
+
+        assert second is first
+        assert second.country_code == "US"
+        assert mock_geo.lookup_countries.call_count == 1
+        assert second.last_seen > 0
+
+        mock_net_connections.return_value = []
+        assert tracker.get_external_connections() == {}
+        assert tracker._active_conns == {}
+
+    @patch("psutil.Process")
+    @patch("psutil.net_connections")
+    def test_failed_country_lookup_retried_while_connected(
+        self, mock_net_connections, mock_process
+    ):
+        """A live connection whose first lookup failed is looked up again next poll."""
+        mock_geo = MagicMock()
+        mock_geo.lookup_countries.side_effect = [{"8.8.8.8": None}, {"8.8.8.8": "US"}]
+        tracker = ConnectionTracker(geolocation_service=mock_geo)
+
+        mock_conn = MagicMock()
+        mock_conn.status = "ESTABLISHED"
+        mock_conn.raddr.ip = "8.8.8.8"
+        mock_conn.raddr.port = 443
+        mock_conn.laddr.port = 54321
+        mock_conn.pid = 1234
+        mock_net_connections.return_value = [mock_conn]
+        mock_process.return_value.name.return_value = "Safari"
+        mock_process.return_value.create_time.return_value = 1000.0
+
+        first = tracker.get_external_connections()["Safari"][0]
+        assert first.country_code is None
+
+        second = tracker.get_external_connections()["Safari"][0]
+
+        assert second is first
+        assert second.country_code == "US"
+        assert mock_geo.lookup_countries.call_count == 2
+
+    @patch("psutil.Process")
+    @patch("psutil.net_connections")
+    def test_new_connection_to_known_ip_gets_country(self, mock_net_connections, mock_process):
+        """A second connection to an already-resolved IP gets its country on first poll."""
+        mock_geo = MagicMock()
+        mock_geo.lookup_countries.return_value = {"8.8.8.8": "US"}
+        tracker = ConnectionTracker(geolocation_service=mock_geo)
+        mock_process.return_value.name.return_value = "Safari"
+        mock_process.return_value.create_time.return_value = 1000.0
+
+        def established(local_port):
+            conn = MagicMock()
+            conn.status = "ESTABLISHED"
+            conn.raddr.ip = "8.8.8.8"
+            conn.raddr.port = 443
+            conn.laddr.port = local_port
+            conn.pid = 1234
+            return conn
+
+        mock_net_connections.return_value = [established(50001)]
+        tracker.get_external_connections()
+
+        mock_net_connections.return_value = [established(50001), established(50002)]
+        conns = tracker.get_external_connections()["Safari"]
+
+        assert [c.country_code for c in conns] == ["US", "US"]
@@ -1,11 +1,22 @@
 """Tests for monitor/dns_monitor.py - DNS performance monitoring."""
 
+import socket
+import threading
+import time
 from collections import deque
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
+
+import pytest
 
 from monitor.dns_monitor import DNSMonitor
 
 
+@pytest.fixture(autouse=True)
+def no_dnspython(monkeypatch):
+    """Use the getaddrinfo path regardless of whether dnspython is installed."""
+    monkeypatch.setattr("monitor.dns_monitor.dns", None)
+
+
 class TestDNSMonitor:
     """Tests for DNSMonitor class."""
 
@@ -22,9 +33,9 @@ class TestDNSMonitor:
         assert len(DNSMonitor.TEST_DOMAINS) > 0
         assert "google.com" in DNSMonitor.TEST_DOMAINS
 
-    @patch("socket.gethostbyname")
+    @patch("socket.getaddrinfo")
     @patch("time.time")
-    def test_check_dns_performance_success(self, mock_time, mock_gethostbyname):
+    def test_check_dns_performance_success(self, mock_time, mock_getaddrinfo):
         """Test successful DNS performance check."""
         monitor = DNSMonitor()
 
@@ -33,7 +44,9 @@ class TestDNSMonitor:
         monitor._last_check = 0  # Force check
 
         # Mock fast DNS resolution
-        mock_gethostbyname.return_value = "142.250.80.46"
+        mock_getaddrinfo.return_value = [
+            (2, 1, 6, "", ("142.250.80.46", 0)),
+        ]
 
         result = monitor.check_dns_performance(force=True)
 
@@ -41,14 +54,90 @@ class TestDNSMonitor:
         assert result >= 0
         assert len(monitor._latency_samples) > 0
 
-    @patch("socket.gethostbyname")
-    def test_check_dns_performance_all_fail(self, mock_gethostbyname):
+    @patch("socket.getaddrinfo")
+    def test_check_dns_performance_rotates_single_probe(self, mock_getaddrinfo):
+        """Test that a healthy check resolves one domain, rotating each time."""
+        monitor = DNSMonitor()
+        mock_getaddrinfo.return_value = [(2, 1, 6, "", ("1.1.1.1", 0))]
+
+        for _ in DNSMonitor.TEST_DOMAINS:
+            monitor.check_dns_performance(force=True)
+
+        resolved = [call.args[0] for call in mock_getaddrinfo.call_args_list]
+        assert resolved == DNSMonitor.TEST_DOMAINS
+        assert set(monitor._domain_latencies) == set(DNSMonitor.TEST_DOMAINS)
+
+    @patch.object(DNSMonitor, "_resolve_domain")
+    def test_check_dns_performance_fans_out_when_slow(self, mock_resolve):
+        """Test that a slow probe triggers resolving every test domain."""
+        monitor = DNSMonitor()
+        monitor._slow_dns_threshold = 100.0
+        mock_resolve.return_value = 80.0  # Above half the threshold
+
+        result = monitor.check_dns_performance(force=True)
+
+        resolved = [call.args[0] for call in mock_resolve.call_args_list]
+        assert resolved[0] == DNSMonitor.TEST_DOMAINS[0]
+        assert set(resolved[1:]) == set(DNSMonitor.TEST_DOMAINS)
+        assert result == 80.0
+
+    @patch.object(DNSMonitor, "_resolve_domain")
+    def test_failed_domain_drops_its_last_latency(self, mock_resolve):
+        """Test that a domain that stops resolving is no longer averaged in."""
+        monitor = DNSMonitor()
+        monitor._slow_dns_threshold = 1000.0
+        first, second = DNSMonitor.TEST_DOMAINS[:2]
+        latencies = {first: 10.0, second: 30.0}
+        mock_resolve.side_effect = lambda domain: latencies.get(domain)
+
+        monitor.check_dns_performance(force=True)
+        assert monitor.check_dns_performance(force=True) == 20.0
+
+        # The first domain now fails: the probe fans out to every domain
+        del latencies[first]
+        monitor._rotation_index = 0
+        assert monitor.check_dns_performance(force=True) == 30.0
+        assert first not in monitor._domain_latencies
+
+    def test_resolve_all_waits_one_timeout_in_total(self, monkeypatch):
+        """Test that slow lookups share one timeout rather than one each."""
+        monkeypatch.setattr("monitor.dns_monitor._RESOLVE_TIMEOUT_SECONDS", 0.1)
+        release = threading.Event()
+
+        def resolve(domain):
+            if domain.startswith("slow"):
+                release.wait(5.0)
+                return None
+            return 5.0
+
+        monitor = DNSMonitor()
+        start = time.monotonic()
+        with patch.object(monitor, "_resolve_domain", side_effect=resolve):
+            latencies = monitor._resolve_all(["slow1.test", "slow2.test", "slow3.test", "ok.test"])
+            elapsed = time.monotonic() - start
+            release.set()
+
+        assert latencies == {"ok.test": 5.0}
+        assert elapsed < 0.25
+
+    @patch.object(DNSMonitor, "_resolve_domain")
+    def test_check_dns_performance_averages_rotation(self, mock_resolve):
+        """Test that each sample averages the latest latency of every domain seen."""
+        monitor = DNSMonitor()
+        monitor._slow_dns_threshold = 1000.0
+        mock_resolve.side_effect = [10.0, 30.0]
+
+        assert monitor.check_dns_performance(force=True) == 10.0
+        assert monitor.check_dns_performance(force=True) == 20.0
+
+    @patch("socket.getaddrinfo")
+    def test_check_dns_performance_all_fail(self, mock_getaddrinfo):
         """Test DNS check when all resolutions fail."""
         monitor = DNSMonitor()
         monitor._last_check = 0
 
         # Mock DNS failure
-        mock_gethostbyname.side_effect = Exception("DNS resolution failed")
+        mock_getaddrinfo.side_effect = Exception("DNS resolution failed")
 
         result = monitor.check_dns_performance(force=True)
 
@@ -64,30 +153,48 @@ class TestDNSMonitor:
         monitor._last_check = 1000.0  # Just checked
 
         # Add a sample so get_average returns something
-        monitor._latency_samples.append(50.0)
+        monitor._add_sample(50.0)
 
         result = monitor.check_dns_performance(force=False)
 
         # Should return cached average, not do new check
         assert result == 50.0
 
-    @patch("socket.gethostbyname")
-    def test_resolve_domain_success(self, mock_gethostbyname):
+    @patch("socket.getaddrinfo")
+    def test_resolve_domain_success(self, mock_getaddrinfo):
         """Test successful domain resolution."""
         monitor = DNSMonitor()
-        mock_gethostbyname.return_value = "142.250.80.46"
+        mock_getaddrinfo.return_value = [
+            (2, 1, 6, "", ("142.250.80.46", 0)),
+        ]
 
         result = monitor._resolve_domain("google.com")
 
         assert result is not None
         assert result >= 0
-        mock_gethostbyname.assert_called_once_with("google.com")
+        mock_getaddrinfo.assert_called_once_with("google.com", None, type=socket.SOCK_STREAM)
+
+    @patch("socket.getaddrinfo")
+    def test_resolve_domain_direct_resolver(self, mock_getaddrinfo):
+        """Test that a direct resolver is preferred over getaddrinfo."""
+        monitor = DNSMonitor()
+        monitor._resolver = MagicMock()
+
+        result = monitor._resolve_domain("google.com")
+
+        assert result is not None
+        monitor._resolver.resolve.assert_called_once_with("google.com", "A")
+        mock_getaddrinfo.assert_not_called()
+
+    def test_create_resolver_without_dnspython(self):
+        """Test that no resolver is created when dnspython is missing."""
+        assert DNSMonitor._create_resolver() is None
 
-    @patch("socket.gethostbyname")
-    def test_resolve_domain_failure(self, mock_gethostbyname):
+    @patch("socket.getaddrinfo")
+    def test_resolve_domain_failure(self, mock_getaddrinfo):
         """Test domain resolution failure."""
         monitor = DNSMonitor()
-        mock_gethostbyname.side_effect = Exception("DNS error")
+        mock_getaddrinfo.side_effect = Exception("DNS error")
 
         result = monitor._resolve_domain("nonexistent.invalid")
 
@@ -104,12 +211,23 @@ class TestDNSMonitor:
     def test_get_average_dns_latency_with_samples(self):
         """Test get_average_dns_latency with samples."""
         monitor = DNSMonitor()
-        monitor._latency_samples.extend([10.0, 20.0, 30.0])
+        for latency in (10.0, 20.0, 30.0):
+            monitor._add_sample(latency)
 
         result = monitor.get_average_dns_latency()
 
         assert result == 20.0  # (10 + 20 + 30) / 3
 
+    def test_average_tracks_evicted_samples(self):
+        """Running average should only cover samples still in the window."""
+        monitor = DNSMonitor()
+        maxlen = monitor._latency_samples.maxlen
+        for i in range(maxlen + 5):
+            monitor._add_sample(float(i))
+
+        expected = sum(monitor._latency_samples) / len(monitor._latency_samples)
+        assert monitor.get_average_dns_latency() == pytest.approx(expected)
+
     def test_get_current_dns_latency_empty(self):
         """Test get_current_dns_latency with no samples."""
         monitor = DNSMonitor()
@@ -121,7 +239,8 @@ class TestDNSMonitor:
     def test_get_current_dns_latency_with_samples(self):
         """Test get_current_dns_latency returns most recent."""
         monitor = DNSMonitor()
-        monitor._latency_samples.extend([10.0, 20.0, 30.0])
+        for latency in (10.0, 20.0, 30.0):
+            monitor._add_sample(latency)
 
         result = monitor.get_current_dns_latency()
 
@@ -139,7 +258,8 @@ class TestDNSMonitor:
         """Test is_dns_slow with fast DNS."""
         monitor = DNSMonitor()
         monitor._slow_dns_threshold = 200.0
-        monitor._latency_samples.extend([10.0, 20.0, 30.0])
+        for latency in (10.0, 20.0, 30.0):
+            monitor._add_sample(latency)
 
         result = monitor.is_dns_slow()
 
@@ -149,7 +269,8 @@ class TestDNSMonitor:
         """Test is_dns_slow with slow DNS."""
         monitor = DNSMonitor()
         monitor._slow_dns_threshold = 100.0
-        monitor._latency_samples.extend([200.0, 250.0, 300.0])
+        for latency in (200.0, 250.0, 300.0):
+            monitor._add_sample(latency)
 
         result = monitor.is_dns_slow()
 
@@ -158,8 +279,11 @@ class TestDNSMonitor:
     def test_clear_samples(self):
         """Test clearing DNS samples."""
         monitor = DNSMonitor()
-        monitor._latency_samples.extend([10.0, 20.0, 30.0])
+        for latency in (10.0, 20.0, 30.0):
+            monitor._add_sample(latency)
 
         monitor.clear_samples()
 
         assert len(monitor._latency_samples) == 0
+        assert monitor.get_average_dns_latency() is None
+        assert monitor._latency_sum == 0.0
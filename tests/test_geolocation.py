@@ -1,10 +1,19 @@
 """Tests for monitor/geolocation.py - IP geolocation service."""
 
+import gc
+import http.client
 import json
+import socket
+import sqlite3
+import threading
 import time
+import weakref
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import ANY, MagicMock, patch
 
+import pytest
+
+from monitor import geolocation
 from monitor.geolocation import GeolocationService
 
 
@@ -17,32 +26,52 @@ class TestGeolocationService:
         assert service._cache == {}
         assert service.data_dir == tmp_path
 
-    def test_init_loads_existing_cache(self, tmp_path):
-        """Test service loads existing cache from disk."""
-        # Create a cache file
-        cache_file = tmp_path / "geolocation_cache.json"
-        cache_data = {
-            "8.8.8.8": {"country_code": "US", "country": "United States", "timestamp": time.time()}
-        }
-        with open(cache_file, "w") as f:
-            json.dump(cache_data, f)
+    def test_init_does_not_open_database(self, tmp_path):
+        """Test that constructing the service does no disk I/O."""
+        GeolocationService(data_dir=tmp_path)
+        assert not (tmp_path / "geolocation_cache.db").exists()
 
+    def test_lookup_reads_through_to_database(self, tmp_path):
+        """Test that entries missing from the hot cache are read from the database."""
         service = GeolocationService(data_dir=tmp_path)
+        service._cache["8.8.8.8"] = {"country_code": "US", "timestamp": time.time()}
+        service._pending["8.8.8.8"] = service._cache["8.8.8.8"]
+        service.flush()
 
-        assert "8.8.8.8" in service._cache
-        assert service._cache["8.8.8.8"]["country_code"] == "US"
+        fresh = GeolocationService(data_dir=tmp_path)
+        with patch("monitor.geolocation._http_request") as mock_http:
+            assert fresh.lookup_country("8.8.8.8") == "US"
+        mock_http.assert_not_called()
+        assert "8.8.8.8" in fresh._cache  # Promoted into the hot cache
 
-    def test_init_filters_expired_cache(self, tmp_path):
-        """Test service filters expired cache entries."""
+    def test_migrates_json_cache(self, tmp_path):
+        """Test that the old JSON cache is imported once, dropping expired entries."""
         cache_file = tmp_path / "geolocation_cache.json"
         old_timestamp = time.time() - (8 * 24 * 60 * 60)  # 8 days ago
-        cache_data = {"8.8.8.8": {"country_code": "US", "timestamp": old_timestamp}}
+        cache_data = {
+            "8.8.8.8": {"country_code": "US", "country": "United States", "timestamp": time.time()},
+            "1.1.1.1": {"country_code": "AU", "timestamp": old_timestamp},
+        }
         with open(cache_file, "w") as f:
             json.dump(cache_data, f)
 
         service = GeolocationService(data_dir=tmp_path)
 
-        assert "8.8.8.8" not in service._cache  # Expired
+        assert service._load_entry("8.8.8.8")["country_code"] == "US"
+        assert service._load_entry("1.1.1.1") is None  # Expired
+        assert not cache_file.exists()
+
+    def test_open_prunes_expired_rows(self, tmp_path):
+        """Test that expired rows are deleted when the database is opened."""
+        service = GeolocationService(data_dir=tmp_path)
+        old_timestamp = time.time() - (8 * 24 * 60 * 60)
+        service._pending["8.8.8.8"] = {"country_code": "US", "timestamp": old_timestamp}
+        service.flush()
+
+        GeolocationService(data_dir=tmp_path)._db()
+
+        with sqlite3.connect(tmp_path / "geolocation_cache.db") as conn:
+            assert conn.execute("SELECT COUNT(*) FROM geo").fetchone()[0] == 0
 
     def test_is_private_ip_10_range(self):
         """Test _is_private_ip for 10.x.x.x range."""
@@ -137,29 +166,21 @@ class TestGeolocationService:
 
         # Mock API call - use full path to ensure we're patching the right thing
         with patch.object(service, "_save_cache"):  # Don't save during test
-            with patch("monitor.geolocation.urlopen") as mock_urlopen:
-                mock_response = MagicMock()
-                mock_response.read.return_value = b'{"status": "success", "countryCode": "DE"}'
-                mock_response.__enter__ = MagicMock(return_value=mock_response)
-                mock_response.__exit__ = MagicMock(return_value=False)
-                mock_urlopen.return_value = mock_response
+            with patch("monitor.geolocation._http_request") as mock_http:
+                mock_http.return_value = b'{"status": "success", "countryCode": "DE"}'
 
                 result = service.lookup_country("8.8.8.8")
 
         assert result == "DE"  # Fresh lookup, not cached value
 
-    @patch("urllib.request.urlopen")
-    def test_lookup_country_api_success(self, mock_urlopen, tmp_path):
+    @patch("monitor.geolocation._http_request")
+    def test_lookup_country_api_success(self, mock_http, tmp_path):
         """Test lookup_country with successful API call."""
         service = GeolocationService(data_dir=tmp_path)
 
-        mock_response = MagicMock()
-        mock_response.read.return_value = (
+        mock_http.return_value = (
             b'{"status": "success", "countryCode": "US", "country": "United States"}'
         )
-        mock_response.__enter__ = MagicMock(return_value=mock_response)
-        mock_response.__exit__ = MagicMock(return_value=False)
-        mock_urlopen.return_value = mock_response
 
         result = service.lookup_country("8.8.8.8")
 
@@ -168,14 +189,12 @@ class TestGeolocationService:
 
     def test_lookup_country_api_failure(self, tmp_path):
         """Test lookup_country handles API failure."""
-        from urllib.error import URLError
-
         service = GeolocationService(data_dir=tmp_path)
         # Clear any cached entry
         service._cache.clear()
 
-        with patch("monitor.geolocation.urlopen") as mock_urlopen:
-            mock_urlopen.side_effect = URLError("Connection refused")
+        with patch("monitor.geolocation._http_request") as mock_http:
+            mock_http.side_effect = ConnectionRefusedError("Connection refused")
 
             result = service.lookup_country("8.8.8.8")
 
@@ -187,12 +206,8 @@ class TestGeolocationService:
         # Clear any cached entry
         service._cache.clear()
 
-        with patch("monitor.geolocation.urlopen") as mock_urlopen:
-            mock_response = MagicMock()
-            mock_response.read.return_value = b'{"status": "fail", "message": "private range"}'
-            mock_response.__enter__ = MagicMock(return_value=mock_response)
-            mock_response.__exit__ = MagicMock(return_value=False)
-            mock_urlopen.return_value = mock_response
+        with patch("monitor.geolocation._http_request") as mock_http:
+            mock_http.return_value = b'{"status": "fail", "message": "private range"}'
 
             result = service.lookup_country("8.8.8.8")
 
@@ -215,15 +230,194 @@ class TestGeolocationService:
         assert service.get_country_name("XX") == "XX"
 
     def test_save_cache(self, tmp_path):
-        """Test _save_cache writes to disk."""
+        """Test _save_cache writes pending entries to the database."""
         service = GeolocationService(data_dir=tmp_path)
-        service._cache["8.8.8.8"] = {"country_code": "US", "timestamp": time.time()}
+        service._pending["8.8.8.8"] = {"country_code": "US", "timestamp": time.time()}
 
         service._save_cache()
 
-        cache_file = tmp_path / "geolocation_cache.json"
-        assert cache_file.exists()
+        assert service._pending == {}
+        with sqlite3.connect(tmp_path / "geolocation_cache.db") as conn:
+            rows = conn.execute("SELECT ip, country_code FROM geo").fetchall()
+        assert rows == [("8.8.8.8", "US")]
+
+    def test_json_helpers_without_orjson(self, monkeypatch):
+        """Test the stdlib json fallback round-trips API payloads."""
+        monkeypatch.setattr("monitor.geolocation.orjson", None)
+        payload = ["8.8.8.8", "1.1.1.1"]
+
+        assert geolocation._json_loads(geolocation._json_dumps(payload)) == payload
+
+    def test_lookup_batches_cache_writes(self, tmp_path):
+        """Test that new entries are written in batches rather than per lookup."""
+        service = GeolocationService(data_dir=tmp_path)
+        service.SAVE_EVERY_N_ENTRIES = 2
+
+        with patch.object(service, "_save_cache", wraps=service._save_cache) as mock_save:
+            with patch("monitor.geolocation._http_request") as mock_http:
+                mock_http.return_value = b'{"status": "success", "countryCode": "US"}'
+
+                service.lookup_country("8.8.8.8")
+                assert mock_save.call_count == 0
+                assert len(service._pending) == 1
+
+                service.lookup_country("1.1.1.1")
+                assert mock_save.call_count == 1
+                assert service._pending == {}
+
+    def test_flush_writes_pending_entries(self, tmp_path):
+        """Test that flush saves only when there are unsaved entries."""
+        service = GeolocationService(data_dir=tmp_path)
+
+        with patch.object(service, "_save_cache") as mock_save:
+            service.flush()
+            mock_save.assert_not_called()
+
+            service._pending["8.8.8.8"] = {"country_code": "US", "timestamp": time.time()}
+            service.flush()
+            mock_save.assert_called_once()
+
+    def test_exit_flush_tracks_services_weakly(self, tmp_path):
+        """Test that the exit hook flushes live services without keeping them alive."""
+        service = GeolocationService(data_dir=tmp_path)
+        assert service in geolocation._services
+
+        with patch.object(service, "flush") as mock_flush:
+            geolocation._flush_services()
+            mock_flush.assert_called_once()
+
+        ref = weakref.ref(service)
+        del service
+        gc.collect()
+        assert ref() is None
+
+    def test_cache_evicts_least_recently_used(self, tmp_path):
+        """Test that the in-memory cache is bounded with LRU eviction."""
+        service = GeolocationService(data_dir=tmp_path)
+        service.MAX_CACHE_ENTRIES = 2
+        now = time.time()
+        service._cache["8.8.8.8"] = {"country_code": "US", "timestamp": now}
+        service._cache["1.1.1.1"] = {"country_code": "AU", "timestamp": now}
+
+        # A hit makes 8.8.8.8 the most recently used entry
+        assert service.lookup_country("8.8.8.8") == "US"
+
+        with patch("monitor.geolocation._http_request") as mock_http:
+            mock_http.return_value = b'{"status": "success", "countryCode": "DE"}'
+
+            service.lookup_country("9.9.9.9")
+
+        assert list(service._cache) == ["8.8.8.8", "9.9.9.9"]
+
+    def test_lookup_countries_batches_uncached(self, tmp_path):
+        """Test that only uncached public IPs go to the batch endpoint, in one request."""
+        service = GeolocationService(data_dir=tmp_path)
+        service._cache["8.8.8.8"] = {"country_code": "US", "timestamp": time.time()}
+
+        with patch("monitor.geolocation._http_request") as mock_http:
+            mock_http.return_value = json.dumps(
+                [
+                    {"status": "success", "countryCode": "AU", "query": "1.1.1.1"},
+                    {"status": "fail", "message": "reserved range", "query": "9.9.9.9"},
+                ]
+            ).encode()
+
+            result = service.lookup_countries(["8.8.8.8", "1.1.1.1", "9.9.9.9", "10.0.0.1"])
+
+        assert result == {"8.8.8.8": "US", "1.1.1.1": "AU", "9.9.9.9": None, "10.0.0.1": None}
+        assert mock_http.call_count == 1
+        assert json.loads(mock_http.call_args.kwargs["body"]) == ["1.1.1.1", "9.9.9.9"]
+        assert service._cache["1.1.1.1"]["country_code"] == "AU"
+
+    def test_lookup_countries_chunks_requests(self, tmp_path):
+        """Test that large lookups are split into BATCH_SIZE requests."""
+        service = GeolocationService(data_dir=tmp_path)
+        service.BATCH_SIZE = 2
+
+        with patch("monitor.geolocation._http_request") as mock_http:
+            mock_http.side_effect = OSError("offline")
+
+            result = service.lookup_countries(["1.1.1.1", "8.8.8.8", "9.9.9.9"])
+
+        assert result == {"1.1.1.1": None, "8.8.8.8": None, "9.9.9.9": None}
+        assert mock_http.call_count == 2
+        assert all(service._cache[ip]["negative"] for ip in result)
+
+    def test_failed_lookup_is_negatively_cached(self, tmp_path):
+        """Test that a failed lookup isn't retried until the negative TTL expires."""
+        service = GeolocationService(data_dir=tmp_path)
+
+        with patch("monitor.geolocation._http_request") as mock_http:
+            mock_http.side_effect = socket.timeout("timed out")
+
+            assert service.lookup_country("8.8.8.8") is None
+            assert service.lookup_country("8.8.8.8") is None
+            assert mock_http.call_count == 1
+            assert service._cache["8.8.8.8"]["negative"] is True
+
+            # Once the short TTL has passed the lookup is attempted again
+            service._cache["8.8.8.8"]["timestamp"] -= service.NEGATIVE_CACHE_EXPIRY_SECONDS
+            service.lookup_country("8.8.8.8")
+            assert mock_http.call_count == 2
+
+    def test_negative_entries_are_not_persisted(self, tmp_path):
+        """Test that failed lookups stay in memory only."""
+        service = GeolocationService(data_dir=tmp_path)
+
+        with patch("monitor.geolocation._http_request") as mock_http:
+            mock_http.side_effect = socket.timeout("timed out")
+            service.lookup_country("8.8.8.8")
+
+        assert service._pending == {}
+        assert service._load_entry("8.8.8.8") is None
+
+
+class TestHttpRequest:
+    """Tests for the keep-alive HTTP helper."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_connections(self, monkeypatch):
+        """Start every test without pooled connections."""
+        monkeypatch.setattr(geolocation, "_http_local", threading.local())
+
+    @patch("http.client.HTTPConnection")
+    def test_reuses_connection(self, mock_connection_cls):
+        """Test that consecutive requests to a host share one connection."""
+        conn = mock_connection_cls.return_value
+        conn.getresponse.return_value.status = 200
+        conn.getresponse.return_value.read.return_value = b"{}"
+
+        assert geolocation._http_request("http://ip-api.com/json/8.8.8.8?fields=status") == b"{}"
+        geolocation._http_request("http://ip-api.com/json/1.1.1.1?fields=status")
+
+        assert mock_connection_cls.call_count == 1
+        conn.request.assert_called_with(
+            "GET", "/json/1.1.1.1?fields=status", body=None, headers=ANY
+        )
 
-        with open(cache_file) as f:
-            data = json.load(f)
-        assert "8.8.8.8" in data
+    @patch("http.client.HTTPConnection")
+    def test_retries_stale_connection(self, mock_connection_cls):
+        """Test that a dropped keep-alive connection is replaced once."""
+        stale, fresh = MagicMock(), MagicMock()
+        stale.getresponse.return_value.status = 200
+        stale.getresponse.return_value.read.return_value = b"first"
+        fresh.getresponse.return_value.status = 200
+        fresh.getresponse.return_value.read.return_value = b"second"
+        mock_connection_cls.side_effect = [stale, fresh]
+
+        geolocation._http_request("http://ip-api.com/batch")
+        stale.request.side_effect = http.client.RemoteDisconnected("closed")
+
+        assert geolocation._http_request("http://ip-api.com/batch", body=b"[]") == b"second"
+        stale.close.assert_called_once()
+        fresh.request.assert_called_once_with("POST", "/batch", body=b"[]", headers=ANY)
+
+    @patch("http.client.HTTPConnection")
+    def test_error_status_raises(self, mock_connection_cls):
+        """Test that an HTTP error status is raised as OSError."""
+        conn = mock_connection_cls.return_value
+        conn.getresponse.return_value.status = 429
+        conn.getresponse.return_value.read.return_value = b""
+
+        with pytest.raises(OSError):
+            geolocation._http_request("http://ip-api.com/json/8.8.8.8")
@@ -1,5 +1,8 @@
 """Tests for issue detection."""
 
+import socket
+import sys
+import time
 from datetime import datetime
 from unittest.mock import patch
 
@@ -14,22 +17,34 @@ class TestNetworkIssue:
     def test_basic_creation(self):
         """Test creating a NetworkIssue instance."""
         issue = NetworkIssue(
-            timestamp=datetime.now(),
+            timestamp=time.time(),
             issue_type=IssueType.HIGH_LATENCY,
             description="High latency detected",
         )
         assert issue.issue_type == IssueType.HIGH_LATENCY
         assert "latency" in issue.description.lower()
 
+    @pytest.mark.skipif(sys.version_info < (3, 10), reason="dataclass slots need 3.10+")
+    def test_is_slotted(self):
+        """Test that issues don't carry a per-instance __dict__."""
+        issue = NetworkIssue(
+            timestamp=time.time(),
+            issue_type=IssueType.DISCONNECT,
+            description="Connection lost",
+        )
+        assert not hasattr(issue, "__dict__")
+        assert issue.details == {}
+
     def test_to_dict(self):
         """Test converting issue to dictionary."""
         issue = NetworkIssue(
-            timestamp=datetime(2026, 1, 20, 10, 30, 0),
+            timestamp=datetime(2026, 1, 20, 10, 30, 0).timestamp(),
             issue_type=IssueType.DISCONNECT,
             description="Connection lost",
             details={"duration": 5},
         )
         data = issue.to_dict()
+        assert data["timestamp"] == "2026-01-20T10:30:00"
         assert data["type"] == "disconnect"
         assert data["description"] == "Connection lost"
         assert data["details"]["duration"] == 5
@@ -43,6 +58,7 @@ class TestNetworkIssue:
             "details": {"latency_ms": 150},
         }
         issue = NetworkIssue.from_dict(data)
+        assert issue.timestamp == datetime(2026, 1, 20, 10, 30, 0).timestamp()
         assert issue.issue_type == IssueType.HIGH_LATENCY
         assert issue.details["latency_ms"] == 150
 
@@ -197,6 +213,24 @@ class TestIssueDetector:
 
         assert len(detector.get_all_issues()) == 5
 
+    def test_max_issues_keeps_newest(self):
+        """Test that the oldest issues are evicted first, including on load."""
+        detector = IssueDetector(max_issues=2)
+        data = [
+            {
+                "timestamp": datetime.now().isoformat(),
+                "type": "connection_change",
+                "description": f"Change {i}",
+                "details": {},
+            }
+            for i in range(3)
+        ]
+        detector.load_issues(data)
+
+        issues = detector.get_all_issues()
+        assert isinstance(issues, list)
+        assert [issue.description for issue in issues] == ["Change 1", "Change 2"]
+
     def test_get_issues_as_dicts(self, detector):
         """Test getting issues as dictionaries."""
         detector.log_connection_change("A", "B")
@@ -228,6 +262,63 @@ class TestIssueDetector:
         latency = detector.get_current_latency()
         assert latency == 45.0
 
+    @pytest.mark.parametrize(
+        "stdout, expected",
+        [
+            ("64 bytes from 1.1.1.1: icmp_seq=0 ttl=57 time=9.742 ms", 9.742),
+            ("round-trip min/avg/max/stddev = 10.1/12.5/14.9/2.0 ms", 12.5),
+            ("latency 33 ms", 33.0),
+        ],
+    )
+    def test_icmp_ping_parses_output_formats(self, detector, stdout, expected):
+        """Test that _icmp_ping extracts latency from each supported output format."""
+        with patch("monitor.issues.safe_run") as mock_run:
+            mock_run.return_value.returncode = 0
+            mock_run.return_value.stdout = stdout
+
+            assert detector._icmp_ping("8.8.8.8") == expected
+
+    def test_icmp_ping_uses_resolved_binary(self, detector):
+        """Test that ping is spawned by absolute path with spawn-friendly options."""
+        with patch("monitor.issues.safe_run") as mock_run, patch(
+            "monitor.issues._PING_BIN", "/sbin/ping"
+        ):
+            mock_run.return_value.returncode = 1
+
+            assert detector._icmp_ping("8.8.8.8") is None
+
+        args, kwargs = mock_run.call_args
+        assert args[0][0] == "/sbin/ping"
+        assert kwargs["close_fds"] is False
+
+    @patch.object(IssueDetector, "_icmp_ping")
+    @patch("socket.create_connection")
+    def test_ping_prefers_tcp_probe(self, mock_connect, mock_icmp, detector):
+        """Test that a successful TCP handshake skips the ping subprocess."""
+        latency = detector._ping()
+
+        assert latency is not None and latency >= 0
+        mock_connect.assert_called_once()
+        assert mock_connect.call_args.args[0] == (IssueDetector.PING_HOST, IssueDetector.PING_PORT)
+        mock_icmp.assert_not_called()
+
+    @patch("socket.create_connection")
+    def test_tcp_ping_counts_refused_as_reachable(self, mock_connect, detector):
+        """Test that a refused connection still yields a round-trip time."""
+        mock_connect.side_effect = ConnectionRefusedError()
+
+        assert detector._tcp_ping("192.168.1.1") is not None
+
+    @patch.object(IssueDetector, "_icmp_ping")
+    @patch("socket.create_connection")
+    def test_ping_falls_back_to_icmp(self, mock_connect, mock_icmp, detector):
+        """Test that an unreachable TCP port falls back to ICMP ping."""
+        mock_connect.side_effect = socket.timeout()
+        mock_icmp.return_value = 12.0
+
+        assert detector._ping("10.0.0.1") == 12.0
+        mock_icmp.assert_called_once_with("10.0.0.1")
+
     def test_check_quality_drop(self, detector):
         """Test quality drop detection."""
         # Set initial score
@@ -263,3 +354,39 @@ class TestIssueDetector:
         tips = detector._get_troubleshooting_tips("high_latency")
         assert len(tips) > 0
         assert any("router" in tip.lower() for tip in tips)
+
+    def test_get_troubleshooting_tips_returns_copy(self, detector):
+        """Test that callers get their own list, and unknown causes get the default."""
+        tips = detector._get_troubleshooting_tips("high_jitter")
+        tips.append("extra")
+
+        assert "extra" not in detector._get_troubleshooting_tips("high_jitter")
+        assert detector._get_troubleshooting_tips("unknown") == ["Check your network connection"]
+
+    @patch("monitor.issues.time.monotonic")
+    def test_quality_drop_cooldown_uses_monotonic_clock(self, mock_monotonic, detector):
+        """Test that the quality-drop cooldown is measured on the monotonic clock."""
+        mock_monotonic.return_value = 1000.0
+        detector._last_quality_score = 90
+        assert detector.check_quality_drop(current_score=50) is not None
+
+        # 30s later another drop is suppressed by the cooldown
+        mock_monotonic.return_value = 1030.0
+        detector._last_quality_score = 90
+        assert detector.check_quality_drop(current_score=50) is None
+
+        # After the 60s cooldown it alerts again
+        mock_monotonic.return_value = 1061.0
+        detector._last_quality_score = 90
+        assert detector.check_quality_drop(current_score=50) is not None
+
+    @patch("monitor.issues.time.monotonic")
+    def test_reconnect_downtime_uses_monotonic_clock(self, mock_monotonic, detector):
+        """Test that reconnect downtime is measured on the monotonic clock."""
+        mock_monotonic.return_value = 500.0
+        detector.check_connectivity(False)
+
+        mock_monotonic.return_value = 542.0
+        issue = detector.check_connectivity(True)
+
+        assert issue.details["downtime_seconds"] == 42
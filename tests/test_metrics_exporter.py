@@ -0,0 +1,242 @@
+"""Tests for monitor/metrics_exporter.py - InfluxDB and Prometheus export."""
+
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from monitor.metrics_exporter import MetricsExporter
+
+SAMPLE_DATA = {
+    "upload_speed": 1000,
+    "download_speed": 5000,
+    "latency_ms": 12.5,
+    "quality_score": 90,
+    "device_count": 4,
+}
+
+
+@pytest.fixture
+def influxdb_client(monkeypatch):
+    """Stand in for the optional influxdb_client package."""
+    module = MagicMock()
+    monkeypatch.setattr("monitor.metrics_exporter.influxdb_client", module)
+    monkeypatch.setattr("monitor.metrics_exporter.SYNCHRONOUS", MagicMock())
+    return module
+
+
+class TestInfluxDBExport:
+    """Tests for MetricsExporter.export_to_influxdb."""
+
+    def export(self, exporter, bucket="bucket"):
+        return exporter.export_to_influxdb(
+            SAMPLE_DATA, "http://localhost:8086", "token", "org", bucket
+        )
+
+    def test_first_point_is_written_immediately(self, influxdb_client):
+        """Test that a one-off export reaches InfluxDB without waiting for a batch."""
+        exporter = MetricsExporter()
+
+        assert self.export(exporter) is True
+
+        write_api = influxdb_client.InfluxDBClient.return_value.write_api.return_value
+        write_api.write.assert_called_once()
+        assert len(write_api.write.call_args.kwargs["record"]) == 1
+
+    def test_points_are_batched_and_client_reused(self, influxdb_client):
+        """Test that later points are buffered and written together on one client."""
+        exporter = MetricsExporter()
+        write_api = influxdb_client.InfluxDBClient.return_value.write_api.return_value
+
+        self.export(exporter)
+        self.export(exporter)
+        self.export(exporter)
+        assert write_api.write.call_count == 1
+        assert len(exporter._influx_buffer) == 2
+
+        exporter.close()
+
+        assert write_api.write.call_count == 2
+        assert len(write_api.write.call_args.kwargs["record"]) == 2
+        influxdb_client.InfluxDBClient.assert_called_once()
+        influxdb_client.InfluxDBClient.return_value.close.assert_called_once()
+
+    def test_batch_size_triggers_write(self, influxdb_client):
+        """Test that a full buffer is written without waiting for the interval."""
+        exporter = MetricsExporter()
+        exporter.INFLUX_BATCH_SIZE = 2
+        write_api = influxdb_client.InfluxDBClient.return_value.write_api.return_value
+
+        self.export(exporter)
+        self.export(exporter)
+        self.export(exporter)
+
+        assert write_api.write.call_count == 2
+        assert exporter._influx_buffer == []
+
+    def test_target_change_flushes_previous(self, influxdb_client):
+        """Test that switching bucket writes pending points and opens a new client."""
+        exporter = MetricsExporter()
+        self.export(exporter)
+        self.export(exporter)
+
+        self.export(exporter, bucket="other")
+
+        assert influxdb_client.InfluxDBClient.call_count == 2
+        assert exporter._influx_target[3] == "other"
+
+    def test_write_failure_keeps_points(self, influxdb_client):
+        """Test that a failed write reports failure and retains the batch."""
+        exporter = MetricsExporter()
+        write_api = influxdb_client.InfluxDBClient.return_value.write_api.return_value
+        write_api.write.side_effect = OSError("connection refused")
+
+        assert self.export(exporter) is False
+        assert len(exporter._influx_buffer) == 1
+
+    def test_missing_dependency(self, monkeypatch):
+        """Test that export fails cleanly without influxdb-client."""
+        monkeypatch.setattr("monitor.metrics_exporter.influxdb_client", None)
+        assert MetricsExporter().export_to_influxdb(SAMPLE_DATA, "u", "t", "o", "b") is False
+
+
+@pytest.fixture
+def prometheus_client(monkeypatch):
+    """Stand in for the optional prometheus_client package."""
+    module = MagicMock()
+    monkeypatch.setattr("monitor.metrics_exporter.prometheus_client", module)
+    return module
+
+
+class TestPrometheusExport:
+    """Tests for MetricsExporter.export_to_prometheus."""
+
+    def test_registry_is_built_once(self, prometheus_client):
+        """Test that the registry and gauges are reused across pushes."""
+        exporter = MetricsExporter()
+
+        assert exporter.export_to_prometheus(SAMPLE_DATA, "localhost:9091") is True
+        assert exporter.export_to_prometheus(SAMPLE_DATA, "localhost:9091") is True
+
+        prometheus_client.CollectorRegistry.assert_called_once()
+        assert prometheus_client.Gauge.call_count == 5
+        push = prometheus_client.push_to_gateway
+        assert push.call_count == 2
+        assert push.call_args.kwargs["handler"] == exporter._keepalive_handler
+
+    def test_pauses_after_repeated_failures(self, prometheus_client):
+        """Test that pushes stop for a while after PUSH_MAX_FAILURES failures."""
+        exporter = MetricsExporter()
+        prometheus_client.push_to_gateway.side_effect = OSError("connection refused")
+
+        for _ in range(exporter.PUSH_MAX_FAILURES):
+            assert exporter.export_to_prometheus(SAMPLE_DATA, "localhost:9091") is False
+        assert exporter.export_to_prometheus(SAMPLE_DATA, "localhost:9091") is False
+
+        assert prometheus_client.push_to_gateway.call_count == exporter.PUSH_MAX_FAILURES
+
+    def test_missing_dependency(self, monkeypatch):
+        """Test that export fails cleanly without prometheus-client."""
+        monkeypatch.setattr("monitor.metrics_exporter.prometheus_client", None)
+        assert MetricsExporter().export_to_prometheus(SAMPLE_DATA, "localhost:9091") is False
+
+
+class TestKeepaliveHandler:
+    """Tests for the persistent-connection Pushgateway handler."""
+
+    @patch("monitor.metrics_exporter.http.client.HTTPConnection")
+    def test_reuses_connection(self, mock_connection_cls):
+        """Test that consecutive pushes share one connection."""
+        conn = mock_connection_cls.return_value
+        conn.getresponse.return_value.status = 200
+        exporter = MetricsExporter()
+        url = "http://localhost:9091/metrics/job/network_monitor"
+
+        exporter._keepalive_handler(url, "PUT", 30, [("Content-Type", "text/plain")], b"x")()
+        exporter._keepalive_handler(url, "PUT", 30, [], b"x")()
+
+        mock_connection_cls.assert_called_once_with("localhost:9091", timeout=30)
+        assert conn.request.call_count == 2
+        conn.request.assert_called_with(
+            "PUT", "/metrics/job/network_monitor", body=b"x", headers={}
+        )
+
+    @patch("monitor.metrics_exporter.http.client.HTTPConnection")
+    def test_error_status_raises(self, mock_connection_cls):
+        """Test that a gateway error response is raised to push_to_gateway."""
+        mock_connection_cls.return_value.getresponse.return_value.status = 500
+        exporter = MetricsExporter()
+
+        with pytest.raises(OSError):
+            exporter._keepalive_handler("http://localhost:9091/metrics", "PUT", 30, [], b"")()
+
+
+class TestContinuousExport:
+    """Tests for the background exporter fed by record()."""
+
+    INFLUX_OPTIONS = {
+        "endpoint": "http://localhost:8086",
+        "token": "token",
+        "org": "org",
+        "bucket": "bucket",
+    }
+
+    def test_record_without_export_running(self):
+        """Test that samples are refused when continuous export isn't running."""
+        assert MetricsExporter().record(SAMPLE_DATA) is False
+
+    def test_influxdb_samples_are_batched(self, influxdb_client):
+        """Test that recorded samples all reach InfluxDB, written in batches."""
+        exporter = MetricsExporter()
+        write_api = influxdb_client.InfluxDBClient.return_value.write_api.return_value
+
+        exporter.start_continuous_export(60, "influxdb", **self.INFLUX_OPTIONS)
+        for _ in range(5):
+            assert exporter.record(SAMPLE_DATA) is True
+        exporter.stop_continuous_export()
+
+        written = sum(len(c.kwargs["record"]) for c in write_api.write.call_args_list)
+        assert written == 5
+        assert write_api.write.call_count < 5
+        assert exporter._export_thread is None
+
+    def test_influxdb_spaced_samples_share_one_write(self, influxdb_client):
+        """Test that samples further apart than the flush interval still go out together."""
+        exporter = MetricsExporter()
+        exporter.INFLUX_FLUSH_INTERVAL_SECONDS = 0.01
+        write_api = influxdb_client.InfluxDBClient.return_value.write_api.return_value
+
+        exporter.start_continuous_export(60, "influxdb", **self.INFLUX_OPTIONS)
+        for _ in range(3):
+            exporter.record(SAMPLE_DATA)
+            time.sleep(0.05)  # Longer than INFLUX_FLUSH_INTERVAL_SECONDS
+        assert write_api.write.call_count == 0
+        exporter.stop_continuous_export()
+
+        write_api.write.assert_called_once()
+        assert len(write_api.write.call_args.kwargs["record"]) == 3
+
+    def test_prometheus_pushes_latest_sample(self, prometheus_client):
+        """Test that only the newest sample per interval is pushed."""
+        exporter = MetricsExporter()
+
+        exporter.start_continuous_export(60, "prometheus", gateway_url="localhost:9091")
+        exporter.record({"upload_speed": 1})
+        exporter.record({"upload_speed": 2})
+        exporter.stop_continuous_export()
+
+        prometheus_client.push_to_gateway.assert_called_once()
+        # Every gauge mock is the same object; upload_speed is set first
+        gauge_values = [c.args[0] for c in prometheus_client.Gauge.return_value.set.call_args_list]
+        assert gauge_values == [2, 0, 0, 0, 0]
+
+    def test_full_queue_drops_samples(self, influxdb_client):
+        """Test that record() never blocks when the queue is full."""
+        exporter = MetricsExporter()
+        exporter.EXPORT_QUEUE_SIZE = 1
+
+        with patch.object(exporter, "_export_worker"):
+            exporter.start_continuous_export(60, "influxdb", **self.INFLUX_OPTIONS)
+            assert exporter.record(SAMPLE_DATA) is True
+            assert exporter.record(SAMPLE_DATA) is False
+            exporter.stop_continuous_export()
@@ -1,5 +1,9 @@
 """Tests for monitor/network.py"""
 
+from unittest.mock import patch
+
+import pytest
+
 from monitor.network import NetworkStats, format_bytes
 
 
@@ -27,6 +31,20 @@ class TestFormatBytes:
         assert format_bytes(1024, speed=True) == "1.0 KB/s"
         assert format_bytes(1024 * 1024, speed=True) == "1.0 MB/s"
 
+    def test_format_unit_boundaries(self):
+        assert format_bytes(1023.99) == "1024.0 B"
+        assert format_bytes(1024**2 - 1) == "1024.0 KB"
+        assert format_bytes(0.5) == "0.5 B"
+
+    def test_format_negative(self):
+        assert format_bytes(-1536) == "-1.5 KB"
+        assert format_bytes(-500, speed=True) == "-500.0 B/s"
+
+    def test_format_beyond_petabytes(self):
+        assert format_bytes(1024**5) == "1.0 PB"
+        assert format_bytes(1024**6) == "1024.0 PB"
+        assert format_bytes(float("inf")) == "inf PB"
+
 
 class TestNetworkStats:
     """Tests for the NetworkStats class."""
@@ -69,7 +87,8 @@ class TestNetworkStats:
     def test_get_average_speeds_with_samples(self):
         """Test average calculation with samples."""
         stats = NetworkStats()
-        stats._speed_samples = [(100, 200), (200, 400), (300, 600)]
+        for sample in [(100, 200), (200, 400), (300, 600)]:
+            stats._add_sample(*sample)
 
         up, down = stats.get_average_speeds()
         assert up == 200.0  # (100 + 200 + 300) / 3
@@ -132,11 +151,73 @@ class TestNetworkStats:
         stats = NetworkStats()
 
         # Add many samples
-        for i in range(THRESHOLDS.SPEED_SAMPLE_COUNT + 10):
-            stats._speed_samples.append((float(i), float(i * 2)))
-
-        # Manually trim as get_current_stats would
-        while len(stats._speed_samples) > THRESHOLDS.SPEED_SAMPLE_COUNT:
-            stats._speed_samples.pop(0)
+        total = THRESHOLDS.SPEED_SAMPLE_COUNT + 10
+        for i in range(total):
+            stats._add_sample(float(i), float(i * 2))
 
         assert len(stats._speed_samples) == THRESHOLDS.SPEED_SAMPLE_COUNT
+
+        # Running averages only cover the samples still in the window
+        kept = range(total - THRESHOLDS.SPEED_SAMPLE_COUNT, total)
+        up, down = stats.get_average_speeds()
+        assert up == pytest.approx(sum(kept) / len(kept))
+        assert down == pytest.approx(2 * sum(kept) / len(kept))
+
+    def test_reset_session_clears_samples(self):
+        """Test that reset_session empties the window and running totals."""
+        stats = NetworkStats()
+        stats._add_sample(100.0, 200.0)
+
+        stats.reset_session()
+
+        assert len(stats._speed_samples) == 0
+        assert stats.get_average_speeds() == (0.0, 0.0)
+        stats._add_sample(10.0, 20.0)
+        assert stats.get_average_speeds() == (10.0, 20.0)
+
+    def test_counters_reused_within_max_age(self, mock_psutil):
+        """Test that back-to-back reads share one psutil call."""
+        stats = NetworkStats()
+
+        stats._get_total_bytes()
+        stats.get_session_totals()
+
+        assert mock_psutil.call_count == 1
+
+    def test_session_totals_reuse_last_sample(self, mock_psutil):
+        """Test that session totals use the counters from a recent speed sample."""
+        stats = NetworkStats()
+        stats.initialize()
+        mock_psutil.return_value.bytes_sent += 500
+
+        assert stats.get_session_totals() == (0, 0)
+        assert mock_psutil.call_count == 1
+
+        # Once the sample is stale, the counters are read again
+        stats._last_time_ns -= int(stats.SESSION_TOTALS_MAX_AGE * 1_000_000_000)
+        stats._counters_cache = None
+        assert stats.get_session_totals() == (500, 0)
+
+    def test_counters_refreshed_after_max_age(self, mock_psutil):
+        """Test that a stale or forced read calls psutil again."""
+        stats = NetworkStats()
+
+        with patch("monitor.network.time.monotonic", side_effect=[100.0, 100.1, 100.1]):
+            stats._get_total_bytes()
+            stats._get_total_bytes()
+            stats._get_total_bytes(max_age=0)
+
+        assert mock_psutil.call_count == 3
+
+    def test_speed_uses_monotonic_interval(self, mock_psutil):
+        """Test that speeds are computed from monotonic nanosecond deltas."""
+        stats = NetworkStats()
+
+        with patch("monitor.network.time.monotonic_ns", side_effect=[0, 2_000_000_000]):
+            stats.initialize()
+            mock_psutil.return_value.bytes_sent += 2000
+            mock_psutil.return_value.bytes_recv += 8000
+            result = stats.get_current_stats()
+
+        assert result.upload_speed == 1000.0
+        assert result.download_speed == 4000.0
@@ -1,6 +1,12 @@
 """Tests for monitor/scanner.py"""
 
+import json
+import socket
+import struct
+import time
+from unittest.mock import patch
 
+import pytest
 
 from monitor.scanner import (
     DeviceNameStore,
@@ -8,6 +14,9 @@ from monitor.scanner import (
     NetworkDevice,
     NetworkScanner,
     OUIDatabase,
+    _lookup_vendor,
+    _parse_route_dump,
+    _read_arp_table,
     infer_device_type,
     normalize_mac,
 )
@@ -31,6 +40,12 @@ class TestNormalizeMac:
     def test_mixed_case(self):
         assert normalize_mac("aA:Bb:cC:Dd:eE:fF") == "AA:BB:CC:DD:EE:FF"
 
+    def test_repeated_mac_is_cached(self):
+        normalize_mac.cache_clear()
+        normalize_mac("0:11:22:aa:b:cc")
+        assert normalize_mac("0:11:22:aa:b:cc") == "00:11:22:AA:0B:CC"
+        assert normalize_mac.cache_info().hits == 1
+
 
 class TestOUIDatabase:
     """Tests for OUI vendor lookup."""
@@ -56,6 +71,58 @@ class TestOUIDatabase:
         # Results should be the same
         assert result1 == result2
 
+    def test_load_parses_oui_file(self, tmp_path):
+        """Test parsing of the arp-scan OUI file format."""
+        oui_file = tmp_path / "ieee-oui.txt"
+        oui_file.write_text(
+            "# ieee-oui.txt\n\n001C42\tParallels, Inc.\n00-0c-29\tVMware, Inc. \nbad line\n"
+        )
+        with patch.object(OUIDatabase, "_instance", None), patch.object(
+            OUIDatabase, "OUI_PATHS", [str(oui_file)]
+        ), patch.object(OUIDatabase, "_find_cellar_oui", return_value=[]):
+            db = OUIDatabase()
+
+        assert db._vendors == {"001C42": "Parallels, Inc.", "000C29": "VMware, Inc."}
+
+    def test_lookup_prefers_longest_prefix(self):
+        """Test that a longer (more specific) assignment beats its 24-bit parent."""
+        db = OUIDatabase()
+        vendors = {"70B3D5": "IEEE Registration", "70B3D5123": "Small Vendor"}
+        try:
+            with patch.object(db, "_vendors", vendors), patch.object(db, "_prefix_tables", []):
+                db._index_prefixes()
+                assert db.lookup("70:B3:D5:12:34:56") == "Small Vendor"
+                assert db.lookup("70:B3:D5:99:99:99") == "IEEE Registration"
+        finally:
+            db._index_prefixes()  # Rebuild the real tables
+
+    def test_reindex_discards_cached_lookups(self):
+        """Test that rebuilding the prefix tables drops lookups cached from the old ones."""
+        db = OUIDatabase()
+        try:
+            with patch.object(db, "_vendors", {"ABCDEF": "Acme"}), patch.object(
+                db, "_prefix_tables", []
+            ):
+                db._index_prefixes()
+                assert db.lookup("ab:cd:ef:00:11:22") == "Acme"
+                db._vendors = {"ABCDEF": "Acme Corp"}
+                db._index_prefixes()
+                assert db.lookup("ab:cd:ef:00:11:22") == "Acme Corp"
+        finally:
+            db._index_prefixes()
+
+    def test_lookup_is_cached(self):
+        """Test that repeat lookups for a MAC are served from the cache."""
+        db = OUIDatabase()
+        _lookup_vendor.cache_clear()
+        try:
+            with patch.object(db, "_prefix_tables", [(6, {"ABCDEF": "Acme"})]):
+                assert db.lookup("ab:cd:ef:00:11:22") == "Acme"
+                assert db.lookup("ab:cd:ef:00:11:22") == "Acme"
+            assert _lookup_vendor.cache_info().hits == 1
+        finally:
+            _lookup_vendor.cache_clear()
+
 
 class TestNetworkDevice:
     """Tests for the NetworkDevice dataclass."""
@@ -104,6 +171,20 @@ class TestNetworkDevice:
         )
         assert device.type_icon == "📱"
 
+    def test_seen_timestamps_default_to_epoch_seconds(self):
+        device = NetworkDevice(ip_address="192.168.1.100", mac_address="AA:BB:CC:DD:EE:FF")
+        assert isinstance(device.first_seen, float)
+        assert device.first_seen == pytest.approx(time.time(), abs=5)
+
+    def test_infer_key_is_private_state(self):
+        with pytest.raises(TypeError):
+            NetworkDevice(
+                ip_address="192.168.1.100", mac_address="AA:BB:CC:DD:EE:FF", _infer_key=()
+            )
+        device = NetworkDevice(ip_address="192.168.1.100", mac_address="AA:BB:CC:DD:EE:FF")
+        device._infer_key = ("Apple", None, (), None)
+        assert "_infer_key" not in repr(device)
+
 
 class TestInferDeviceType:
     """Tests for device type inference."""
@@ -150,6 +231,12 @@ class TestInferDeviceType:
         dtype, os_hint, model = infer_device_type(None, "XboxOne")
         assert dtype == DeviceType.GAMING
 
+    def test_pattern_priority_spans_both_names(self):
+        """Test that a higher-priority match in the mDNS name beats the hostname."""
+        dtype, os_hint, model = infer_device_type(None, "living-room-tv", mdns_name="Johns-iPhone")
+        assert dtype == DeviceType.PHONE
+        assert model == "iPhone"
+
     def test_sonos_vendor(self):
         """Test inferring Sonos speaker."""
         dtype, os_hint, model = infer_device_type("Sonos", None)
@@ -186,6 +273,130 @@ class TestDeviceNameStore:
         store = DeviceNameStore()
         assert store.get_name("00:00:00:00:00:01") is None
 
+    def test_load_normalizes_stored_macs(self, tmp_path):
+        """Test that MACs saved in another form are re-keyed on load."""
+        store_path = tmp_path / "device_names.json"
+        store_path.write_text(json.dumps({"aa-bb-cc-dd-ee-ff": "Laptop"}))
+        with patch.object(DeviceNameStore, "_instance", None), patch.object(
+            DeviceNameStore, "_store_path", store_path
+        ):
+            store = DeviceNameStore()
+
+        assert store.get_name("AA:BB:CC:DD:EE:FF") == "Laptop"
+        assert store.get_name("aa:bb:cc:dd:ee:ff") == "Laptop"
+
+    def test_renames_are_saved_together(self, tmp_path):
+        """Test that a burst of changes is written once, after the debounce delay."""
+        store_path = tmp_path / "device_names.json"
+        with patch.object(DeviceNameStore, "_instance", None), patch.object(
+            DeviceNameStore, "_store_path", store_path
+        ), patch.object(DeviceNameStore, "_names", {}):
+            store = DeviceNameStore()
+            with patch("monitor.scanner.json.dump", wraps=json.dump) as mock_dump:
+                store.set_name("aa-bb-cc-dd-ee-ff", "Laptop")
+                store.set_name("11:22:33:44:55:66", "Phone")
+                store.remove_name("11:22:33:44:55:66")
+                assert not store_path.exists()
+
+                store.flush()
+
+            mock_dump.assert_called_once()
+            assert json.loads(store_path.read_text()) == {"AA:BB:CC:DD:EE:FF": "Laptop"}
+            assert store._save_timer is None
+
+
+def _route_message(ip: str, mac: bytes, ifname: bytes = b"en0") -> bytes:
+    """Build one rt_msghdr + sockaddr_inarp + sockaddr_dl routing message."""
+    sin = struct.pack("=BBH4s8x", 16, socket.AF_INET, 0, socket.inet_aton(ip))
+    sdl = struct.pack("=BBHBBBB", 20, 18, 4, 6, len(ifname), len(mac), 0) + ifname + mac
+    sdl += b"\0" * (20 - len(sdl))
+    body = sin + sdl
+    header = struct.pack("=H", 92 + len(body)) + b"\0" * 90
+    return header + body
+
+
+class TestArpTable:
+    """Tests for reading the kernel ARP table without `arp`."""
+
+    def test_proc_net_arp(self, tmp_path, monkeypatch):
+        """Test that only complete /proc/net/arp entries are returned."""
+        arp = tmp_path / "arp"
+        arp.write_text(
+            "IP address       HW type     Flags       HW address            Mask     Device\n"
+            "192.168.1.1      0x1         0x2         00:11:22:aa:bb:cc     *        eth0\n"
+            "192.168.1.7      0x1         0x0         00:00:00:00:00:00     *        eth0\n"
+        )
+        monkeypatch.setattr("monitor.scanner.PROC_NET_ARP", arp)
+        monkeypatch.setattr("monitor.scanner.sys.platform", "linux")
+
+        assert _read_arp_table() == [("192.168.1.1", "00:11:22:AA:BB:CC")]
+
+    def test_route_dump(self):
+        """Test decoding of the macOS NET_RT_FLAGS routing dump."""
+        buf = _route_message("192.168.1.1", bytes.fromhex("001122aabbcc"))
+        buf += _route_message("192.168.1.9", b"")  # Incomplete: no link-layer address
+        buf += _route_message("10.0.0.2", bytes.fromhex("a0b1c2d3e4f5"), ifname=b"bridge100")
+
+        assert _parse_route_dump(buf) == [
+            ("192.168.1.1", "00:11:22:AA:BB:CC"),
+            ("10.0.0.2", "A0:B1:C2:D3:E4:F5"),
+        ]
+
+    def test_unsupported_platform(self, monkeypatch):
+        """Test that other platforms report the table as unavailable."""
+        monkeypatch.setattr("monitor.scanner.sys.platform", "win32")
+        assert _read_arp_table() is None
+
+    def test_arp_command_output(self):
+        """Test parsing of `arp -an` output, skipping incomplete entries."""
+        scanner = NetworkScanner()
+        output = (
+            "? (192.168.1.1) at 0:11:22:aa:bb:cc on en0 ifscope [ethernet]\n"
+            "? (192.168.1.7) at (incomplete) on en0 ifscope [ethernet]\n"
+            "router.lan (10.0.0.1) at a0:b1:c2:d3:e4:f5 on en1 [ethernet]\n"
+        )
+
+        with patch.object(scanner._subprocess_cache, "run") as mock_run:
+            mock_run.return_value.returncode = 0
+            mock_run.return_value.stdout = output
+            pairs = scanner._run_arp_command()
+
+        assert pairs == [
+            ("192.168.1.1", "00:11:22:AA:BB:CC"),
+            ("10.0.0.1", "A0:B1:C2:D3:E4:F5"),
+        ]
+
+    def test_skips_broadcast_and_own_macs(self):
+        """Test that broadcast/multicast entries and our own MACs never become devices."""
+        scanner = NetworkScanner()
+        scanner._own_mac_addresses = frozenset({"00:11:22:33:44:99"})
+        pairs = [
+            ("192.168.1.5", "00:11:22:33:44:55"),
+            ("192.168.1.6", "FF:FF:FF:FF:FF:FF"),
+            ("192.168.1.7", "00:00:00:00:00:00"),
+            ("192.168.1.8", "00:11:22:33:44:99"),
+            ("224.0.0.251", "01:00:5E:00:00:FB"),
+            ("192.168.1.255", "00:11:22:33:44:56"),
+            ("not-an-ip", "00:11:22:33:44:57"),
+        ]
+
+        with patch("monitor.scanner._read_arp_table", return_value=pairs):
+            devices = scanner._run_arp_with_oui()
+
+        assert [ip for ip, _, _ in devices] == ["192.168.1.5"]
+
+    def test_scanner_falls_back_to_arp_command(self):
+        """Test that the scanner parses `arp -an` when no native table is available."""
+        scanner = NetworkScanner()
+        scanner._own_mac_addresses = frozenset()
+
+        pairs = [("192.168.1.5", "00:11:22:33:44:55")]
+        with patch("monitor.scanner._read_arp_table", return_value=None):
+            with patch.object(scanner, "_run_arp_command", return_value=pairs):
+                devices = scanner._run_arp_with_oui()
+
+        assert [(ip, mac) for ip, mac, _ in devices] == [("192.168.1.5", "00:11:22:33:44:55")]
+
 
 class TestNetworkScanner:
     """Tests for the NetworkScanner class."""
@@ -275,6 +486,167 @@ class TestNetworkScanner:
         devices = scanner.scan(force=True, quick=True)
         assert isinstance(devices, list)
 
+    def test_repeated_forced_scan_reuses_result(self):
+        """Test that back-to-back forced scans run the ARP scan once."""
+        scanner = NetworkScanner()
+
+        with patch.object(scanner, "_run_arp_with_oui", return_value=[]) as mock_arp:
+            scanner.scan(force=True, quick=True)
+            scanner.scan(force=True, quick=True)
+            assert mock_arp.call_count == 1
+
+            # A full scan straight after a quick one still runs
+            scanner.scan(force=True, quick=False)
+            assert mock_arp.call_count == 2
+
+    def test_scan_marks_missing_devices_offline(self):
+        """Test that devices dropping out of the ARP table go offline and come back."""
+        scanner = NetworkScanner()
+        router = ("192.168.1.1", "00:11:22:33:44:01", None)
+        phone = ("192.168.1.2", "00:11:22:33:44:02", None)
+
+        with patch.object(scanner, "_run_arp_with_oui", return_value=[router, phone]):
+            scanner.scan(force=True, quick=True)
+        scanner._last_scan = 0
+        with patch.object(scanner, "_run_arp_with_oui", return_value=[router]):
+            scanner.scan(force=True, quick=True)
+
+        assert scanner._devices[router[1]].is_online is True
+        assert scanner._devices[phone[1]].is_online is False
+        assert scanner.get_device_count() == (1, 2)
+
+        scanner._last_scan = 0
+        with patch.object(scanner, "_run_arp_with_oui", return_value=[router, phone]):
+            scanner.scan(force=True, quick=True)
+        assert scanner._devices[phone[1]].is_online is True
+
+    def test_resolve_missing_hostnames_runs_lookups_concurrently(self):
+        """Test that batch hostname resolution overlaps the DNS lookups."""
+        scanner = NetworkScanner()
+        for i in range(4):
+            mac = f"AA:BB:CC:00:00:0{i}"
+            scanner._devices[mac] = NetworkDevice(ip_address=f"192.168.1.{i + 10}", mac_address=mac)
+
+        def slow_lookup(ip):
+            time.sleep(0.2)
+            return (f"host-{ip.rsplit('.', 1)[1]}.lan", [], [ip])
+
+        with patch("monitor.scanner.socket.gethostbyaddr", side_effect=slow_lookup):
+            start = time.monotonic()
+            scanner.resolve_missing_hostnames()
+            elapsed = time.monotonic() - start
+
+        assert elapsed < 0.6
+        assert scanner._devices["AA:BB:CC:00:00:02"].hostname == "host-12.lan"
+
+    def test_resolve_hostname_timeout(self):
+        """Test that a lookup slower than the timeout counts as unresolved."""
+        scanner = NetworkScanner()
+
+        def slow_lookup(ip):
+            time.sleep(0.3)
+            return ("late.lan", [], [ip])
+
+        with patch("monitor.scanner.socket.gethostbyaddr", side_effect=slow_lookup):
+            assert scanner._resolve_hostname("192.168.1.10", timeout=0.05) is None
+
+    def test_mdns_discovery_browses_all_types_together(self):
+        """Test that dns-sd browsers run side by side with a single wait."""
+        scanner = NetworkScanner()
+        scanner._has_dns_sd = True
+        browse_output = (
+            "Timestamp     A/R    Flags  if Domain   Service Type   Instance Name\n"
+            "12:00:00.000  Add        2  4 local.    _airplay._tcp. Living Room TV\n"
+        )
+
+        with patch("monitor.scanner.subprocess.Popen") as mock_popen:
+            with patch("monitor.scanner.time.sleep") as mock_sleep:
+                mock_popen.return_value.communicate.return_value = (browse_output, "")
+                discovered = scanner._run_mdns_discovery()
+
+        assert mock_popen.call_count == 8
+        mock_sleep.assert_called_once_with(0.5)
+        assert "Living Room TV" in discovered
+        assert "_airplay._tcp" in discovered["Living Room TV"][1]
+
+    def test_mdns_names_matched_by_ip(self):
+        """Test that mDNS results are applied to the device currently at that IP."""
+        scanner = NetworkScanner()
+        tv = ("192.168.1.20", "00:11:22:33:44:20", None)
+        gone = ("192.168.1.21", "00:11:22:33:44:21", None)
+
+        with patch.object(scanner, "_run_arp_with_oui", return_value=[tv, gone]):
+            scanner.scan(force=True, quick=True)
+        scanner._last_scan = 0
+        with patch.object(scanner, "_run_arp_with_oui", return_value=[tv]):
+            scanner.scan(force=True, quick=True)
+
+        scanner._devices[tv[1]].services = ["_http._tcp"]
+        mdns_results = {
+            "Living-Room": ("Living Room", ["_airplay._tcp", "_http._tcp", "_airplay._tcp"]),
+            "Old-Laptop": ("Old Laptop", ["_smb._tcp"]),
+        }
+        resolved = {"Living-Room": tv[0], "Old-Laptop": gone[0]}
+        with patch.object(scanner, "_run_mdns_discovery", return_value=mdns_results):
+            with patch.object(scanner, "_resolve_mdns_to_ip", side_effect=resolved.get):
+                scanner._background_mdns_scan()
+
+        assert scanner._devices[tv[1]].mdns_name == "Living Room"
+        assert scanner._devices[tv[1]].services == ["_http._tcp", "_airplay._tcp"]
+        assert scanner._devices[tv[1]].device_type == DeviceType.TV
+        # Offline devices keep their last IP but are no longer matched by it
+        assert scanner._devices[gone[1]].mdns_name is None
+
+    def test_request_hostname_resolution_uses_worker(self):
+        """Test that queued hostname requests are resolved by the background worker."""
+        scanner = NetworkScanner()
+        mac = "AA:BB:CC:00:00:10"
+        scanner._devices[mac] = NetworkDevice(ip_address="192.168.1.30", mac_address=mac)
+
+        with patch.object(scanner, "_resolve_hostnames", return_value=["nas.lan"]) as mock_resolve:
+            scanner.request_hostname_resolution(mac.lower())
+            deadline = time.monotonic() + 2
+            while scanner._devices[mac].hostname is None and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+        assert scanner._devices[mac].hostname == "nas.lan"
+        mock_resolve.assert_called_once_with(["192.168.1.30"], timeout=2.0)
+        scanner.stop_hostname_resolution()
+
+    def test_hostname_worker_started_lazily_and_stoppable(self):
+        """Test that the hostname worker starts on first request and exits on stop."""
+        scanner = NetworkScanner()
+        assert scanner._hostname_thread is None
+        mac = "AA:BB:CC:00:00:12"
+        scanner._devices[mac] = NetworkDevice(ip_address="192.168.1.32", mac_address=mac)
+
+        with patch.object(scanner, "_resolve_hostnames", return_value=[None]):
+            scanner.request_hostname_resolution(mac)
+            thread = scanner._hostname_thread
+            assert thread is not None and thread.is_alive()
+
+            scanner.stop_hostname_resolution()
+
+        assert not thread.is_alive()
+        assert scanner._hostname_thread is None
+        scanner.stop_hostname_resolution()  # Stopping twice is harmless
+
+    def test_reinference_skipped_when_inputs_unchanged(self):
+        """Test that repeated hostname/mDNS updates don't re-run type inference."""
+        scanner = NetworkScanner()
+        mac = "AA:BB:CC:00:00:11"
+        scanner._devices[mac] = NetworkDevice(ip_address="192.168.1.31", mac_address=mac)
+
+        with patch("monitor.scanner.infer_device_type", wraps=infer_device_type) as mock_infer:
+            scanner._apply_hostname_to_device(mac, "johns-iphone.lan")
+            scanner._apply_hostname_to_device(mac, "johns-iphone.lan")
+            assert mock_infer.call_count == 1
+
+            scanner._apply_hostname_to_device(mac, "johns-ipad.lan")
+            assert mock_infer.call_count == 2
+
+        assert scanner._devices[mac].device_type == DeviceType.TABLET
+
     def test_devices_returned_as_list(self):
         """Test that get_all_devices returns a list."""
         scanner = NetworkScanner()
@@ -4,7 +4,13 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
-from monitor.traffic import PORT_CATEGORIES, ProcessTraffic, ServiceCategory, TrafficMonitor
+from monitor.traffic import (
+    PORT_CATEGORIES,
+    ProcessTraffic,
+    ServiceCategory,
+    TrafficMonitor,
+    _friendly_process_name,
+)
 
 
 class TestProcessTraffic:
@@ -49,6 +55,13 @@ class TestProcessTraffic:
         traffic = ProcessTraffic(pid=1, name="")
         assert traffic.display_name == "Unknown"
 
+    def test_display_name_is_cached_per_name(self):
+        """Test that repeated process names reuse the cached friendly name."""
+        _friendly_process_name.cache_clear()
+        assert ProcessTraffic(pid=1, name="Slack Helper").display_name == "Slack"
+        assert ProcessTraffic(pid=2, name="Slack Helper").display_name == "Slack"
+        assert _friendly_process_name.cache_info().hits == 1
+
 
 class TestServiceCategory:
     """Tests for ServiceCategory dataclass."""
@@ -62,6 +75,13 @@ class TestServiceCategory:
         assert category.total_bytes == 1500000
         assert len(category.processes) == 2
 
+    def test_add_process_deduplicates(self):
+        """Test that processes are recorded once, in first-seen order."""
+        category = ServiceCategory(name="Web", processes=["Safari"])
+        for name in ("Chrome", "Safari", "Chrome", "Mail"):
+            category.add_process(name)
+        assert category.processes == ["Safari", "Chrome", "Mail"]
+
 
 class TestPortCategories:
     """Tests for port to category mapping."""
@@ -114,6 +134,52 @@ class TestTrafficMonitor:
         name = monitor._get_process_name(1234)
         assert name == "Safari"
 
+    @patch("psutil.Process")
+    def test_get_process_name_cached(self, mock_process, monitor):
+        """Test that names are reused per PID until the PID is recycled."""
+        proc = mock_process.return_value
+        proc.create_time.return_value = 100.0
+        proc.name.return_value = "Safari"
+
+        assert monitor._get_process_name(1234) == "Safari"
+        assert monitor._get_process_name(1234) == "Safari"
+        proc.name.assert_called_once()
+
+        # Same PID, new process
+        proc.create_time.return_value = 200.0
+        proc.name.return_value = "Mail"
+        assert monitor._get_process_name(1234) == "Mail"
+
+    @patch("psutil.pids", return_value=[2])
+    @patch("psutil.Process")
+    def test_process_name_cache_prunes_exited(self, mock_process, mock_pids, monitor):
+        """Test that a full name cache drops PIDs that no longer exist."""
+        monitor.PROCESS_NAME_CACHE_SIZE = 2
+        mock_process.return_value.create_time.return_value = 100.0
+        mock_process.return_value.name.return_value = "proc"
+
+        for pid in (1, 2, 3):
+            monitor._get_process_name(pid)
+
+        assert set(monitor._process_names) == {2, 3}
+
+    @patch("psutil.pids", return_value=list(range(1, 20)))
+    @patch("psutil.Process")
+    def test_process_name_cache_bounded_when_all_live(self, mock_process, mock_pids, monitor):
+        """Test that a cache full of live PIDs evicts its oldest entries."""
+        monitor.PROCESS_NAME_CACHE_SIZE = 8
+        mock_process.return_value.create_time.return_value = 100.0
+        mock_process.return_value.name.return_value = "proc"
+
+        for pid in range(1, 20):
+            monitor._get_process_name(pid)
+
+        assert len(monitor._process_names) <= monitor.PROCESS_NAME_CACHE_SIZE
+        assert 19 in monitor._process_names
+        assert 1 not in monitor._process_names
+        # Each prune frees several slots instead of one
+        assert mock_pids.call_count < 19 - monitor.PROCESS_NAME_CACHE_SIZE
+
     @patch("psutil.Process")
     def test_get_process_name_not_found(self, mock_process, monitor):
         """Test handling non-existent process."""
@@ -138,6 +204,46 @@ class TestTrafficMonitor:
         assert 1234 in connections
         assert len(connections[1234]) == 1
 
+    def test_run_nettop(self, monitor, mock_subprocess_cache):
+        """Test parsing per-process byte counts from nettop output."""
+        mock_subprocess_cache.run.return_value = MagicMock(
+            returncode=0,
+            stdout=(
+                "time        bytes_in  bytes_out\n"
+                "17:40:29        10        20\n"
+                "Safari.1234     5000      1200\n"
+                "Google Chrome H.77     300       40\n"
+                "Safari.5678     100       0\n"
+                "idle.99         0         0\n"
+                "curl.42         700\n"  # Too few columns
+                "\n"
+            ),
+        )
+
+        result = monitor._run_nettop()
+
+        assert result == {
+            "Safari": (5100, 1200),
+            "Google": (300, 40),
+        }
+
+    @patch("psutil.net_connections")
+    def test_connection_snapshot_shared(self, mock_connections, monitor):
+        """Test that one TCP enumeration serves both traffic views in a refresh."""
+        established = MagicMock(pid=None, status="ESTABLISHED")
+        listening = MagicMock(pid=None, status="LISTEN")
+        mock_connections.return_value = [established, listening]
+
+        monitor._get_active_connections()
+        monitor.categorize_traffic()
+
+        mock_connections.assert_called_once_with(kind="tcp")
+        assert monitor._snapshot_connections() == [established]
+
+        monitor._connections_cache_time -= monitor.CONNECTIONS_MAX_AGE
+        monitor._snapshot_connections()
+        assert mock_connections.call_count == 2
+
     def test_run_netstat_processes(self, monitor, mock_subprocess_cache):
         """Test getting connection counts from lsof."""
         mock_subprocess_cache.run.return_value = MagicMock(
@@ -149,6 +255,26 @@ class TestTrafficMonitor:
         # Should have some entries (parsing may vary)
         assert isinstance(result, dict)
 
+    def test_run_netstat_processes_counts(self, monitor, mock_subprocess_cache):
+        """Test that lsof rows are counted per command, skipping listeners and system."""
+        mock_subprocess_cache.run.return_value = MagicMock(
+            returncode=0,
+            stdout=(
+                "COMMAND PID USER FD TYPE DEVICE SIZE/OFF NODE NAME\n"
+                "Google\\x20Chrome 1 u 1u IPv4 0x1 0t0 TCP 10.0.0.2:5000->1.1.1.1:443 "
+                "(ESTABLISHED)\n"
+                "Google\\x20Chrome 1 u 2u IPv4 0x2 0t0 TCP 10.0.0.2:5001->1.1.1.1:443 "
+                "(ESTABLISHED)\n"
+                "postgres 2 u 3u IPv4 0x3 0t0 TCP 127.0.0.1:5432 (LISTEN)\n"
+                "Spotify 3 u 4u IPv4 0x4 0t0 UDP *:57621\n"
+                "launchd 4 u 5u IPv4 0x5 0t0 TCP 10.0.0.2:6000->1.1.1.1:443 (ESTABLISHED)\n"
+            ),
+        )
+
+        result = monitor._run_netstat_processes()
+
+        assert result == {"Google Chrome": 2, "Spotify": 1}
+
     @patch("psutil.net_connections")
     @patch.object(TrafficMonitor, "_get_process_name")
     @patch.object(TrafficMonitor, "_run_netstat_processes")
@@ -178,19 +304,31 @@ class TestTrafficMonitor:
         summary = monitor.get_traffic_summary()
         assert len(summary) == 2
 
-    @patch.object(TrafficMonitor, "get_traffic_summary")
-    def test_get_top_processes(self, mock_summary, monitor):
+    @patch.object(TrafficMonitor, "get_traffic_by_process")
+    def test_get_top_processes(self, mock_traffic, monitor):
         """Test getting top N processes."""
-        mock_summary.return_value = [
-            ("Chrome", 3000, 1500, 5),
-            ("Safari", 2000, 1000, 3),
-            ("Firefox", 1000, 500, 2),
+        mock_traffic.return_value = [
+            ProcessTraffic(pid=1, name="Firefox", bytes_in=1000, bytes_out=500, connections=2),
+            ProcessTraffic(pid=2, name="Chrome", bytes_in=3000, bytes_out=1500, connections=5),
+            ProcessTraffic(pid=3, name="Safari", bytes_in=2000, bytes_out=1000, connections=3),
         ]
 
         top = monitor.get_top_processes(limit=2)
         assert len(top) == 2
         assert top[0][0] == "Chrome"
 
+    @patch.object(TrafficMonitor, "get_traffic_by_process")
+    def test_get_top_processes_matches_summary(self, mock_traffic, monitor):
+        """Test that the top N rows match the head of the full summary, ties included."""
+        mock_traffic.return_value = [
+            ProcessTraffic(pid=1, name="Mail", bytes_in=100, bytes_out=0, connections=1),
+            ProcessTraffic(pid=2, name="Music", bytes_in=50, bytes_out=50, connections=1),
+            ProcessTraffic(pid=3, name="Notes", bytes_in=100, bytes_out=0, connections=2),
+            ProcessTraffic(pid=4, name="Maps", bytes_in=10, bytes_out=0, connections=9),
+        ]
+
+        assert monitor.get_top_processes(limit=3) == monitor.get_traffic_summary()[:3]
+
     @patch("psutil.net_connections")
     @patch.object(TrafficMonitor, "_get_process_name")
     def test_categorize_traffic(self, mock_name, mock_connections, monitor):
@@ -208,6 +346,25 @@ class TestTrafficMonitor:
         # Should have at least one category
         assert isinstance(categories, dict)
 
+    @patch("psutil.net_connections")
+    @patch.object(TrafficMonitor, "_get_process_name", return_value="Chrome")
+    def test_categorize_traffic_resolves_each_pid_once(self, mock_name, mock_connections, monitor):
+        """Test that a process with many connections is looked up once."""
+        mock_connections.return_value = [
+            MagicMock(
+                pid=42,
+                status="ESTABLISHED",
+                laddr=MagicMock(port=50000 + i),
+                raddr=MagicMock(port=443),
+            )
+            for i in range(5)
+        ]
+
+        categories = monitor.categorize_traffic()
+
+        mock_name.assert_called_once_with(42)
+        assert categories["Web (HTTPS)"].processes == ["Chrome"]
+
 
 class TestTrafficAggregation:
     """Tests for traffic aggregation functionality."""